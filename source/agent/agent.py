@@ -1,11 +1,18 @@
 from player.player import Player
-from typing import List, Dict, Any, Optional
-from custom_logger import logger
-from openai_client import client
+from player.events import DecisionEvent, EmotionEvent
+from agent.policy import FastPathPolicy
+from typing import List, Dict, Any, Optional, TYPE_CHECKING
+from custom_logger import logger, LazyJson
+from llm import get_backend
+from llm.deadline import complete_with_deadline, acomplete_with_deadline, DeadlineExceeded, CallTiming
 from config import config
-from game.game import get_stats_prompt
+from agent.prompts import get_stats_prompt
 import json
-from game.game import Game
+import asyncio
+
+if TYPE_CHECKING:
+    from game.game import Game
+    from game.routing import Route
 
 # --- Function Schemas (OpenAI Function Calling용) ---
 functions_available_to_agent = [
@@ -85,129 +92,208 @@ functions_available_to_agent = [
         
 # --- OpenAI Agent Class ---
 class OpenAI_Agent:
-    def __init__(self, player: Player, game: 'Game'):
+    def __init__(self, player: Player, game: 'Game', fast_path: Optional[Dict[str, Any]] = None):
         self.player = player
         self.game = game
+        self.fast_path = FastPathPolicy(fast_path) # 규칙만으로 결론이 나는 결정은 LLM 호출 생략
 
-        self.update_current_emotion()
+        # 초기 감정은 EmotionScheduler 가 첫 결정 직전에 일괄 갱신
 
-    def update_current_emotion(self):
-        emotion_prompt = [
-            {"role": "system", "content": self.player.persona_prompt + "\n\n" + self.game.get_game_rules_summary()},
-            {
-                "role": "system",
-                "content": (
-                    "현재 나의 기록과 상황을 읽고, 내가 지금 느낄 법한 감정을 **한 문장**으로 묘사하세요. "
-                    "반드시 한 문장만 출력하고, 불필요한 설명이나 따옴표는 넣지 마세요."
-                )
-            },
-            {
-                "role": "user",
-                "content": f"""
+    def build_emotion_messages(self) -> List[Dict[str, Any]]:
+        """감정 추출 프롬프트를 구성합니다."""
+        return self.game.prompts.messages(self.player, "emotion", f"""
                 다음 기록을 참고하여 현재 감정을 한 문장으로 표현하세요
 
                 {get_stats_prompt(self.game, self.player)}
-                """
-            }
-        ]
+                """)
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",   # 비용 절감을 위해 경량화 모델 사용
-            messages=emotion_prompt,
-            temperature=0          # 감정 추출이므로 0
-        )
+    def _emotion_request(self, messages: List[Dict[str, Any]], model: str) -> Dict[str, Any]:
+        return {
+            "model": model,   # 비용 절감을 위해 경량화 모델 사용 (config.MODEL_ROUTES)
+            "messages": messages,
+            "temperature": 0          # 감정 추출이므로 0
+        }
 
+    def update_current_emotion(self):
+        """감정을 즉시 갱신합니다. (일반적인 게임 진행에서는 EmotionScheduler 를 통해 일괄 갱신)"""
+        route = self.game.router.route("emotion", self.player)
+        response = get_backend().complete(self._emotion_request(self.build_emotion_messages(), route.model),
+                                          self.game.llm_meta("emotion", self.player, route=route.label))
+        self.apply_emotion(response)
+
+    async def fetch_emotion_async(self, semaphore: asyncio.Semaphore):
+        messages = self.build_emotion_messages()
+        route = self.game.router.route("emotion", self.player)
+        async with semaphore:
+            response, _ = await acomplete_with_deadline(self._emotion_request(messages, route.model),
+                                                        self.game.llm_meta("emotion", self.player, route=route.label), self.game.call_deadline())
+            return response
+
+    def apply_emotion(self, response):
         self.player.current_emotion = response.choices[0].message.content.strip()
-        self.player.action_log.append(f"Update Current Emotion : {self.player.current_emotion}")
+        self.player.record(EmotionEvent(self.player.current_emotion))
         logger.info(f"Update Player {self.player.name} Emotion : {self.player.current_emotion}")
 
+    def build_decision_messages(self) -> List[Dict[str, Any]]:
+        """현재 상태를 기반으로 행동 결정 프롬프트를 구성합니다."""
+        dynamic = get_stats_prompt(self.game, self.player)
+        # 도구 목록은 프롬프트 캐시를 위해 항상 전체를 보내고, 지금 불가능한 행동은 동적 영역에 안내
+        allowed = [tool["function"]["name"] for tool in self.fast_path.allowed_tools(self.player, functions_available_to_agent)]
+        if len(allowed) < len(functions_available_to_agent):
+            dynamic += f"\n        ## 이번 턴에 가능한 행동\n        {', '.join(allowed)}\n"
+        return self.game.prompts.messages(self.player, "decision", dynamic)
+
+    def _decision_request(self, messages: List[Dict[str, Any]], model: str) -> Dict[str, Any]:
+        """행동 결정 API 호출 파라미터 (동기/비동기 공용)"""
+        return {
+            "model": model, # ModelRouter 가 호출 위치/상황/예산에 따라 선택
+            "messages": messages,
+            "tools": functions_available_to_agent, # 정적 프리픽스의 일부 (상태에 따라 바꾸지 않음)
+            #"tool_choice": "auto", # OpenAI가 메시지에 따라 함수 호출 여부 결정
+            "tool_choice": "required",
+            # "response_format": {"type": "json_object"}, # 만약 전체 응답을 JSON으로 받고 싶다면 사용 (function calling과 함께는?)
+            "temperature": 0.7, # 약간의 창의성 부여
+            **({} if config.MAX_ACTIONS_PER_TURN > 1 else {"parallel_tool_calls": False}) # 턴 계획을 쓰지 않으면 함수 호출 1개만
+        }
+
+    def _decision_meta(self, route: 'Route') -> Dict[str, Any]:
+        """행동 결정 호출 메타 정보 (오프라인 백엔드가 유효한 대상/카드를 고를 수 있도록 힌트 포함)"""
+        return self.game.llm_meta(
+            "decision", self.player,
+            route=route.label,
+            targets=self.game.visibility.visible_names(self.player),
+            available_cards=[card for card, count in self.player.cards.items() if count > 0],
+            can_exit=self.player.check_survival_condition(),
+            max_actions=config.MAX_ACTIONS_PER_TURN
+        )
+
+    def record_fast_path(self, action: Dict[str, Any]) -> Dict[str, Any]:
+        """fast-path 로 결정된 행동을 LLM 결정과 같은 형식으로 기록합니다."""
+        logger.info(f"Player {self.player.name} decided to call function '{action['function_name']}' (fast-path, no LLM call).")
+        logger.info(f"  - Internal Reasoning: {action['internal_reasoning']}")
+        self.player.record(DecisionEvent("decided", action["function_name"], action["internal_reasoning"], action["arguments"]))
+        return action
+
     def decide_action(self) -> Optional[Dict[str, Any]]:
         """OpenAI API를 호출하여 플레이어의 다음 행동을 결정합니다."""
         logger.info(f"--- {self.player.name}'s Turn ---")
 
+        # 규칙상 강제/지배되는 행동이면 LLM 호출 생략
+        action = self.fast_path.decide(self.game, self.player)
+        if action:
+            return self.record_fast_path(action)
+
         # 프롬프트 구성
-        messages = [
-            {"role": "system", "content": self.player.persona_prompt + "\n\n" + self.game.get_game_rules_summary()},
-            {"role": "system", "content": "감정에 따라 과감한 결정을 내리십시오."},
-            {"role": "user", "content": f"""
-            {get_stats_prompt(self.game, self.player)}
-
-            ## 당신의 목표
-            - 제한 시간 안에 카드를 모두 소진하고, 별 3개 이상을 보유하여 생존하는 것입니다.
-            - 다른 플레이어와 협상(거래)하거나 게임(가위바위보)을 할 수 있습니다.
-            - 생존 조건을 만족하면 게임에서 나갈 수 있습니다 ('declare_out_of_game')
-                - 만약 생존 조건보다 더 많은 별을 가지고 있다면 게임에 나가지 않고, 이를 다른 사람에게 팔아 이득을 취할 수도 있습니다.
-            - 당신의 결정과 그 이유를 명확히 설명하고, 반드시 정의된 함수 중 하나를 호출하는 형식으로 응답해주세요.
-            - **주의:** 거래나 게임 제안 시, `internal_reasoning`에는 당신의 실제 전략과 판단을 상세히 기록하고, `public_reasoning`에는 상대방에게 보여줄 간결하고 설득력 있는 메시지를 작성하세요. (예: "이 거래는 우리 모두에게 이득이 될 것입니다." 또는 "카드 소진을 위해 게임이 필요합니다.")
-            - 전략적으로 판단하여 이번 턴에 어떤 행동을 할지 결정하세요. 아무것도 하지 않을 수도 있습니다 ('do_nothing').
-            """}
-        ]
-
-        logger.debug(f"Sending prompt to OpenAI for {self.player.name}:\n{json.dumps(messages, indent=2, ensure_ascii=False)}")
+        messages = self.build_decision_messages()
+
+        logger.debug("Sending prompt to OpenAI for %s:\n%s", self.player.name, LazyJson(messages))
+
+        try:
+            route = self.game.router.route("decision", self.player)
+            response, timing = complete_with_deadline(self._decision_request(messages, route.model), self._decision_meta(route), self.game.call_deadline())
+        except Exception as e:
+            return self.resolve_decision(e)
+        return self.resolve_decision(response, timing)
+
+    async def fetch_decision_async(self, messages: List[Dict[str, Any]], semaphore: asyncio.Semaphore):
+        """턴 시작 시점에 구성된 프롬프트로 행동 결정을 비동기 요청합니다. (응답 해석은 resolve_decision 에서 순서대로 수행)
+
+        (응답, CallTiming) 을 반환합니다.
+        """
+        logger.debug("Sending prompt to OpenAI (async) for %s:\n%s", self.player.name, LazyJson(messages))
+        route = self.game.router.route("decision", self.player)
+        meta = self._decision_meta(route)
+        async with semaphore:
+            return await acomplete_with_deadline(self._decision_request(messages, route.model), meta, self.game.call_deadline())
+
+    def _parse_tool_call(self, tool_call) -> Dict[str, Any]:
+        """함수 호출 하나를 행동 dict 로 변환합니다. (결정 기록은 계획을 걸러낸 뒤 resolve_decision 에서)"""
+        function_call_data = tool_call.function
+        function_name = function_call_data.name
+        function_args = json.loads(function_call_data.arguments)
+        internal_reasoning = function_args.get("internal_reasoning", "No internal reasoning provided.")
+        public_reasoning = function_args.get("public_reasoning", "No public reasoning provided.")
+        # declare_out_of_game 에는 reasoning 만 있음
+        if function_name == "declare_out_of_game":
+            internal_reasoning = function_args.get("reasoning", "No reasoning provided.")
+            public_reasoning = internal_reasoning # 공개 이유와 내부 이유 동일 처리
+
+        logger.info(f"Player {self.player.name} decided to call function '{function_name}'.")
+        logger.info(f"  - Internal Reasoning: {internal_reasoning}")
+        if function_name != "declare_out_of_game": # declare 외에는 public reasoning 로깅
+             logger.info(f"  - Public Reasoning: {public_reasoning}")
+
+        # Game Handler에게 처리 위임하기 위해 dict 형태로 반환
+        # game.py 에서는 public_reasoning 만 필요로 함
+        # 하지만 로그 등을 위해 둘 다 포함시킬 수 있음, 여기서는 일단 둘 다 포함
+        # (declare_out_of_game 일 경우 public_reasoning 은 reasoning 으로 통일됨)
+        return {
+            "function_name": function_name,
+            "arguments": function_args,
+            "internal_reasoning": internal_reasoning,
+            "public_reasoning": public_reasoning
+        }
+
+    def resolve_decision(self, response, timing: Optional[CallTiming] = None) -> Optional[Dict[str, Any]]:
+        """API 응답(또는 호출 중 발생한 예외)을 행동 dict 로 변환하고 기록합니다."""
+        if isinstance(response, DeadlineExceeded):
+            # 마감 초과: 저비용 정책으로 대체
+            action = self.fast_path.fallback_decision(self.game, self.player)
+            logger.warning(f"Decision of {self.player.name} missed the deadline ({response}). Falling back to '{action['function_name']}'.")
+            self.player.record(DecisionEvent("deadline_default", action["function_name"], action["internal_reasoning"], action["arguments"], timing=response.timing.flags()))
+            return action
+
+        if isinstance(response, BaseException):
+            logger.error(f"Error calling OpenAI API for {self.player.name}: {response}")
+            # API 오류 시 안전하게 do_nothing 처리
+            self.player.record(DecisionEvent("api_error"))
+            return {
+                    "function_name": "do_nothing",
+                    "arguments": {"reasoning": "API call failed."}
+                }
 
         try:
-            response = client.chat.completions.create(
-                model="gpt-4.1", # 또는 사용 가능한 최신 모델
-                messages=messages,
-                tools=functions_available_to_agent,
-                #tool_choice="auto", # OpenAI가 메시지에 따라 함수 호출 여부 결정
-                tool_choice="required",
-                # response_format={"type": "json_object"}, # 만약 전체 응답을 JSON으로 받고 싶다면 사용 (function calling과 함께는?)
-                temperature=0.7 # 약간의 창의성 부여
-            )
             response_message = response.choices[0].message
-            logger.debug(f"Received response from OpenAI for {self.player.name}:\n{response_message}")
+            logger.debug("Received response from OpenAI for %s:\n%s", self.player.name, response_message)
 
             tool_calls = response_message.tool_calls
             if tool_calls:
-                # 함수 호출이 있는 경우
-                function_call_data = tool_calls[0].function # 첫 번째 함수 호출만 처리한다고 가정
-                function_name = function_call_data.name
-                function_args = json.loads(function_call_data.arguments)
-                internal_reasoning = function_args.get("internal_reasoning", "No internal reasoning provided.")
-                public_reasoning = function_args.get("public_reasoning", "No public reasoning provided.")
-                # declare_out_of_game 에는 reasoning 만 있음
-                if function_name == "declare_out_of_game":
-                    internal_reasoning = function_args.get("reasoning", "No reasoning provided.")
-                    public_reasoning = internal_reasoning # 공개 이유와 내부 이유 동일 처리
-
-                logger.info(f"Player {self.player.name} decided to call function '{function_name}'.")
-                logger.info(f"  - Internal Reasoning: {internal_reasoning}")
-                if function_name != "declare_out_of_game": # declare 외에는 public reasoning 로깅
-                     logger.info(f"  - Public Reasoning: {public_reasoning}")
-
-                # 로그에는 상세 정보 포함
-                self.player.action_log.append(f"Turn {self.game.current_turn}: Decided '{function_name}'. Internal Reason: {internal_reasoning}. Args: {function_args}")
-
-                # Game Handler에게 처리 위임하기 위해 dict 형태로 반환
-                # game.py 에서는 public_reasoning 만 필요로 함
-                # 하지만 로그 등을 위해 둘 다 포함시킬 수 있음, 여기서는 일단 둘 다 포함
-                action_result = {
-                    "function_name": function_name,
-                    "arguments": function_args,
-                    "internal_reasoning": internal_reasoning,
-                    "public_reasoning": public_reasoning
-                }
-                # declare_out_of_game 일 경우 reasoning을 public_reasoning으로 통일
-                if function_name == "declare_out_of_game":
-                    action_result["public_reasoning"] = internal_reasoning
-
+                # 함수 호출이 있는 경우: 턴 계획으로 보고 MAX_ACTIONS_PER_TURN 개까지 순서대로 실행
+                if len(tool_calls) > config.MAX_ACTIONS_PER_TURN:
+                    logger.warning(f"Player {self.player.name} returned {len(tool_calls)} function calls. Only the first {config.MAX_ACTIONS_PER_TURN} are kept.")
+                actions = [self._parse_tool_call(tool_calls[0])]
+                for tool_call in tool_calls[1:config.MAX_ACTIONS_PER_TURN]:
+                    try:
+                        actions.append(self._parse_tool_call(tool_call))
+                    except Exception as e: # 뒤쪽 호출의 인자 오류는 그 호출부터 버리고 앞의 행동은 유지
+                        logger.warning(f"Dropping the rest of {self.player.name}'s plan after an invalid function call: {e}")
+                        break
+                if len(actions) > 1:
+                    # 다른 행동과 함께 온 do_nothing 은 의미가 없으므로 제외
+                    actions = [action for action in actions if action["function_name"] != "do_nothing"] or actions[:1]
+                # 실제로 실행할 행동만 결정으로 기록 (버려진 do_nothing/초과 호출 제외)
+                for action in actions:
+                    self.player.record(DecisionEvent("decided", action["function_name"], action["internal_reasoning"], action["arguments"],
+                                                     timing=timing.flags() if timing else ""))
+                action_result = actions[0]
+                if len(actions) > 1:
+                    action_result["plan"] = actions[1:] # 이어서 실행할 행동 (game.py 에서 단계마다 재검증)
+                    logger.info(f"Player {self.player.name} planned {len(actions)} actions: {[action['function_name'] for action in actions]}")
                 return action_result
             else:
                 # 함수 호출 없이 텍스트 응답만 온 경우 (예: do_nothing을 텍스트로 말한 경우)
                 # 이 시나리오에서는 do_nothing 함수 호출을 기본으로 유도했으므로, 이 경우는 예외처리 또는 do_nothing으로 간주
                 logger.warning(f"Player {self.player.name} did not return a function call. Interpreting as 'do_nothing'. Response: {response_message.content}")
-                self.player.action_log.append(f"Turn {self.game.current_turn}: Decided 'do_nothing' (Implicit). Reason: No function call returned.")
+                self.player.record(DecisionEvent("implicit"))
                 return {
                     "function_name": "do_nothing",
                     "arguments": {"reasoning": "AI did not explicitly call a function."}
                 }
 
         except Exception as e:
-            logger.error(f"Error calling OpenAI API for {self.player.name}: {e}")
-            # API 오류 시 안전하게 do_nothing 처리
-            self.player.action_log.append(f"Turn {self.game.current_turn}: Action failed due to API error. Defaulting to 'do_nothing'.")
+            logger.error(f"Error parsing OpenAI response for {self.player.name}: {e}")
+            self.player.record(DecisionEvent("invalid_response"))
             return {
                     "function_name": "do_nothing",
-                    "arguments": {"reasoning": "API call failed."}
-                }
\ No newline at end of file
+                    "arguments": {"reasoning": "Invalid API response."}
+                }
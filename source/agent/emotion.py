@@ -0,0 +1,72 @@
+from typing import Dict, List, Optional
+from custom_logger import logger
+from config import config
+from llm.loop import run_sync
+import asyncio
+
+
+# --- Emotion Scheduler ---
+class EmotionScheduler:
+    """상태가 바뀐 플레이어를 dirty 로 표시해두고, 정해진 시점에 한 번에 동시 갱신합니다.
+
+    - 거래/게임/행동 직후에는 mark_dirty 만 호출 (API 호출 없음)
+    - 행동 결정 직전에 flush / flush_async 로 dirty 플레이어 전체를 일괄 갱신
+    """
+
+    def __init__(self, agents: Dict[str, 'OpenAI_Agent']):
+        self.agents = agents
+        self._dirty: Dict[str, None] = {} # 삽입 순서 유지 (결정론적 적용 순서)
+        self.refreshed_count = 0
+        self.batch_count = 0
+
+    def mark_dirty(self, player_name: str):
+        self._dirty[player_name] = None
+
+    def mark_all_dirty(self):
+        for player_name in self.agents:
+            self.mark_dirty(player_name)
+
+    def is_dirty(self, player_name: str) -> bool:
+        return player_name in self._dirty
+
+    def restore_dirty(self, player_names: List[str]):
+        """체크포인트 복원 시 갱신 대기 목록을 저장된 상태로 교체"""
+        self._dirty = {player_name: None for player_name in player_names}
+
+    def _take_dirty(self, player_names: Optional[List[str]] = None) -> List[str]:
+        """갱신 대상 선정. 비활성 플레이어의 감정은 더 이상 쓰이지 않으므로 버립니다."""
+        targets = []
+        for player_name in list(self._dirty):
+            if player_names is not None and player_name not in player_names:
+                continue
+            del self._dirty[player_name]
+            if self.agents[player_name].player.is_active():
+                targets.append(player_name)
+        return targets
+
+    async def flush_async(self, player_names: Optional[List[str]] = None):
+        """dirty 플레이어(또는 그 중 player_names)의 감정을 하나의 동시 배치로 갱신합니다."""
+        targets = self._take_dirty(player_names)
+        if not targets:
+            return
+
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
+        logger.info(f"Refreshing emotions of {len(targets)} players in one batch.")
+        responses = await asyncio.gather(
+            *(self.agents[name].fetch_emotion_async(semaphore) for name in targets),
+            return_exceptions=True
+        )
+
+        # 응답 적용은 dirty 표시 순서대로
+        for player_name, response in zip(targets, responses):
+            if isinstance(response, BaseException):
+                logger.error(f"Error updating emotion for {player_name}: {response}")
+                continue
+            self.agents[player_name].apply_emotion(response)
+            self.refreshed_count += 1
+        self.batch_count += 1
+
+    def flush(self, player_names: Optional[List[str]] = None):
+        """동기 코드용 flush (이벤트 루프 밖에서 호출, 스레드별 공용 루프 사용)"""
+        if self._dirty:
+            run_sync(self.flush_async(player_names))
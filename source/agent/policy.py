@@ -0,0 +1,137 @@
+from typing import List, Dict, Any, Optional, Tuple
+from collections import Counter
+from config import config
+
+
+# --- Fast-path Policy ---
+class FastPathPolicy:
+    """규칙만으로 결론이 나는(강제되거나 지배되는) 결정을 LLM 호출 없이 처리하는 정책 계층
+
+    각 메소드는 로컬에서 결정한 경우 결과를, LLM 판단이 필요한 경우 None 을 반환합니다.
+    페르소나별 설정은 config.FAST_PATH_DEFAULTS 를 덮어씁니다.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        self.settings = dict(config.FAST_PATH_DEFAULTS)
+        self.settings.update(settings or {})
+        self.avoided = Counter() # 사유별로 생략한 LLM 호출 수
+
+    def _avoid(self, reason: str):
+        self.avoided[reason] += 1
+
+    # --- 행동 결정 ---
+
+    def decide(self, game: 'Game', player: 'Player') -> Optional[Dict[str, Any]]:
+        """강제/지배 행동이면 행동 dict, 아니면 None"""
+        remaining_turns = game.max_turns - game.current_turn
+
+        # 생존 조건 충족: 더 팔 별이 없거나 남은 턴이 없으면 탈출 외에 이득이 없음
+        if self.settings["auto_exit"] and player.check_survival_condition():
+            surplus = player.stars - config.SURVIVAL_STARS
+            if surplus == 0 or remaining_turns <= 0 or self.settings["auto_exit_with_surplus"]:
+                self._avoid("auto_exit")
+                return self._action("declare_out_of_game", {"reasoning": "[fast-path] 생존 조건을 만족하여 게임에서 나갑니다."})
+
+        # 상호작용할 상대가 없으면 할 수 있는 것이 없음
+        if self.settings["auto_pass_without_targets"] and not game.get_other_players_info(player.name):
+            self._avoid("no_targets")
+            return self._action("do_nothing", {"internal_reasoning": "[fast-path] 상호작용할 다른 활성 플레이어가 없습니다."})
+
+        return None
+
+    def allowed_tools(self, player: 'Player', tools: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """현재 상태에서 규칙상 불가능한 행동을 도구 목록에서 제외 (카드가 없으면 게임 제안 불가 등)"""
+        if not self.settings["restrict_tools"]:
+            return tools
+        excluded = set()
+        if player.get_total_cards() == 0:
+            excluded.add("propose_match")
+        if not player.check_survival_condition():
+            excluded.add("declare_out_of_game")
+        return [tool for tool in tools if tool["function"]["name"] not in excluded]
+
+    @staticmethod
+    def _action(function_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        reasoning = arguments.get("internal_reasoning") or arguments.get("reasoning", "")
+        return {
+            "function_name": function_name,
+            "arguments": arguments,
+            "internal_reasoning": reasoning,
+            "public_reasoning": arguments.get("public_reasoning", reasoning),
+            "fast_path": True,
+        }
+
+    # --- 제안 응답 ---
+
+    def trade_response(self, game: 'Game', target: 'Player', proposer: 'Player', args: Dict[str, Any]) -> Optional[Tuple[bool, str]]:
+        """(수락 여부, 이유) 또는 None"""
+        if self.settings["auto_reject_unfulfillable"]:
+            if not game._validate_received_items(target, args):
+                self._avoid("trade_unfulfillable")
+                return False, "[fast-path] 요구받은 자원을 보유하고 있지 않습니다."
+            if not game._validate_trade(proposer, target, args):
+                self._avoid("trade_proposer_cannot_pay")
+                return False, "[fast-path] 상대가 제안한 자원을 보유하고 있지 않습니다."
+
+        if self.settings["auto_reject_self_elimination"]:
+            stars_after = target.stars - args.get("receive_stars", 0) + args.get("give_stars", 0)
+            if stars_after <= 0:
+                self._avoid("trade_self_elimination")
+                return False, "[fast-path] 거래 후 별이 0개가 되어 즉시 탈락합니다."
+
+        if self.settings["auto_accept_gifts"]:
+            asks_nothing = all(args.get(f"receive_{key}", 0) == 0 for key in ("stars", "rock", "scissors", "paper", "money"))
+            gives_only_assets = all(args.get(f"give_{key}", 0) == 0 for key in ("rock", "scissors", "paper"))
+            gives_something = any(args.get(f"give_{key}", 0) > 0 for key in ("stars", "money"))
+            # 카드를 받으면 소진해야 할 카드가 늘어나므로 별/현금만 받는 경우만 무조건 이득
+            if asks_nothing and gives_only_assets and gives_something:
+                self._avoid("trade_gift")
+                return True, "[fast-path] 대가 없이 별/현금을 받는 거래입니다."
+        return None
+
+    def match_response(self, game: 'Game', target: 'Player', proposer: 'Player') -> Optional[Tuple[Optional[str], str]]:
+        """(낼 카드 또는 거절 시 None, 이유) 또는 None"""
+        if self.settings["auto_reject_risky_match"] and target.stars <= 1:
+            self._avoid("match_risky")
+            return None, "[fast-path] 별이 1개뿐이라 패배 시 즉시 탈락합니다."
+        return None
+
+    # --- 마감 초과 시 저비용 정책 ---
+
+    @staticmethod
+    def _most_held_card(player: 'Player') -> Optional[str]:
+        card, count = max(player.cards.items(), key=lambda item: item[1])
+        return card if count > 0 else None
+
+    def fallback_decision(self, game: 'Game', player: 'Player') -> Dict[str, Any]:
+        """LLM 결정이 마감을 넘겼을 때의 행동 (config.DEADLINE_FALLBACK_POLICY)"""
+        if config.DEADLINE_FALLBACK_POLICY == "heuristic":
+            if player.check_survival_condition():
+                return self._action("declare_out_of_game", {"reasoning": "[fallback] 생존 조건을 만족하여 게임에서 나갑니다."})
+            card = self._most_held_card(player)
+            targets = sorted(game.get_other_players_info(player.name), key=lambda info: info["user_stars"], reverse=True)
+            if card and targets:
+                # 카드 소진이 우선: 가장 많이 가진 카드로 별이 가장 많은 상대에게 게임 제안
+                return self._action("propose_match", {
+                    "target_player_name": targets[0]["user_name"],
+                    "card_to_play": card,
+                    "internal_reasoning": "[fallback] 결정 마감을 넘겨 카드 소진 규칙으로 게임을 제안합니다.",
+                    "public_reasoning": "카드 소진을 위해 게임이 필요합니다.",
+                })
+        return self._action("do_nothing", {"internal_reasoning": "[fallback] 결정 마감을 넘겨 이번 턴은 지켜봅니다."})
+
+    def fallback_match_response(self, target: 'Player') -> Optional[str]:
+        """게임 제안 응답이 마감을 넘겼을 때 낼 카드 (거절 시 None). 패배해도 탈락하지 않을 때만 수락"""
+        if config.DEADLINE_FALLBACK_POLICY == "heuristic" and target.stars > 1:
+            return self._most_held_card(target)
+        return None
+
+    def get_metrics(self) -> Dict[str, int]:
+        return dict(self.avoided)
+
+
+def get_fast_path_metrics(agents: Dict[str, 'OpenAI_Agent']) -> Dict[str, Any]:
+    total = Counter()
+    for agent in agents.values():
+        total.update(agent.fast_path.avoided)
+    return {"llm_calls_avoided": sum(total.values()), "by_reason": dict(total)}
@@ -0,0 +1,128 @@
+from typing import List, Dict, Any
+from llm.tokens import estimate_tokens
+from config import config
+
+# --- 호출 위치별 정적 지시문 (게임 상태와 무관, 상대 이름 등 가변 정보 금지) ---
+CALL_SITE_INSTRUCTIONS = {
+    "decision": """감정에 따라 과감한 결정을 내리십시오.
+
+## 당신의 목표
+- 제한 시간 안에 카드를 모두 소진하고, 별 3개 이상을 보유하여 생존하는 것입니다.
+- 다른 플레이어와 협상(거래)하거나 게임(가위바위보)을 할 수 있습니다.
+- 생존 조건을 만족하면 게임에서 나갈 수 있습니다 ('declare_out_of_game')
+    - 만약 생존 조건보다 더 많은 별을 가지고 있다면 게임에 나가지 않고, 이를 다른 사람에게 팔아 이득을 취할 수도 있습니다.
+- 당신의 결정과 그 이유를 명확히 설명하고, 반드시 정의된 함수 중 하나를 호출하는 형식으로 응답해주세요.
+- **주의:** 거래나 게임 제안 시, `internal_reasoning`에는 당신의 실제 전략과 판단을 상세히 기록하고, `public_reasoning`에는 상대방에게 보여줄 간결하고 설득력 있는 메시지를 작성하세요. (예: "이 거래는 우리 모두에게 이득이 될 것입니다." 또는 "카드 소진을 위해 게임이 필요합니다.")
+- 전략적으로 판단하여 이번 턴에 어떤 행동을 할지 결정하세요. 아무것도 하지 않을 수도 있습니다 ('do_nothing').""",
+
+    "emotion": (
+        "현재 나의 기록과 상황을 읽고, 내가 지금 느낄 법한 감정을 **한 문장**으로 묘사하세요. "
+        "반드시 한 문장만 출력하고, 불필요한 설명이나 따옴표는 넣지 마세요."
+    ),
+
+    "trade_response": """## 거래 제안에 대한 결정
+다른 플레이어로부터 거래 제안을 받으면 수락 여부를 결정합니다.
+당신의 생존 목표와 현재 자원 상황, 제안자의 의도, 당신의 과거 행동 등을 고려하여 신중하게 판단하세요.
+반드시 'accept' 또는 'reject' 중 하나로만 응답하고, 그 이유를 간략하게 설명해주세요.
+게임의 생존을 충족했다면, 남은 자원으로 돈을 최대한으로 획득해야합니다.""",
+
+    "trade_batch_response": """## 받은 거래 제안들에 대한 결정
+이번 턴 동안 여러 플레이어로부터 받은 거래 제안을 한꺼번에 검토합니다.
+각 제안마다 당신의 생존 목표와 현재 자원 상황, 제안자의 의도를 고려하여 수락 여부를 결정하세요.
+여러 제안을 수락할 수 있지만, 수락한 제안은 번호 순서대로 체결되므로 자원이 겹치면 뒤의 제안은 체결되지 않습니다.
+반드시 모든 제안 번호에 대해 'accept' 또는 'reject' 와 간략한 이유를 응답하세요.""",
+
+    "match_response": """## 게임 제안에 대한 결정
+다른 플레이어로부터 가위바위보 게임 제안을 받으면 수락 여부와 낼 카드를 결정합니다.
+승리하면 상대의 별 1개를 얻고, 패배하면 당신의 별 1개를 잃습니다. 무승부 시 변화는 없습니다.
+어떤 경우든 당신은 카드 1장을 소모하게 됩니다.
+당신의 생존 목표, 현재 자원, 제안자의 상태, 당신의 과거 행동 등을 고려하여 전략적으로 판단하세요.
+수락한다면 보유한 카드 중에서만 고를 수 있습니다.
+거절할 수도 있습니다. 하지만, 거절을 반복할 경우 카드를 제한시간안에 소모하지 못해 게임에 패배할 수 있습니다.""",
+}
+
+# 턴 계획 안내 (MAX_ACTIONS_PER_TURN > 1 일 때 결정 지시문 뒤에 붙음, 게임 동안 고정이므로 정적 영역)
+PLAN_INSTRUCTION = """
+- 한 턴에 최대 {max_actions}개의 행동을 순서대로 계획할 수 있습니다. 여러 함수를 실행할 순서대로 호출하세요. (예: 거래 제안 후 게임 제안)
+    - 각 행동은 앞 행동의 결과가 반영된 상태에서 다시 검증되며, 유효하지 않은 행동은 실행되지 않습니다."""
+
+
+# --- 동적 상태 ---
+def get_stats_prompt(game: 'Game', player: 'Player') -> str:
+    """플레이어 호출의 동적 영역 (현재 상태, 감정, 행동 기록, 전광판, 다른 플레이어 정보)"""
+    prompt = f"""
+        ## 현재 당신의 상태
+        {player.get_current_stats_prompt()}
+
+        ## 현재 감정
+        {player.current_emotion}
+
+        ## 당신의 과거 행동 기록
+        {player.get_action_history()}
+
+        ## 현재 게임 상황 (전광판)
+        {game.get_current_stats_prmopt()}
+
+        ## 다른 활성 플레이어 정보 (이름과 보유 별 개수만 공개됨)
+        {game.get_other_players_info_prompt(player.name)}
+    """
+    return prompt
+
+
+# --- Prompt Assembly ---
+class PromptAssembler:
+    """모든 플레이어 호출(결정/거래 응답/게임 응답/감정)의 메시지를 같은 배치로 조립합니다.
+
+    1. [system] 페르소나별 정적 프리픽스 (페르소나 + 규칙 요약): 게임당 한 번 렌더링, 호출 위치와 무관하게 바이트 단위로 동일
+    2. [system] 호출 위치별 정적 지시문 (CALL_SITE_INSTRUCTIONS)
+    3. [user] 동적 상태 (제안 내용, 현재 상태, 행동 기록 등)
+
+    가변 정보는 3번에만 두어 제공자의 프롬프트 캐시가 1~2번을 재사용할 수 있게 합니다.
+
+    단, 제공자 캐시는 모델별로 나뉘고 프리픽스가 도구 스키마(tools)부터 시작하므로, 메시지 프리픽스가 같아도
+    도구를 보내는 결정 호출과 보내지 않는 응답/감정 호출, 호출 위치별로 다른 모델(MODEL_ROUTES)로 라우팅된 호출끼리는
+    캐시를 공유하지 않습니다. (응답 호출에 전체 도구를 붙이면 매번 도구 토큰을 추가로 내야 하므로 그대로 둠)
+    실제 분리 정도는 MetricsCollector.by_prefix_group 의 그룹별 prefix_hit_ratio 로 확인합니다.
+    """
+
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self._rules = None
+        self._prefixes: Dict[str, str] = {} # 페르소나 프롬프트 -> 정적 프리픽스
+        self.prefix_renders = 0
+        self.prefix_reuses = 0
+
+    def rules(self) -> str:
+        if self._rules is None:
+            self._rules = self.game.get_game_rules_summary()
+        return self._rules
+
+    def static_prefix(self, player: 'Player') -> str:
+        prefix = self._prefixes.get(player.persona_prompt)
+        if prefix is None:
+            prefix = self._prefixes[player.persona_prompt] = player.persona_prompt + "\n\n" + self.rules()
+            self.prefix_renders += 1
+        else:
+            self.prefix_reuses += 1
+        return prefix
+
+    @staticmethod
+    def instructions(call_site: str) -> str:
+        if call_site == "decision" and config.MAX_ACTIONS_PER_TURN > 1:
+            return CALL_SITE_INSTRUCTIONS[call_site] + PLAN_INSTRUCTION.format(max_actions=config.MAX_ACTIONS_PER_TURN)
+        return CALL_SITE_INSTRUCTIONS[call_site]
+
+    def messages(self, player: 'Player', call_site: str, dynamic: str) -> List[Dict[str, Any]]:
+        return [
+            {"role": "system", "content": self.static_prefix(player)},
+            {"role": "system", "content": self.instructions(call_site)},
+            {"role": "user", "content": dynamic},
+        ]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "static_prefixes": len(self._prefixes),
+            "prefix_renders": self.prefix_renders,
+            "prefix_reuses": self.prefix_reuses,
+            "static_prefix_tokens": sorted(estimate_tokens(prefix) for prefix in self._prefixes.values()),
+        }
@@ -0,0 +1,149 @@
+from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from config import config
+from config import persona
+from tournament import build_lineup, ResultWriter, PersonaStats
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+
+
+def create_processor(kind: str, local_backend: str, workers: int):
+    from llm.batch import LocalBatchProcessor, OpenAIBatchProcessor, ExternalBatchProcessor
+    if kind == "local":
+        from llm import create_backend
+        return LocalBatchProcessor(create_backend(local_backend, instrument=False), workers)
+    if kind == "openai":
+        return OpenAIBatchProcessor()
+    return ExternalBatchProcessor()
+
+
+def run_game_thread(queue, game_index: int, game_seed: int, lineup: List[Dict[str, Any]], results: Dict[int, Any]):
+    """게임 스레드: 요청마다 배치 결과를 기다리며 게임 하나를 끝까지 진행"""
+    from custom_logger import logger
+    from game.game import Game
+
+    game_id = f"g{game_index}"
+    queue.bind_thread(game_id)
+    started = time.perf_counter()
+    try:
+        game = Game(lineup)
+        game.run_simulation()
+        result = game.get_result()
+        persona_by_name = {conf["name"]: conf["persona_name"] for conf in lineup}
+        for player_result in result["players"]:
+            player_result["persona"] = persona_by_name[player_result["name"]]
+        result.update({"game_index": game_index, "seed": game_seed, "elapsed": time.perf_counter() - started})
+        results[game_index] = result
+    except Exception as e:
+        logger.error(f"Game {game_id} failed: {e}")
+        results[game_index] = e
+    finally:
+        queue.game_finished(game_id)
+
+
+def run_sweep(games: int, base_seed: int, persona_names: List[str], players_per_game: Optional[int], loan: int,
+              processor_kind: str, local_backend: str, workers: int, batch_dir: str, out_path: str, log_level: str) -> Dict[str, Any]:
+    from custom_logger import logger, logger_final
+    from llm import set_backend
+    from llm.batch import BatchQueue, BatchBackend
+    from metrics.collector import sum_totals
+
+    logger.setLevel(getattr(logging, log_level))
+    logger_final.setLevel(getattr(logging, log_level))
+
+    # 배치 완료까지 수 시간이 걸릴 수 있으므로 마감/헤지는 끔
+    config.LLM_CALL_DEADLINE_SECONDS = None
+    config.TURN_DEADLINE_SECONDS = None
+    config.LLM_HEDGE_ENABLED = False
+
+    queue = BatchQueue(create_processor(processor_kind, local_backend, workers), batch_dir)
+    backend = BatchBackend(queue)
+    if config.METRICS_ENABLED:
+        from llm.instrumented import InstrumentedBackend
+        backend = InstrumentedBackend(backend)
+    set_backend(backend)
+
+    results: Dict[int, Any] = {}
+    threads = []
+    for index in range(games):
+        queue.register_game(f"g{index}")
+        lineup = build_lineup(base_seed + index, persona_names, players_per_game, loan)
+        threads.append(threading.Thread(target=run_game_thread, args=(queue, index, base_seed + index, lineup, results),
+                                        name=f"game-{index}", daemon=True))
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    queue.run(threads)
+    for thread in threads:
+        thread.join()
+
+    stats = defaultdict(PersonaStats)
+    writer = ResultWriter(out_path)
+    turns_total = 0
+    llm_totals = []
+    failed = 0
+    try:
+        for index in range(games):
+            result = results.get(index)
+            if not isinstance(result, dict):
+                failed += 1
+                print(f"[batch_sweep] game {index} failed: {result}")
+                continue
+            writer.write(result)
+            turns_total += result["turns"]
+            llm_totals.append(result.get("llm", {}))
+            for player_result in result["players"]:
+                stats[player_result["persona"]].add(player_result)
+    finally:
+        writer.close()
+    logger.flush()
+    logger_final.flush()
+
+    completed = games - failed
+    return {
+        "games": games,
+        "completed": completed,
+        "failed": failed,
+        "elapsed": time.perf_counter() - started,
+        "mean_turns": turns_total / completed if completed else 0.0,
+        "batch": dict(queue.get_metrics(), processor=processor_kind, directory=batch_dir),
+        "llm": sum_totals(llm_totals),
+        "personas": {name: persona_stats.to_dict() for name, persona_stats in sorted(stats.items())},
+    }
+
+
+# --- 배치 모드 일괄 실행 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="여러 게임을 lockstep 으로 진행하며 단계별 LLM 요청을 Batch API 파일로 모아 처리 (대량 오프라인 실행)")
+    parser.add_argument("--games", type=int, default=20, help="동시에 진행할 게임 수")
+    parser.add_argument("--seed", type=int, default=0, help="기본 시드 (게임 i 의 시드는 seed + i)")
+    parser.add_argument("--players", default=",".join(persona.DEFAULT_LINEUP), help="참가 페르소나 목록 (쉼표 구분, config/persona.py 의 PERSONAS 키)")
+    parser.add_argument("--players-per-game", type=int, default=None, help="지정 시 --players 에서 게임마다 이 수만큼 추첨 (중복 허용)")
+    parser.add_argument("--loan", type=int, default=3000000, help="플레이어별 초기 대출금")
+    parser.add_argument("--processor", default="local", choices=["local", "openai", "external"],
+                        help="배치 처리기: local (로컬 백엔드로 처리), openai (Batch API 업로드), external (결과 파일 대기)")
+    parser.add_argument("--local-backend", default="mock", choices=["mock", "openai"], help="local 처리기가 사용할 백엔드")
+    parser.add_argument("--workers", type=int, default=config.BATCH_LOCAL_WORKERS, help="local 처리기의 동시 처리 수")
+    parser.add_argument("--batch-dir", default=None, help="배치 파일 디렉토리 (기본값: BATCH_DIR/<타임스탬프>)")
+    parser.add_argument("--out", default="results/batch_sweep.jsonl", help="결과 파일 (.jsonl 또는 .parquet)")
+    parser.add_argument("--log-level", default="WARNING", help="로그 레벨")
+    args = parser.parse_args()
+
+    persona_names = [name.strip() for name in args.players.split(",") if name.strip()]
+    unknown = [name for name in persona_names if name not in persona.PERSONAS]
+    if unknown:
+        parser.error(f"Unknown personas: {unknown}. Available: {list(persona.PERSONAS)}")
+    batch_dir = args.batch_dir or os.path.join(config.BATCH_DIR, time.strftime("%Y%m%d_%H%M%S"))
+
+    summary = run_sweep(args.games, args.seed, persona_names, args.players_per_game, args.loan, args.processor,
+                        args.local_backend, args.workers, batch_dir, args.out, args.log_level.upper())
+
+    summary_path = os.path.splitext(args.out)[0] + ".summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(json.dumps({key: value for key, value in summary.items() if key != "personas"}, ensure_ascii=False, indent=2))
@@ -0,0 +1,242 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_PLAYERS = "5,30,300,3000"
+DEFAULT_TURNS = "24,240"
+DEFAULT_MAX_PLAYER_TURNS = 7200 # 플레이어 수 x 측정 턴 수가 이보다 큰 조합은 건너뜀 (--max-player-turns 0: 제한 없음)
+
+
+# --- 측정 (자식 프로세스) ---
+
+def run_scenario(players: int, turns: int, measure_turns: int, seed: int, trace_allocations: bool, log_level: str) -> dict:
+    """오프라인 mock 백엔드(지연 0)로 게임 하나를 돌리며 엔진 쪽 비용만 측정 (measure_turns > 0 이면 그 턴 수까지만)"""
+    import logging
+    import resource
+    import tracemalloc
+
+    os.environ["LLM_BACKEND"] = "mock"
+    from config import config
+    from config import persona
+    config.MAX_TURNS = turns
+    config.MOCK_LLM_LATENCY = 0.0
+    config.MOCK_LLM_LATENCY_JITTER = 0.0
+    config.MOCK_LLM_SEED = seed
+
+    from custom_logger import logger, logger_final
+    from llm import LLMBackend, create_backend, set_backend
+    from metrics.collector import Histogram
+    from tournament import build_lineup
+    import agent.agent
+    import agent.prompts
+    import game.game
+    import game.market
+
+    logger.setLevel(getattr(logging, log_level))
+    logger_final.setLevel(getattr(logging, log_level))
+
+    # get_stats_prompt 소요 시간 (import 된 모든 모듈의 이름을 교체)
+    stats_prompt = Histogram()
+    original = agent.prompts.get_stats_prompt
+
+    def timed_stats_prompt(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            stats_prompt.observe(time.perf_counter() - started)
+
+    for module in (agent.agent, agent.prompts, game.game, game.market):
+        module.get_stats_prompt = timed_stats_prompt
+
+    class PromptSizeBackend(LLMBackend):
+        """호출 위치별 요청 크기(메시지 + 도구 정의, UTF-8 바이트)를 기록하는 래퍼"""
+
+        name = "prompt_size"
+
+        def __init__(self, backend: LLMBackend):
+            self.backend = backend
+            self.sizes = {}
+
+        def _observe(self, request, meta):
+            size = len(json.dumps(request.get("messages", []), ensure_ascii=False).encode("utf-8"))
+            size += len(json.dumps(request.get("tools") or [], ensure_ascii=False).encode("utf-8"))
+            self.sizes.setdefault((meta or {}).get("call_site") or "unknown", []).append(size)
+
+        def complete(self, request, meta=None):
+            self._observe(request, meta)
+            return self.backend.complete(request, meta)
+
+        async def acomplete(self, request, meta=None):
+            self._observe(request, meta)
+            return await self.backend.acomplete(request, meta)
+
+    backend = PromptSizeBackend(create_backend("mock"))
+    set_backend(backend)
+
+    if trace_allocations:
+        tracemalloc.start(10)
+    lineup = build_lineup(seed, list(persona.PERSONAS), players, 3000000)
+    started = time.perf_counter()
+    game_instance = game.game.Game(lineup)
+    construct_seconds = time.perf_counter() - started
+
+    turn_times = Histogram()
+
+    def measuring() -> bool:
+        return not game_instance.game_over and not (measure_turns and turn_times.count >= measure_turns)
+
+    async def run_async():
+        while measuring():
+            turn_started = time.perf_counter()
+            await game_instance.progress_turn_async()
+            turn_times.observe(time.perf_counter() - turn_started)
+
+    if config.USE_ASYNC_TURN_ENGINE:
+        import asyncio
+        asyncio.run(run_async())
+    else:
+        while measuring():
+            turn_started = time.perf_counter()
+            game_instance.progress_turn()
+            turn_times.observe(time.perf_counter() - turn_started)
+    total_seconds = time.perf_counter() - started
+
+    allocations = None
+    if trace_allocations:
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+        tracemalloc.stop()
+        allocations = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top_sites": [{"site": str(stat.traceback), "bytes": stat.size, "blocks": stat.count} for stat in top],
+        }
+    logger.flush()
+    logger_final.flush()
+
+    def summary(histogram: Histogram) -> dict:
+        return {key: value for key, value in histogram.to_dict().items() if key != "buckets"}
+
+    prompt_bytes = {
+        call_site: {"calls": len(sizes), "mean": round(sum(sizes) / len(sizes), 1), "max": max(sizes), "total": sum(sizes)}
+        for call_site, sizes in sorted(backend.sizes.items())
+    }
+    llm_calls = sum(len(sizes) for sizes in backend.sizes.values())
+    return {
+        "players": players,
+        "max_turns": turns,
+        "turns_played": turn_times.count,
+        "engine": "async" if config.USE_ASYNC_TURN_ENGINE else "sync",
+        "construct_seconds": round(construct_seconds, 6),
+        "total_seconds": round(total_seconds, 6),
+        "turn_seconds": summary(turn_times),
+        "stats_prompt_seconds": summary(stats_prompt),
+        "stats_prompt_share": round(stats_prompt.sum / total_seconds, 4) if total_seconds else 0.0,
+        "llm_calls": llm_calls,
+        "prompt_bytes": prompt_bytes,
+        "prompt_bytes_per_call": round(sum(s["total"] for s in prompt_bytes.values()) / llm_calls, 1) if llm_calls else 0.0,
+        "phases": {name: summary(histogram) for name, histogram in sorted(game_instance.metrics.phases.items())},
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, # Linux: KB
+        "allocations": allocations,
+    }
+
+
+# --- 실행/비교 (부모 프로세스) ---
+
+def spawn(players: int, turns: int, measure_turns: int, seed: int, trace_allocations: bool, log_level: str, timeout: float) -> dict:
+    """시나리오마다 새 인터프리터에서 실행 (최대 RSS 를 시나리오별로 분리)"""
+    command = [sys.executable, os.path.abspath(__file__), "--child", f"{players}x{turns}", "--measure-turns", str(measure_turns),
+               "--seed", str(seed), "--log-level", log_level]
+    if trace_allocations:
+        command.append("--tracemalloc")
+    env = dict(os.environ, PYTHONPATH=SOURCE_DIR, PYTHONDONTWRITEBYTECODE="1", LOG_ASYNC=os.getenv("LOG_ASYNC", "1"))
+    with tempfile.TemporaryDirectory() as cwd: # 로그/결과 파일은 임시 디렉토리에
+        try:
+            output = subprocess.run(command, cwd=cwd, env=env, capture_output=True, text=True, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {"players": players, "max_turns": turns, "error": f"timeout after {timeout:.0f}s"}
+    if output.returncode != 0:
+        errors = [line for line in output.stderr.strip().splitlines() if not line.startswith("[")] # 로그 줄 제외
+        return {"players": players, "max_turns": turns, "error": errors[-1] if errors else f"exit code {output.returncode}"}
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SOURCE_DIR, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(results: list, baseline_path: str):
+    """이전 결과 파일과 시나리오별 턴 평균 시간 / 호출당 프롬프트 바이트 / 최대 RSS 비교 출력"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {(r["players"], r["max_turns"]): r for r in json.load(f)["results"] if "error" not in r}
+    print(f"\ncompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["players"], result["max_turns"]))
+        if before is None or "error" in result:
+            continue
+        ratios = []
+        for label, key in (("turn_mean", lambda r: r["turn_seconds"]["mean"]), ("prompt_bytes", lambda r: r["prompt_bytes_per_call"]), ("rss", lambda r: r["peak_rss_kb"])):
+            old, new = key(before), key(result)
+            ratios.append(f"{label} x{new / old:.2f}" if old else f"{label} n/a")
+        print(f"{result['players']:>5}p x {result['max_turns']:>3}t  " + "  ".join(ratios))
+
+
+# --- 엔진 오버헤드 벤치마크 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM 지연을 0 으로 둔 mock 백엔드로 엔진/프롬프트 구성/로깅 오버헤드의 규모별 곡선 측정")
+    parser.add_argument("--players", default=DEFAULT_PLAYERS, help="플레이어 수 목록 (쉼표 구분)")
+    parser.add_argument("--turns", default=DEFAULT_TURNS, help="최대 턴 수 목록 (쉼표 구분)")
+    parser.add_argument("--measure-turns", type=int, default=0, help="시나리오마다 이 턴 수까지만 측정 (0: 게임 끝까지, 대규모 로비용)")
+    parser.add_argument("--max-player-turns", type=int, default=DEFAULT_MAX_PLAYER_TURNS, help="플레이어 수 x 측정 턴 수 상한 (0: 제한 없음)")
+    parser.add_argument("--seed", type=int, default=0, help="구성/mock 응답 시드")
+    parser.add_argument("--tracemalloc", action="store_true", help="할당 추적 (peak/상위 할당 위치, 시간 측정값이 느려짐)")
+    parser.add_argument("--log-level", default="INFO", help="게임 로그 레벨 (로깅 비용 포함 측정이 기본)")
+    parser.add_argument("--timeout", type=float, default=3600.0, help="시나리오별 제한 시간 (초)")
+    parser.add_argument("--out", default=None, help="결과 JSON 파일 경로")
+    parser.add_argument("--compare", default=None, help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS) # 내부용: "<players>x<turns>"
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, SOURCE_DIR)
+        players, turns = (int(value) for value in args.child.split("x"))
+        print(json.dumps(run_scenario(players, turns, args.measure_turns, args.seed, args.tracemalloc, args.log_level.upper()), ensure_ascii=False))
+        sys.exit(0)
+
+    results = []
+    for players in (int(value) for value in args.players.split(",")):
+        for turns in (int(value) for value in args.turns.split(",")):
+            measured = min(turns, args.measure_turns) if args.measure_turns else turns
+            if args.max_player_turns and players * measured > args.max_player_turns:
+                print(f"{players:>5}p x {turns:>3}t  skipped (players x turns > {args.max_player_turns}, use --measure-turns or --max-player-turns)")
+                continue
+            result = spawn(players, turns, args.measure_turns, args.seed, args.tracemalloc, args.log_level.upper(), args.timeout)
+            results.append(result)
+            if "error" in result:
+                print(f"{players:>5}p x {turns:>3}t  failed ({result['error']})")
+                continue
+            print(f"{players:>5}p x {turns:>3}t  turns={result['turns_played']:<4} "
+                  f"turn mean={result['turn_seconds']['mean'] * 1000:9.1f} ms  p90={result['turn_seconds']['p90'] * 1000:9.1f} ms  "
+                  f"stats_prompt={result['stats_prompt_share'] * 100:5.1f}%  bytes/call={result['prompt_bytes_per_call']:>9.0f}  "
+                  f"rss={result['peak_rss_kb'] / 1024:7.1f} MB")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if args.out:
+        out_dir = os.path.dirname(args.out)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"commit": git_commit(), "python": sys.version.split()[0], "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                       "results": results}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 측정 대상: (이름, import 전 준비 코드, 측정할 코드)
+TARGETS = [
+    ("interpreter", "", "pass"),
+    ("stdlib_floor", "", "import typing, logging, json"),
+    ("config", "", "from config import config"),
+    ("player", "", "import player.player"),
+    ("rules_engine", "", "import game.game"),
+    ("agent", "", "import agent.agent"),
+    ("game_construct", "import os; os.environ['LLM_BACKEND'] = 'mock'",
+     "from game.game import Game; Game([{'name': n, 'persona': n, 'loan': 0} for n in 'abcd'])"),
+    ("openai_sdk", "", "import openai"),
+]
+
+# 측정 코드 실행 후 부작용 점검 (네트워크 가능 객체, 파일 시스템, 스레드)
+PROBE = """
+import sys, threading, time, os, json
+{setup}
+_started = time.perf_counter()
+{code}
+_elapsed = time.perf_counter() - _started
+print(json.dumps({{
+    "ms": _elapsed * 1000,
+    "openai_imported": "openai" in sys.modules,
+    "asyncio_imported": "asyncio" in sys.modules,
+    "ssl_imported": "ssl" in sys.modules,
+    "threads": threading.active_count(),
+    "logs_dir_created": os.path.exists("logs"),
+}}))
+"""
+
+
+def measure(setup: str, code: str, repeat: int):
+    """새 인터프리터에서 repeat 번 실행하고 (중앙값 ms, 마지막 실행의 부작용 점검 결과) 반환"""
+    samples = []
+    probe = None
+    env = dict(os.environ, PYTHONPATH=SOURCE_DIR, PYTHONDONTWRITEBYTECODE="1")
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as cwd: # 로그 디렉토리 생성 여부를 깨끗한 작업 디렉토리에서 확인
+            output = subprocess.run(
+                [sys.executable, "-c", PROBE.format(setup=setup, code=code)],
+                cwd=cwd, env=env, capture_output=True, text=True,
+            )
+        if output.returncode != 0:
+            return None, {"error": output.stderr.strip().splitlines()[-1] if output.stderr.strip() else "failed"}
+        probe = json.loads(output.stdout.strip().splitlines()[-1])
+        samples.append(probe.pop("ms"))
+    return statistics.median(samples), probe
+
+
+# --- 시작 시간 벤치마크 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="모듈 import / 게임 생성 시작 시간 측정 (새 인터프리터 기준 중앙값)")
+    parser.add_argument("--repeat", type=int, default=7, help="대상별 실행 횟수")
+    parser.add_argument("--out", default=None, help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = {}
+    for name, setup, code in TARGETS:
+        median_ms, probe = measure(setup, code, args.repeat)
+        results[name] = dict(probe, median_ms=median_ms)
+        if median_ms is None:
+            print(f"{name:<16} skipped ({probe['error']})")
+            continue
+        flags = ", ".join(key.replace("_imported", "") for key in ("openai_imported", "asyncio_imported", "ssl_imported") if probe[key])
+        print(f"{name:<16} {median_ms:8.1f} ms  threads={probe['threads']}  logs_dir={probe['logs_dir_created']}  loaded=[{flags}]")
+
+    floor = results["stdlib_floor"]["median_ms"]
+    rules = results["rules_engine"]
+    print(f"\nrules_engine over stdlib floor: {rules['median_ms'] - floor:.1f} ms "
+          f"(openai={rules['openai_imported']}, threads={rules['threads']}, logs_dir={rules['logs_dir_created']})")
+
+    if args.out:
+        out_dir = os.path.dirname(args.out)
+        if out_dir and not os.path.exists(out_dir):
+            os.makedirs(out_dir)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"repeat": args.repeat, "python": sys.version.split()[0], "results": results}, f, ensure_ascii=False, indent=2)
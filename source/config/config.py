@@ -5,6 +5,148 @@ TOTAL_PLAYERS = 5 # 시뮬레이션 규모 조절 (원작: 30)
 MAX_TURNS = 6 * 4 # 4시간 / 10분
 TIME_PER_TURN = 10 # 분
 
+# --- 턴 엔진 설정 ---
+USE_ASYNC_TURN_ENGINE = True # True: 턴 시작 시점 상태로 모든 플레이어의 결정을 동시에 요청
+MAX_CONCURRENT_REQUESTS = 8 # 비동기 턴 엔진의 동시 API 요청 수 제한
+MAX_ACTIONS_PER_TURN = 3 # 결정 응답 1회에 담긴 함수 호출(턴 계획)을 이 수까지 순서대로 실행 (1: 첫 번째 호출만)
+
+# --- LLM 백엔드 설정 ---
+LLM_BACKEND = "openai" # "openai" | "mock" (환경변수 LLM_BACKEND 로 덮어쓰기 가능)
+MOCK_LLM_SEED = 0 # mock 백엔드 응답 시드
+MOCK_LLM_LATENCY = 0.0 # mock 백엔드 응답 지연 (초)
+MOCK_LLM_LATENCY_JITTER = 0.0 # mock 백엔드 응답 지연 편차 (초)
+MOCK_LLM_PLAN_PROB = 0.3 # mock 백엔드가 턴 계획에 행동을 하나 더 붙일 확률 (MAX_ACTIONS_PER_TURN 까지)
+
+# --- 행동 기록 압축 설정 (프롬프트에 넣는 과거 기록의 크기 제한) ---
+HISTORY_KEEP_RECENT = 8 # 원문 그대로 유지할 최근 기록 수
+HISTORY_FOLD_CHUNK = 8 # 오래된 기록이 이만큼 쌓이면 롤링 요약에 접어 넣음
+HISTORY_TOKEN_BUDGET = 800 # 프롬프트 1회당 행동 기록 섹션의 토큰 예산
+HISTORY_SUMMARY_MODEL = "gpt-4o-mini"
+HISTORY_SUMMARY_MAX_SENTENCES = 6
+
+# --- 다른 플레이어 정보 시야 (대규모 로비에서 프롬프트의 다른 플레이어 목록 크기 제한, game/visibility.py) ---
+VISIBILITY_TOKEN_BUDGET = 400 # 다른 플레이어 목록의 토큰 예산. 전체 목록이 넘치면 아래 항목 + 별 개수별 집계로 대체
+VISIBILITY_TOP_K = 5 # 별 개수 상위
+VISIBILITY_RECENT_PARTNERS = 5 # 최근 상호작용(거래/게임/제안) 상대
+VISIBILITY_CANDIDATES = 5 # 필요한 것을 가진 상대 (별이 부족하면 별이 남는 플레이어, 아니면 별이 부족한 플레이어)
+VISIBILITY_STAR_BIN_MAX = 6 # 집계 구간: 별 0 ~ N-1개는 개수별, N개 이상은 하나로
+
+# --- LLM 응답 캐시 설정 (같은 시드/설정의 재실행을 디스크에서 재생) ---
+LLM_CACHE_ENABLED = False # 환경변수 LLM_CACHE=1 로도 활성화 가능
+LLM_CACHE_PATH = "cache/llm_cache.sqlite3"
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024 # 256MB, 초과 시 LRU 삭제
+
+# --- 요청 스케줄러 설정 (OpenAI 백엔드 앞단의 속도 제한/재시도/서킷 브레이커) ---
+LLM_SCHEDULER_ENABLED = True
+LLM_RATE_LIMIT_RPM = 500 # 분당 요청 수
+LLM_RATE_LIMIT_TPM = 200000 # 분당 토큰 수 (프롬프트 추정치 + 예상 응답 토큰으로 선차감, 응답 후 usage 로 정산)
+LLM_RATE_LIMIT_SHARED_PATH = None # 지정 시 이 SQLite 파일로 여러 프로세스가 한도를 공유 (환경변수 LLM_RATE_LIMIT_SHARED_PATH)
+LLM_EXPECTED_COMPLETION_TOKENS = 512 # max_tokens 가 없는 요청의 응답 토큰 예상치
+LLM_MODEL_CONCURRENCY = {"gpt-4.1": 8, "gpt-4o-mini": 16} # 모델별 동시 요청 수
+LLM_DEFAULT_MODEL_CONCURRENCY = 8
+LLM_MAX_RETRIES = 5
+LLM_RETRY_BASE_DELAY = 0.5 # 초, 지수 백오프 기준 (full jitter)
+LLM_RETRY_MAX_DELAY = 30.0
+LLM_CIRCUIT_FAILURE_THRESHOLD = 5 # 모델별 연속 실패 횟수
+LLM_CIRCUIT_RESET_SECONDS = 30.0 # 차단 후 시험 호출까지 대기 시간
+
+# --- 마감/헤지 설정 (느린 호출 하나가 턴 전체를 붙잡지 않도록) ---
+LLM_CALL_DEADLINE_SECONDS = 60.0 # 호출 1회 마감 (None: 제한 없음). 넘기면 저비용 정책으로 대체
+TURN_DEADLINE_SECONDS = 300.0 # 턴 전체 마감 (None: 제한 없음). 남은 호출의 마감은 턴 마감을 넘지 않음
+LLM_HEDGE_ENABLED = True # 호출 위치별 지연 분위수를 넘기면 같은 요청을 한 번 더 보내 먼저 온 응답 사용
+LLM_HEDGE_PERCENTILE = 0.95
+LLM_HEDGE_MIN_SAMPLES = 10 # 분위수 계산에 필요한 최소 샘플 수 (부족하면 LLM_HEDGE_DEFAULT_DELAY)
+LLM_HEDGE_DEFAULT_DELAY = 20.0 # 초
+LLM_HEDGE_MIN_DELAY = 1.0 # 초, 헤지 기준 시간 하한 (빠른 호출의 불필요한 중복 방지)
+DEADLINE_FALLBACK_POLICY = "heuristic" # 마감 초과 시 행동: "heuristic" (카드 소진 우선 규칙) | "do_nothing"
+
+# --- 로깅 설정 (custom_logger) ---
+LOG_DIR = "logs"
+LOG_ASYNC = True # True: QueueHandler/QueueListener 로 기록을 별도 스레드에 위임 (환경변수 LOG_ASYNC=0/1 로 덮어쓰기 가능)
+LOG_FORMAT = "text" # 파일 로그 형식 "text" | "json" (JSON lines, 환경변수 LOG_FORMAT 로 덮어쓰기 가능)
+LOG_MAX_BYTES = 10 * 1024 * 1024 # 10MB
+LOG_BACKUP_COUNT = 5
+LOG_COMPRESS_ROTATED = True # 회전된 백업 파일을 gzip 으로 압축
+
+# --- 거래 시장 모드 (턴 동안의 거래 제안을 주문장에 모아 턴 종료 시 일괄 체결) ---
+TRADE_MARKET_MODE = False # 환경변수 TRADE_MARKET=1 로도 활성화 가능
+MARKET_MAX_OFFERS_PER_BATCH = 10 # 상대방별 응답 요청 1회에 넣을 최대 제안 수
+MARKET_RESPONSE_MODEL = "gpt-4.1"
+
+# --- 서사 요약 (map-reduce: 턴 구간 요약 -> 계층 병합 -> 최종 서사 스트리밍) ---
+NARRATIVE_INCREMENTAL = True # 게임 진행 중 끝난 구간을 백그라운드로 미리 요약 (main.py)
+NARRATIVE_WINDOW_TURNS = 4 # 구간 요약 1회에 포함할 턴 수
+NARRATIVE_MAX_CHUNK_TOKENS = 6000 # 구간 로그가 이보다 길면 여러 조각으로 나눠 요약
+NARRATIVE_SUMMARY_MAX_TOKENS = 600 # 구간/병합 요약 1회의 응답 토큰 상한
+NARRATIVE_MERGE_FANOUT = 4 # 병합 1회에 합칠 요약 수
+NARRATIVE_FINAL_INPUT_TOKENS = 8000 # 최종 서사 요청에 넣을 요약 토큰 합 상한 (넘으면 한 단계 더 병합)
+NARRATIVE_MAX_WORKERS = 4 # 구간 요약/병합 동시 요청 수
+NARRATIVE_MAP_MODEL = "gpt-4.1-mini" # 구간 요약/병합 모델
+NARRATIVE_MODEL = "gpt-4.1" # 최종 서사 모델
+NARRATIVE_MAX_TOKENS = 2048
+
+# --- 배치 모드 (batch_sweep.py: 여러 게임을 lockstep 으로 진행하며 단계별 요청을 Batch API 파일로 제출) ---
+BATCH_DIR = "batches" # 실행마다 하위 디렉토리 생성 (batch_NNNNN.input/meta/output.jsonl)
+BATCH_MAX_REQUESTS = 50000 # 배치 1개의 최대 요청 수 (Batch API 한도)
+BATCH_SETTLE_SECONDS = 0.2 # 모든 게임이 응답 대기 중이고 이 시간 동안 새 요청이 없으면 배치 제출
+BATCH_POLL_SECONDS = 30.0 # OpenAI/외부 처리기 결과 확인 주기
+BATCH_COMPLETION_WINDOW = "24h"
+BATCH_LOCAL_WORKERS = 8 # 로컬 처리기의 동시 처리 수
+
+# --- 체크포인트 설정 (main.py) ---
+CHECKPOINT_DIR = "checkpoints" # 실행마다 하위 디렉토리 생성, --resume <디렉토리> 로 이어서 실행
+
+# --- 계측 설정 (LLM 호출/게임 단계별 지연, 토큰, 비용) ---
+METRICS_ENABLED = True
+METRICS_DIR = "results/metrics" # 게임별 JSON 리포트 저장 위치
+METRICS_PROMETHEUS = False # True 면 Prometheus 텍스트(.prom)도 저장 (환경변수 METRICS_PROMETHEUS=1 로도 활성화)
+# 모델별 1M 토큰당 가격 (USD, 비용 추정용)
+MODEL_PRICES = {
+    "gpt-4.1": {"input": 2.00, "cached_input": 0.50, "output": 8.00},
+    "gpt-4.1-mini": {"input": 0.40, "cached_input": 0.10, "output": 1.60},
+    "gpt-4o-mini": {"input": 0.15, "cached_input": 0.075, "output": 0.60},
+}
+
+# --- 모델 라우팅 (호출 위치/상황별 모델 선택, game/routing.py) ---
+MODEL_ROUTING_ENABLED = True # False 면 아래 기본 모델만 사용 (상황 규칙/예산 강등 없음)
+# 호출 위치별 기본 모델 (없는 호출 위치는 NARRATIVE_MODEL, MARKET_RESPONSE_MODEL 등 각자의 설정값)
+MODEL_ROUTES = {
+    "decision": "gpt-4.1",
+    "trade_response": "gpt-4.1",
+    "match_response": "gpt-4.1",
+    "emotion": "gpt-4o-mini",
+}
+MODEL_LADDER = ("gpt-4o-mini", "gpt-4.1-mini", "gpt-4.1") # 저렴한 순. 예산 강등은 한 단계씩 아래로, 승격은 맨 위로
+ROUTING_SMALL_MODEL = "gpt-4.1-mini" # 단순한 결정에 쓰는 모델
+ROUTING_SIMPLE_MATCH_MAX_CARD_TYPES = 1 # 게임 응답에서 낼 수 있는 카드 종류가 이 이하이면 단순한 결정
+ROUTING_ENDGAME_FINISHED_RATIO = 0.8 # 탈락/퇴장한 플레이어 비율이 이 이상이면 판세가 거의 결정된 것으로 보고 작은 모델 사용
+ROUTING_COMPLEX_TRADE_ITEMS = 3 # 거래에 오가는 자원 종류가 이 이상이면 복잡한 거래로 보고 가장 큰 모델로 승격
+ROUTING_COST_BUDGET_USD = None # 게임당 추정 비용 예산 (None: 제한 없음, 환경변수 ROUTING_COST_BUDGET_USD)
+ROUTING_LATENCY_BUDGET_SECONDS = None # 게임당 LLM 호출 지연 합계 예산 (None: 제한 없음, 환경변수 ROUTING_LATENCY_BUDGET_SECONDS)
+ROUTING_BUDGET_SOFT_RATIO = 0.7 # 예산의 이 비율을 넘으면 한 단계 강등, 예산을 넘으면 가장 저렴한 모델
+
+# --- 프로파일링 훅 (턴/handle_action/LLM 호출 위치, 꺼져 있으면 no-op) ---
+PROFILE_MODES = () # "cprofile", "sampling", "tracemalloc", "spans" 중 선택 (환경변수 PROFILE=cprofile,spans)
+PROFILE_TURNS = None # 프로파일링할 턴 "3,10-12" (None: 모든 턴, 환경변수 PROFILE_TURNS)
+PROFILE_CALL_SITES = None # spans 에 기록할 LLM 호출 위치 "decide_action,trade_response" (None: 전체, 환경변수 PROFILE_CALL_SITES)
+PROFILE_DIR = "results/profiles" # 게임마다 하위 디렉토리, 턴마다 turn_NNNN.* 산출물
+PROFILE_SAMPLE_INTERVAL = 0.005 # 초, sampling 모드의 스택 수집 간격
+PROFILE_TRACEMALLOC_FRAMES = 10 # tracemalloc 이 저장할 호출 스택 깊이
+PROFILE_TRACEMALLOC_TOP = 30 # 턴별 할당 증가 상위 위치 수
+
+# --- Fast-path 정책 설정 (규칙만으로 결론이 나는 결정은 LLM 호출 생략, 페르소나별 덮어쓰기: persona.FAST_PATH_OVERRIDES) ---
+SURVIVAL_STARS = 3 # 생존 조건: 카드 0장 + 별 SURVIVAL_STARS 개 이상
+FAST_PATH_DEFAULTS = {
+    "auto_exit": True, # 생존 조건을 만족하고 남는 별이 없으면(또는 마지막 턴이면) 즉시 탈출
+    "auto_exit_with_surplus": False, # 남는 별이 있어도 즉시 탈출 (False 면 별 판매 여부는 LLM 판단)
+    "auto_pass_without_targets": True, # 상호작용할 상대가 없으면 do_nothing
+    "auto_reject_unfulfillable": True, # 어느 한쪽이 자원을 보유하지 않아 성사될 수 없는 거래는 거절
+    "auto_reject_self_elimination": True, # 거래 후 별이 0개가 되는 거래는 거절
+    "auto_accept_gifts": False, # 대가 없이 별/현금만 받는 거래는 수락
+    "auto_reject_risky_match": False, # 별이 1개뿐이면 게임 제안 거절
+    "restrict_tools": True, # 규칙상 불가능한 행동(카드 없이 게임 제안, 조건 미달 탈출)을 도구 목록에서 제외
+}
+
 # --- 플레이어 상태 ---
 PLAYER_STATUS_ACTIVE = "ACTIVE"
 PLAYER_STATUS_ELIMINATED_NO_STAR = "ELIMINATED (No Stars)"
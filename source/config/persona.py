@@ -167,4 +167,26 @@ makita_persona = """
 
 너의 목표는 다른 사람에게 의존하여 게임에서 살아남는 것이다.
 강해 보이거나 친절해 보이는 플레이어를 찾아 도움을 요청하고, 그들의 보호를 받으며 카드를 소진하고 별을 유지하라. 어리숙한 태도로 경계심을 풀게 하고, 동정심을 유발하여 거래나 게임에서 유리한 조건을 얻어낼 수도 있다. 살아남기 위해서는 어떤 역할이든 마다하지 않을 것이다.
-"""
\ No newline at end of file
+"""
+# --- 페르소나 목록 (플레이어 이름 -> 페르소나) ---
+PERSONAS = {
+    "카이지": kaiji_persona,
+    "안도": ando_persona,
+    "후루하타": huruhata_persona,
+    "키타미": kitami_persona,
+    "후나이": funai_persona,
+    "사카자키": sakazaki_persona,
+    "이시다": ishida_persona,
+    "니시노": nishino_persona,
+    "오오츠키": ohtsuki_persona,
+    "마키타": makita_persona,
+}
+
+# main.py 기본 참가자
+DEFAULT_LINEUP = ["카이지", "안도", "후루하타", "키타미", "후나이"]
+
+# 페르소나별 fast-path 정책 덮어쓰기 (config.FAST_PATH_DEFAULTS 참고)
+FAST_PATH_OVERRIDES = {
+    "안도": {"auto_reject_risky_match": True, "auto_accept_gifts": True}, # 겁 많고 기회주의적
+    "후루하타": {"auto_reject_risky_match": True}, # 갈등 상황에서 불안해하며 위험 회피
+}
@@ -1,4 +1,4 @@
-from .logger import Logger
+from .logger import Logger, LazyJson
 
 logger = Logger('app')
 logger_final = Logger('final')
@@ -0,0 +1,71 @@
+import gzip
+import json
+import logging
+import os
+import shutil
+from logging.handlers import RotatingFileHandler, QueueHandler
+
+
+FILE_ONLY = {"file_only": True} # logger.info(..., extra=FILE_ONLY): 콘솔에는 출력하지 않고 파일에만 기록
+
+
+class ConsoleFilter(logging.Filter):
+    """extra=FILE_ONLY 로 남긴 레코드를 콘솔 핸들러에서 제외 (이미 stdout 에 직접 출력한 내용 등)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not getattr(record, "file_only", False)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """한 줄에 레코드 하나씩 JSON 으로 기록 (ts, level, logger, message, thread[, exc])"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": record.created,
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """회전된 백업 파일을 gzip 으로 압축 (app.log.1.gz, app.log.2.gz, ...)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._gzip_rotator
+
+    @staticmethod
+    def _gzip_rotator(source: str, dest: str):
+        with open(source, "rb") as f_in, gzip.open(dest, "wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+class LazyQueueHandler(QueueHandler):
+    """포맷을 리스너 스레드로 미루는 QueueHandler
+
+    기본 QueueHandler.prepare 는 호출 스레드에서 메시지를 완성하지만, 여기서는 인자가 불변 값일 때
+    레코드를 그대로 넘겨 타임스탬프/JSON 포맷과 문자열 보간을 모두 리스너 스레드에서 처리합니다.
+    (가변 객체 인자는 이후 변경될 수 있으므로 호출 스레드에서 미리 보간)
+    """
+
+    _IMMUTABLE = (str, int, float, bool, type(None), tuple)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, self._IMMUTABLE) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
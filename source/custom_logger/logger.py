@@ -1,33 +1,102 @@
+import json
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+
+from config import config
+
+
+class LazyJson:
+    """json.dumps 를 실제로 로그가 기록될 때까지 미루는 래퍼
+
+    logger.debug("...%s", LazyJson(messages)) 처럼 쓰면 DEBUG 가 꺼져 있을 때 직렬화 비용이 들지 않습니다.
+    """
+
+    __slots__ = ("obj", "indent")
+
+    def __init__(self, obj, indent: int = 2):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self) -> str:
+        return json.dumps(self.obj, indent=self.indent, ensure_ascii=False, default=str)
+
 
 class Logger:
+    """logging.Logger 래퍼. 디렉토리/핸들러/리스너 스레드는 첫 사용 시점(setup)에 만들어집니다.
+
+    모듈 import 만으로는 파일 시스템이나 스레드에 아무 부작용이 없습니다.
+    """
+
     def __init__(self,
                  name: str = __name__,
-                 log_dir: str = 'logs',
+                 log_dir: str = None,
                  log_file: str = None,
                  level: int = logging.INFO,
-                 max_bytes: int = 10 * 1024 * 1024,  # 10MB
-                 backup_count: int = 5):
+                 max_bytes: int = None,
+                 backup_count: int = None,
+                 async_mode: bool = None,
+                 log_format: str = None,
+                 compress: bool = None):
         """
         범용 로거 클래스
 
         :param name: 로거 이름
         :param log_dir: 로그 파일 저장 디렉토리
-        :param log_file: 로그 파일 이름 (기본값은 name.log)
+        :param log_file: 로그 파일 이름 (기본값은 name.log, json 형식이면 name.jsonl)
         :param level: 로그 레벨 (e.g., logging.DEBUG)
         :param max_bytes: 로그 파일 최대 크기 (바이트 단위)
         :param backup_count: 백업할 로그 파일 개수
+        :param async_mode: True 면 QueueHandler 로 큐에 넣고 QueueListener 스레드가 콘솔/파일에 기록
+        :param log_format: 파일 로그 형식 ("text" | "json", 콘솔은 항상 text)
+        :param compress: 회전된 백업 파일을 gzip 으로 압축
         """
         self.name = name
-        self.log_dir = log_dir
-        self.log_file = log_file or f'{name}.log'  # name을 기반으로 파일명 지정
+        self.log_dir = log_dir or config.LOG_DIR
+        self.log_format = log_format or os.getenv("LOG_FORMAT", config.LOG_FORMAT)
+        self.log_file = log_file or f'{name}.{"jsonl" if self.log_format == "json" else "log"}'  # name을 기반으로 파일명 지정
         self.level = level
-        self.max_bytes = max_bytes
-        self.backup_count = backup_count
+        self.max_bytes = max_bytes or config.LOG_MAX_BYTES
+        self.backup_count = backup_count if backup_count is not None else config.LOG_BACKUP_COUNT
+        self.async_mode = async_mode if async_mode is not None else (os.getenv("LOG_ASYNC", "1" if config.LOG_ASYNC else "0") == "1")
+        self.compress = compress if compress is not None else config.LOG_COMPRESS_ROTATED
+
+        self._queue = None
+        self._queue_handler = None
+        self._listener = None
+        self._handlers = []
+        self._logger = None
+        self._hooks_registered = False
 
-        self._logger = self._create_logger()
+    def setup(self) -> logging.Logger:
+        """로거를 명시적으로 생성합니다. (이미 생성되었으면 그대로 반환)"""
+        if self._logger is None:
+            self._logger = self._create_logger()
+        return self._logger
+
+    def _create_handlers(self):
+        from logging.handlers import RotatingFileHandler
+        from .handlers import CompressedRotatingFileHandler, JsonLinesFormatter, ConsoleFilter
+        formatter = logging.Formatter(
+            '[%(asctime)s] [%(levelname)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
+
+        # 콘솔 핸들러
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        console_handler.addFilter(ConsoleFilter())
+
+        # 파일 핸들러 (회전 기능 포함, 선택적으로 백업 압축)
+        file_path = os.path.join(self.log_dir, self.log_file)
+        handler_class = CompressedRotatingFileHandler if self.compress else RotatingFileHandler
+        file_handler = handler_class(
+            file_path,
+            maxBytes=self.max_bytes,
+            backupCount=self.backup_count,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(JsonLinesFormatter(datefmt='%Y-%m-%d %H:%M:%S') if self.log_format == "json" else formatter)
+        return [console_handler, file_handler]
 
     def _create_logger(self) -> logging.Logger:
         if not os.path.exists(self.log_dir):
@@ -37,31 +106,78 @@ class Logger:
         logger.setLevel(self.level)
 
         if not logger.handlers:
-            formatter = logging.Formatter(
-                '[%(asctime)s] [%(levelname)s] %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
-
-            # 콘솔 핸들러
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-
-            # 파일 핸들러 (회전 기능 포함)
-            file_path = os.path.join(self.log_dir, self.log_file)
-            file_handler = RotatingFileHandler(
-                file_path,
-                maxBytes=self.max_bytes,
-                backupCount=self.backup_count,
-                encoding='utf-8'
-            )
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            self._handlers = self._create_handlers()
+            if self.async_mode:
+                import atexit
+                import queue
+                from .handlers import LazyQueueHandler
+                # 시뮬레이션 스레드는 큐에 넣기만 하고, 실제 I/O 는 리스너 스레드가 담당
+                self._queue = queue.Queue(-1)
+                self._queue_handler = LazyQueueHandler(self._queue)
+                logger.addHandler(self._queue_handler)
+                self._start_listener()
+                if not self._hooks_registered: # use_file 로 다시 생성해도 한 번만 등록
+                    self._hooks_registered = True
+                    atexit.register(self.close)
+                    if hasattr(os, "register_at_fork"): # POSIX 전용 (Windows 에는 fork 가 없음)
+                        os.register_at_fork(after_in_child=self._restart_after_fork)
+            else:
+                for handler in self._handlers:
+                    logger.addHandler(handler)
 
         return logger
 
+    def _start_listener(self):
+        from logging.handlers import QueueListener
+        self._listener = QueueListener(self._queue, *self._handlers, respect_handler_level=True)
+        self._listener.start()
+
+    def _restart_after_fork(self):
+        """fork 된 자식 프로세스(토너먼트 워커 등)에는 리스너 스레드가 없으므로 새 큐로 다시 시작"""
+        if self._listener is None:
+            return
+        import queue
+        self._queue = queue.Queue(-1)
+        self._queue_handler.queue = self._queue
+        self._start_listener()
+
+    def use_file(self, log_file: str):
+        """이후 기록할 파일을 바꿉니다. 이미 만든 핸들러(와 리스너)는 닫고 다음 사용 시점에 새 파일로 다시 생성
+
+        여러 프로세스가 같은 회전 파일에 쓰면 회전이 경합해 줄이 섞이거나 사라지므로, 워커 프로세스마다 다른 파일을 지정합니다.
+        """
+        if self._logger is not None:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+            for handler in list(self._logger.handlers):
+                self._logger.removeHandler(handler)
+            for handler in self._handlers:
+                handler.close()
+            self._handlers = []
+            self._logger = None
+        self.log_file = log_file
+
+    def flush(self):
+        """큐에 쌓인 레코드를 모두 기록할 때까지 대기 (동기 모드에서는 핸들러 flush)"""
+        if self._listener is not None:
+            self._queue.join()
+        for handler in self._handlers:
+            handler.flush()
+
+    def close(self):
+        """리스너 스레드를 멈추고 남은 레코드를 모두 기록"""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+            # 이후 기록은 동기 핸들러로 직접 전달
+            self._logger.removeHandler(self._queue_handler)
+            for handler in self._handlers:
+                self._logger.addHandler(handler)
+        self.flush()
+
     def __getattr__(self, item):
         """
         logger.info, logger.debug 등을 바로 쓸 수 있도록 위임
         """
-        return getattr(self._logger, item)
+        return getattr(self.setup(), item)
@@ -0,0 +1,137 @@
+from typing import List, Dict, Any
+from custom_logger import logger
+from player.events import event_from_dict
+import json
+import os
+import time
+
+BASE_FILE = "base.json"
+JOURNAL_FILE = "journal.jsonl"
+
+
+def write_atomic(path: str, data: Dict[str, Any]):
+    """임시 파일에 쓰고 fsync 후 os.replace 로 교체 (중간에 중단되어도 이전 파일 또는 새 파일만 남음)"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+# --- Checkpoint Writer ---
+class Checkpointer:
+    """턴 경계마다 게임 상태의 증분(delta)을 저널에 추가합니다.
+
+    - base.json: 플레이어 구성과 게임 설정 (시작 시 한 번, 원자적 교체로 기록)
+    - journal.jsonl: 턴당 한 줄. 지난 체크포인트 이후 바뀐 플레이어 상태와 새 이벤트, 새 LLM 호출 계측만 포함
+      (라우팅/턴 계획/fast-path/시장 집계는 크기가 작아 매 줄 전체를 기록)
+      (한 줄씩 fsync 하므로 기록 도중 중단되면 마지막 줄만 깨지고, 복원 시 그 줄은 무시)
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self._last_states: Dict[str, Dict[str, Any]] = {}
+        self._written_events = 0
+        self.deltas_written = 0
+        self.bytes_written = 0
+
+    def start(self, game: 'Game', player_configs: List[Dict[str, Any]]):
+        """새 게임의 base.json 을 기록하고 저널을 비웁니다."""
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        write_atomic(os.path.join(self.directory, BASE_FILE), {
+            "version": 1,
+            "created_at": time.time(),
+            "max_turns": game.max_turns,
+            "player_configs": player_configs,
+        })
+        open(self.journal_path, "w", encoding="utf-8").close()
+        self._last_states = {}
+        self._written_events = 0
+        game.metrics.track_deltas()
+        logger.info(f"Checkpointing to {self.directory}")
+
+    def resume_from(self, game: 'Game', applied_bytes: int):
+        """복원된 게임 상태를 기준점으로 삼고, 깨진 마지막 줄이 있으면 잘라냅니다."""
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(applied_bytes)
+        self._last_states = {name: player.snapshot() for name, player in game.players.items()}
+        self._written_events = len(game.events)
+        game.metrics.track_deltas()
+
+    def write_turn(self, game: 'Game'):
+        """현재 턴 경계의 delta 를 저널에 한 줄로 추가합니다."""
+        players = {}
+        for name, player in game.players.items():
+            state = player.snapshot()
+            if state != self._last_states.get(name):
+                players[name] = state
+                self._last_states[name] = state
+
+        new_events = game.events.events[self._written_events:]
+        self._written_events = len(game.events)
+        delta = {
+            "turn": game.current_turn,
+            "game_over": game.game_over,
+            "players": players,
+            "events": [event.to_dict() for event in new_events],
+            "emotion_dirty": [name for name in game.players if game.emotion_scheduler.is_dirty(name)],
+            "metrics": game.metrics.take_delta(),
+            "counters": game.snapshot_counters(),
+        }
+
+        line = (json.dumps(delta, ensure_ascii=False) + "\n").encode("utf-8")
+        with open(self.journal_path, "ab") as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self.deltas_written += 1
+        self.bytes_written += len(line)
+        logger.debug("Checkpoint written for turn %d (%d players changed, %d events, %d bytes)", game.current_turn, len(players), len(new_events), len(line))
+
+
+# --- 복원 ---
+
+def load_checkpoint(directory: str):
+    """(base, 적용 가능한 delta 목록, 유효한 저널 바이트 수) 반환. 깨진 마지막 줄은 버립니다."""
+    with open(os.path.join(directory, BASE_FILE), "r", encoding="utf-8") as f:
+        base = json.load(f)
+
+    deltas = []
+    valid_bytes = 0
+    journal_path = os.path.join(directory, JOURNAL_FILE)
+    if os.path.exists(journal_path):
+        with open(journal_path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    logger.warning(f"Ignoring incomplete checkpoint line in {journal_path}")
+                    break
+                try:
+                    deltas.append(json.loads(raw))
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring corrupt checkpoint line in {journal_path}")
+                    break
+                valid_bytes += len(raw)
+    return base, deltas, valid_bytes
+
+
+def apply_deltas(game: 'Game', deltas: List[Dict[str, Any]]):
+    """저널의 delta 를 순서대로 적용해 마지막 턴 경계의 상태를 복원합니다."""
+    for delta in deltas:
+        for name, state in delta["players"].items():
+            game.players[name].restore(state)
+        for data in delta["events"]:
+            game.events.restore(event_from_dict(data))
+        game.metrics.merge_state(delta.get("metrics", {}))
+        game.current_turn = delta["turn"]
+        game.game_over = delta["game_over"]
+
+    game.events.current_turn = game.current_turn
+    game.state_index.rebuild(game.players.values())
+    if deltas:
+        # 복원된 감정을 그대로 쓰고, 마지막 체크포인트 시점에 갱신 대기 중이던 플레이어만 다시 갱신
+        game.emotion_scheduler.restore_dirty(deltas[-1]["emotion_dirty"])
+        if deltas[-1].get("counters"): # 집계 기록 이전 저널이면 재시작 이후 집계만 남음
+            game.restore_counters(deltas[-1]["counters"])
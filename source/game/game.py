@@ -1,24 +1,71 @@
 from typing import List, Dict, Any, Optional
+from collections import Counter
 from custom_logger import logger, logger_final
 from player.player import Player
-from openai_client import client
+from player.events import EventStore, DecisionEvent, TradeEvent, MatchEvent, ProposalEvent, ResponseEvent, ITEM_KEYS
+from player.history import refresh_histories, refresh_histories_async, get_history_metrics
+from agent.policy import get_fast_path_metrics
+from agent.prompts import PromptAssembler, get_stats_prompt
+from game.checkpoint import Checkpointer, load_checkpoint, apply_deltas
+from game.state_index import GameStateIndex
+from game.market import TradeMarket
+from game.visibility import VisibilityModel
+from game.routing import ModelRouter
+from llm.deadline import complete_with_deadline, call_deadline, DeadlineExceeded
+from metrics import MetricsCollector, set_collector
+from metrics.profiling import create_profiler, set_profiler
 from config import config
+from config import persona
 import json
+import os
+import time
 
 # --- Game Class ---
 class Game:
-    def __init__(self, player_configs: List[Dict[str, Any]]):
+    def __init__(self, player_configs: List[Dict[str, Any]], checkpoint_dir: Optional[str] = None):
+        # 에이전트(비동기/LLM 호출 계층)는 게임을 만들 때 로드 -> 규칙 엔진만 import 하는 분석 코드는 가볍게 유지
         from agent.agent import OpenAI_Agent
-        self.players = {conf["name"]: Player(conf["name"], conf["persona"], conf.get("loan", 0)) for conf in player_configs}
+        from agent.emotion import EmotionScheduler
+        self.events = EventStore() # 모든 플레이어의 행동 기록 (턴/플레이어 인덱스)
+        self.metrics = MetricsCollector() # LLM 호출/게임 단계 계측 (이 게임 동안 전역 수집기로 사용)
+        set_collector(self.metrics)
+        self.profiler = create_profiler() # PROFILE 설정 시 턴/행동/LLM 호출 프로파일링 (기본값은 no-op)
+        set_profiler(self.profiler)
+        self.prompts = PromptAssembler(self) # 정적 프리픽스(페르소나 + 규칙) 게임당 1회 렌더링
+        self.state_index = GameStateIndex() # 활성 집합/전광판 집계 (거래/게임/상태 변경 시 증분 갱신)
+        self.visibility = VisibilityModel(self) # 플레이어별 다른 플레이어 정보 시야 (토큰 예산 내)
+        self.router = ModelRouter(self) # 호출 위치/상황/예산별 모델 선택
+        self.players = {conf["name"]: Player(conf["name"], conf["persona"], conf.get("loan", 0), event_store=self.events, state_index=self.state_index) for conf in player_configs}
         self.current_turn = 0
         self.max_turns = config.MAX_TURNS
         self.game_over = False
         self.winner = None # 또는 생존자 목록
+        self.turn_deadline = None # 현재 턴의 마감 시각 (time.monotonic 기준)
+        # 시장 모드: 거래 제안을 주문장에 모아 턴 종료 시 일괄 체결
+        market_mode = config.TRADE_MARKET_MODE or os.getenv("TRADE_MARKET") == "1"
+        self.market = TradeMarket(self) if market_mode else None
+        self.narrative = None # 게임 진행 중 서사 구간 요약 (enable_narrative)
+        self.plan_stats = {"plans": 0, "planned_steps": 0, "continued_steps": 0, "skipped_steps": 0} # 턴 계획(여러 행동) 실행 집계
 
         # 각 플레이어에게 Agent 할당
-        self.agents = {name: OpenAI_Agent(player, self) for name, player in self.players.items()}
+        # fast-path 설정: 플레이어 설정의 "fast_path" 가 없으면 persona.FAST_PATH_OVERRIDES 의 페르소나별 설정 사용
+        fast_path = {
+            conf["name"]: conf.get("fast_path", persona.FAST_PATH_OVERRIDES.get(conf.get("persona_name", conf["name"])))
+            for conf in player_configs
+        }
+        self.agents = {name: OpenAI_Agent(player, self, fast_path[name]) for name, player in self.players.items()}
+
+        # 감정 갱신 스케줄러: 시작 시 N번의 직렬 호출 대신 첫 결정 직전에 일괄 갱신
+        self.emotion_scheduler = EmotionScheduler(self.agents)
+        self.emotion_scheduler.mark_all_dirty()
 
         # 게임 초기 상태 로그
+        # 턴 경계 체크포인트 (checkpoint_dir 지정 시)
+        self.checkpointer = None
+        if checkpoint_dir:
+            self.checkpointer = Checkpointer(checkpoint_dir)
+            self.checkpointer.start(self, player_configs)
+
         logger.info("="*30)
         logger.info("Limited Rock-Paper-Scissors Simulation Start!")
         logger.info(f"Initial Players ({len(self.players)}): {list(self.players.keys())}")
@@ -27,11 +74,56 @@ class Game:
         logger.info("="*30)
 
 
+    @classmethod
+    def resume(cls, checkpoint_dir: str) -> 'Game':
+        """체크포인트 디렉토리의 마지막 턴 경계 상태로 게임을 복원하고, 같은 저널에 이어서 기록합니다."""
+        base, deltas, valid_bytes = load_checkpoint(checkpoint_dir)
+        game = cls(base["player_configs"])
+        game.max_turns = base["max_turns"]
+        apply_deltas(game, deltas)
+        game.checkpointer = Checkpointer(checkpoint_dir)
+        game.checkpointer.resume_from(game, valid_bytes)
+        logger.info(f"Resumed from {checkpoint_dir} at turn {game.current_turn}/{game.max_turns} (game_over={game.game_over}, {len(game.events)} events).")
+        return game
+
+    def snapshot_counters(self) -> Dict[str, Any]:
+        """체크포인트용 누적 집계 (라우팅 결정, 턴 계획, fast-path, 시장). LLM 호출 계측은 MetricsCollector.take_delta 로 따로 기록"""
+        return {
+            "router": self.router.snapshot(),
+            "plan_stats": dict(self.plan_stats),
+            "fast_path": {name: dict(agent.fast_path.avoided) for name, agent in self.agents.items()},
+            "market": dict(self.market.stats) if self.market else None,
+        }
+
+    def restore_counters(self, state: Dict[str, Any]):
+        self.router.restore(state["router"])
+        self.plan_stats = dict(state["plan_stats"])
+        for name, avoided in state["fast_path"].items():
+            self.agents[name].fast_path.avoided = Counter(avoided)
+        if self.market and state["market"]:
+            self.market.stats = Counter(state["market"])
+
     def get_player(self, name: str) -> Optional[Player]:
         return self.players.get(name)
 
     def get_active_players(self) -> List[Player]:
-        return [p for p in self.players.values() if p.is_active()]
+        """활성 플레이어 목록 (인덱스의 캐시된 목록, 수정 금지)"""
+        return self.state_index.active_players()
+
+    def enable_narrative(self):
+        """게임 진행 중 끝난 턴 구간의 서사 요약을 미리 요청 (generate_narrative_summary 에서 이어서 사용)"""
+        from game.narrative import NarrativeBuilder
+        self.narrative = NarrativeBuilder(self)
+
+    def llm_meta(self, call_site: str, player: Optional[Player] = None, **hints) -> Dict[str, Any]:
+        """LLM 백엔드에 함께 전달할 호출 위치 정보 (API 요청에는 포함되지 않음)"""
+        meta = {"call_site": call_site, "player": player.name if player else None, "turn": self.current_turn}
+        meta.update(hints)
+        return meta
+
+    def call_deadline(self) -> Optional[float]:
+        """지금 시작하는 LLM 호출의 마감 시각 (호출 마감과 턴 마감 중 이른 쪽)"""
+        return call_deadline(self.turn_deadline)
 
     def get_current_stats_prmopt(self) -> str:
         dashboard_info = self.get_dashboard_info()
@@ -55,32 +147,18 @@ class Game:
 
     def get_other_players_info(self, exclude_player_name: str = None) -> List[Dict[str, Any]]:
         """현재 활성 상태인 다른 플레이어들의 공개 정보 (이름, 별 개수) 반환"""
-        active_players = self.get_active_players()
-        info_list = []
-        for player in active_players:
-            if player.name != exclude_player_name:
-                info_list.append({
-                    "user_name": player.name,
-                    "user_stars": player.stars
-                    # 카드 개수 등 비공개 정보는 포함하지 않음
-                })
-        return info_list
+        # 카드 개수 등 비공개 정보는 포함하지 않음
+        return [info for info in self.state_index.public_info() if info["user_name"] != exclude_player_name]
     
-    def get_other_players_info_prompt(self, exclude_player_name: str = None) -> str:
-        other_players_info = self.get_other_players_info(exclude_player_name=exclude_player_name)
-        other_players_info_prompt = {json.dumps(other_players_info, indent=2, ensure_ascii=False) if other_players_info else "다른 활성 플레이어가 없습니다."}
-        return other_players_info_prompt
+    def get_other_players_info_prompt(self, exclude_player_name: str) -> str:
+        """프롬프트용 다른 활성 플레이어 정보 (VisibilityModel: 토큰 예산을 넘으면 상위/최근 상대/후보 + 집계)"""
+        return self.visibility.render(self.get_player(exclude_player_name))
 
     def get_dashboard_info(self) -> Dict[str, Any]:
-        """현재 게임 전광판 현황 반환"""
-        active_players = self.get_active_players()
-        total_cards = {"rock": 0, "scissors": 0, "paper": 0}
-        for player in active_players:
-            for card_type, count in player.cards.items():
-                total_cards[card_type] += count
-
+        """현재 게임 전광판 현황 반환 (인덱스의 증분 집계 사용)"""
+        total_cards = self.state_index.card_totals
         return {
-            "alive_users": len(active_players),
+            "alive_users": self.state_index.active_count(),
             "remain_time": (self.max_turns - self.current_turn) * config.TIME_PER_TURN,
             "all_rock_card_number": total_cards["rock"],
             "all_scissors_card_number": total_cards["scissors"],
@@ -108,7 +186,8 @@ class Game:
     def execute_trade(self, player1: Player, player2: Player, args: Dict[str, Any]):
         """실제 거래 실행 (자원 교환)"""
         logger.info(f"Executing trade between {player1.name} and {player2.name}.")
-        log_entry = f"Turn {self.current_turn}: Trade executed with {player2.name}."
+        gave = tuple(args.get(f"give_{key}", 0) for key in ITEM_KEYS)
+        received = tuple(args.get(f"receive_{key}", 0) for key in ITEM_KEYS)
 
         # Player 1 주는 아이템 차감
         player1.stars -= args.get('give_stars', 0)
@@ -116,7 +195,6 @@ class Game:
         player1.cards['scissors'] -= args.get('give_scissors', 0)
         player1.cards['paper'] -= args.get('give_paper', 0)
         player1.money -= args.get('give_money', 0)
-        log_entry += f" Gave: {args.get('give_stars', 0)}*, R:{args.get('give_rock', 0)}, S:{args.get('give_scissors', 0)}, P:{args.get('give_paper', 0)}, M:{args.get('give_money', 0)}."
 
         # Player 2 받는 아이템 증가
         player2.stars += args.get('give_stars', 0)
@@ -131,7 +209,6 @@ class Game:
         player1.cards['scissors'] += args.get('receive_scissors', 0)
         player1.cards['paper'] += args.get('receive_paper', 0)
         player1.money += args.get('receive_money', 0)
-        log_entry += f" Received: {args.get('receive_stars', 0)}*, R:{args.get('receive_rock', 0)}, S:{args.get('receive_scissors', 0)}, P:{args.get('receive_paper', 0)}, M:{args.get('receive_money', 0)}."
 
         # Player 2 주는 아이템 차감
         player2.stars -= args.get('receive_stars', 0)
@@ -140,12 +217,16 @@ class Game:
         player2.cards['paper'] -= args.get('receive_paper', 0)
         player2.money -= args.get('receive_money', 0)
 
+        self.state_index.refresh(player1)
+        self.state_index.refresh(player2)
+
         logger.info(f"Trade completed. {player1.name} state: {player1.get_items_dict()}. {player2.name} state: {player2.get_items_dict()}")
-        player1.action_log.append(log_entry)
-        player2.action_log.append(f"Turn {self.current_turn}: Accepted trade with {player1.name}.") # 상대방 로그에도 기록
+        player1.record(TradeEvent(player2.name, "proposer", gave, received))
+        player2.record(TradeEvent(player1.name, "acceptor", received, gave)) # 상대방 로그에도 기록
 
-        # 감정 업데이트
-        self.agents[player2.name].update_current_emotion()
+        # 감정 업데이트 (다음 결정 직전에 일괄 갱신)
+        self.emotion_scheduler.mark_dirty(player1.name)
+        self.emotion_scheduler.mark_dirty(player2.name)
 
     def _validate_match(self, player1: Player, player2: Player, card_to_play: str) -> bool:
         """게임 유효성 검증 (플레이어 활성 상태, 카드 보유 여부)"""
@@ -165,8 +246,6 @@ class Game:
     def play_match(self, player1: Player, player2: Player, card1: str, card2: str):
         """가위바위보 게임 실행 및 결과 처리"""
         logger.info(f"Playing match: {player1.name} ({card1}) vs {player2.name} ({card2})")
-        log_entry_p1 = f"Turn {self.current_turn}: Played '{card1}' against {player2.name} ('{card2}')."
-        log_entry_p2 = f"Turn {self.current_turn}: Played '{card2}' against {player1.name} ('{card1}')."
 
         # 카드 소모
         player1.cards[card1] -= 1
@@ -179,44 +258,39 @@ class Game:
         if card1 == card2:
             is_draw = True
             logger.info("Result: Draw.")
-            log_entry_p1 += " Result: Draw."
-            log_entry_p2 += " Result: Draw."
+            result_p1, result_p2 = "Draw", "Draw"
         elif (card1 == 'rock' and card2 == 'scissors') or \
              (card1 == 'scissors' and card2 == 'paper') or \
              (card1 == 'paper' and card2 == 'rock'):
             winner = player1
             loser = player2
             logger.info(f"Result: {player1.name} wins.")
-            log_entry_p1 += " Result: Win."
-            log_entry_p2 += " Result: Lose."
+            result_p1, result_p2 = "Win", "Lose"
         else:
             winner = player2
             loser = player1
             logger.info(f"Result: {player2.name} wins.")
-            log_entry_p1 += " Result: Lose."
-            log_entry_p2 += " Result: Win."
+            result_p1, result_p2 = "Lose", "Win"
 
         # 별 이동
         if winner and loser:
             winner.stars += 1
             loser.stars -= 1
             logger.info(f"{winner.name} gains a star (now {winner.stars}), {loser.name} loses a star (now {loser.stars}).")
-            log_entry_p1 += f" Stars: {player1.stars}."
-            log_entry_p2 += f" Stars: {player2.stars}."
-            # 별 0개 이하 시 즉시 탈락 처리 (Game Master 역할 일부 선처리)
-            if loser.stars <= 0:
-                loser.update_status(config.PLAYER_STATUS_ELIMINATED_NO_STAR, f"Lost all stars in a match against {winner.name}")
-        else: # 무승부
-             log_entry_p1 += f" Stars: {player1.stars}."
-             log_entry_p2 += f" Stars: {player2.stars}."
-
+        self.state_index.refresh(player1)
+        self.state_index.refresh(player2)
 
         logger.info(f"Match completed. {player1.name} state: {player1.get_items_dict()}. {player2.name} state: {player2.get_items_dict()}")
-        player1.action_log.append(log_entry_p1)
-        player2.action_log.append(log_entry_p2)
+        player1.record(MatchEvent(player2.name, card1, card2, result_p1, player1.stars))
+        player2.record(MatchEvent(player1.name, card2, card1, result_p2, player2.stars))
+
+        # 별 0개 이하 시 즉시 탈락 처리 (Game Master 역할 일부 선처리)
+        if loser and loser.stars <= 0:
+            loser.update_status(config.PLAYER_STATUS_ELIMINATED_NO_STAR, f"Lost all stars in a match against {winner.name}")
 
-        # 감정 업데이트
-        self.agents[player2.name].update_current_emotion()
+        # 감정 업데이트 (다음 결정 직전에 일괄 갱신)
+        self.emotion_scheduler.mark_dirty(player1.name)
+        self.emotion_scheduler.mark_dirty(player2.name)
 
     def handle_action(self, player_name: str, action: Dict[str, Any]):
         """플레이어의 결정된 행동을 처리 (Game Anchor 역할 일부 포함)"""
@@ -234,32 +308,23 @@ class Game:
 
             if not target_player or not target_player.is_active():
                 logger.warning(f"{player.name} proposed trade to inactive/invalid player {target_player_name}. Trade failed.")
-                player.action_log.append(f"Turn {self.current_turn}: Trade proposal to {target_player_name} failed (target inactive/invalid).")
+                player.record(ProposalEvent("trade", "target_invalid", target_player_name))
+                return
+
+            proposer_public_reasoning = args.get("public_reasoning", "제공된 이유 없음")
+
+            # 시장 모드: 주문장에 올리고 턴 종료 시 일괄 체결
+            if self.market:
+                self.market.post(player, target_player, args, proposer_public_reasoning)
                 return
 
             # --- Game Anchor: 상대방에게 거래 의사 묻기 ---
             # 여기서는 단순화를 위해 상대방(AI)도 OpenAI 호출을 통해 결정한다고 가정
             # 실제 구현 시에는 비용/시간 문제로 규칙 기반 또는 더 간단한 로직 사용 가능
             logger.info(f"{player.name} proposes trade to {target_player_name}. Asking {target_player_name} for response...")
-            proposer_public_reasoning = args.get("public_reasoning", "제공된 이유 없음")
 
             accept_trade = self.ask_trade_response(target_player, player, args, proposer_public_reasoning) # 상대방에게 거래 수락 여부 결정 요청 (public reasoning 전달)
-
-            if accept_trade:
-                 # 거래 유효성 재검증 (상대방이 수락 시점에 필요한 자원을 가지고 있는지)
-                 if self._validate_trade(player, target_player, args) and \
-                    self._validate_received_items(target_player, args): # 상대방이 줄 아이템 검증
-                     logger.info(f"{target_player_name} accepted the trade from {player.name}.")
-                     self.execute_trade(player, target_player, args)
-                 else:
-                     logger.warning(f"Trade between {player.name} and {target_player_name} failed validation after acceptance. No trade executed.")
-                     player.action_log.append(f"Turn {self.current_turn}: Trade with {target_player_name} accepted but failed validation.")
-                     target_player.action_log.append(f"Turn {self.current_turn}: Accepted trade with {player.name} but failed validation.")
-
-            else:
-                 logger.info(f"{target_player_name} rejected the trade from {player.name}.")
-                 player.action_log.append(f"Turn {self.current_turn}: Trade proposal to {target_player_name} was rejected.")
-                 target_player.action_log.append(f"Turn {self.current_turn}: Rejected trade proposal from {player.name}.")
+            self.settle_trade(player, target_player, args, accept_trade)
 
 
         elif func_name == "propose_match":
@@ -269,7 +334,7 @@ class Game:
 
             if not self._validate_match(player, target_player, card_to_play):
                 logger.warning(f"{player.name}'s match proposal to {target_player_name} with {card_to_play} is invalid.")
-                player.action_log.append(f"Turn {self.current_turn}: Match proposal to {target_player_name} failed (invalid).")
+                player.record(ProposalEvent("match", "invalid", target_player_name))
                 return
 
             # --- Game Anchor: 상대방에게 게임 수락 및 카드 선택 요청 ---
@@ -284,12 +349,12 @@ class Game:
                      self.play_match(player, target_player, card_to_play, target_card)
                 else:
                      logger.warning(f"{target_player_name} accepted match but chose invalid card '{target_card}'. Match cancelled.")
-                     player.action_log.append(f"Turn {self.current_turn}: Match with {target_player_name} cancelled (opponent chose invalid card).")
-                     target_player.action_log.append(f"Turn {self.current_turn}: Accepted match with {player.name} but chose invalid card '{target_card}'.")
+                     player.record(ProposalEvent("match", "cancelled", target_player_name))
+                     target_player.record(ResponseEvent("match", player.name, "cancelled", card=target_card))
             else:
                 logger.info(f"{target_player_name} rejected the match proposed by {player.name}.")
-                player.action_log.append(f"Turn {self.current_turn}: Match proposal to {target_player_name} was rejected.")
-                target_player.action_log.append(f"Turn {self.current_turn}: Rejected match proposal from {player.name}.")
+                player.record(ProposalEvent("match", "rejected", target_player_name))
+                target_player.record(ResponseEvent("match", player.name, "rejected"))
 
 
         elif func_name == "declare_out_of_game":
@@ -298,12 +363,32 @@ class Game:
                 player.update_status(config.PLAYER_STATUS_OUT_SUCCESS, "Met survival conditions.")
             else:
                 logger.warning(f"{player.name} tried to declare 'Out of Game' but did not meet conditions (Stars: {player.stars}, Cards: {player.get_total_cards()}).")
-                player.action_log.append(f"Turn {self.current_turn}: Attempted 'Out of Game' but failed conditions.")
+                player.record(ProposalEvent("exit", "failed_conditions"))
 
         elif func_name == "do_nothing":
             logger.info(f"{player.name} chose to do nothing this turn.")
             # 로그는 OpenAI_Agent.decide_action 에서 이미 기록됨
 
+    def settle_trade(self, player: Player, target_player: Player, args: Dict[str, Any], accepted: bool) -> bool:
+        """응답 결과에 따라 거래를 체결하거나 거절을 기록합니다. 체결되면 True"""
+        if not accepted:
+            logger.info(f"{target_player.name} rejected the trade from {player.name}.")
+            player.record(ProposalEvent("trade", "rejected", target_player.name))
+            target_player.record(ResponseEvent("trade", player.name, "rejected"))
+            return False
+
+        # 거래 유효성 재검증 (상대방이 수락 시점에 필요한 자원을 가지고 있는지)
+        if self._validate_trade(player, target_player, args) and \
+           self._validate_received_items(target_player, args): # 상대방이 줄 아이템 검증
+            logger.info(f"{target_player.name} accepted the trade from {player.name}.")
+            self.execute_trade(player, target_player, args)
+            return True
+
+        logger.warning(f"Trade between {player.name} and {target_player.name} failed validation after acceptance. No trade executed.")
+        player.record(ProposalEvent("trade", "failed_validation", target_player.name))
+        target_player.record(ResponseEvent("trade", player.name, "failed_validation"))
+        return False
+
     def _validate_received_items(self, receiving_player: Player, trade_args: Dict[str, Any]) -> bool:
         """거래 시 상대방(수락자)이 제공해야 할 아이템을 가지고 있는지 검증"""
         if receiving_player.stars < trade_args.get('receive_stars', 0): return False
@@ -318,13 +403,17 @@ class Game:
         """ (Game Anchor 역할) 대상 플레이어(AI)에게 거래 제안에 대한 응답을 요청 """
         if not target_player.is_active(): return False # 응답할 수 없는 상태
 
-        # 대상 플레이어에게 상황 전달 및 결정 요청
-        # 액션 로그를 f-string 밖에서 미리 포맷합니다.
-        action_history = "\n".join(target_player.action_log) if target_player.action_log else "아직 기록된 행동이 없습니다."
-
-        messages = [
-            {"role": "system", "content": target_player.persona_prompt + "\n\n" + self.get_game_rules_summary()},
-            {"role": "user", "content": f"""
+        # 규칙만으로 결론이 나는 제안은 LLM 호출 없이 응답
+        fast = self.agents[target_player.name].fast_path.trade_response(self, target_player, proposing_player, proposal_args)
+        if fast is not None:
+            accepted, reasoning = fast
+            decision = "accept" if accepted else "reject"
+            logger.info(f"{target_player.name}'s response to trade proposal (fast-path): {decision}. Reasoning: {reasoning}")
+            target_player.record(ResponseEvent("trade", proposing_player.name, "responded", decision=decision, reasoning=reasoning))
+            return accepted
+
+        # 대상 플레이어에게 상황 전달 및 결정 요청 (행동 기록은 get_stats_prompt 에 압축되어 포함)
+        messages = self.prompts.messages(target_player, "trade_response", f"""
             ## 거래 제안 도착
             플레이어 '{proposing_player.name}'로부터 다음 내용의 거래 제안을 받았습니다:
 
@@ -348,11 +437,8 @@ class Game:
             {get_stats_prompt(self, target_player)}
 
             ## 당신의 결정
-            이 거래 제안을 수락하시겠습니까? 당신의 생존 목표와 현재 자원 상황, {proposing_player.name}의 의도, 당신의 과거 행동 등을 고려하여 신중하게 판단하세요.
-            반드시 'accept' 또는 'reject' 중 하나로만 응답하고, 그 이유를 간략하게 설명해주세요.
-            게임의 생존을 충족했다면, 남은 자원으로 돈을 최대한으로 획득해야합니다.
-            """}
-        ]
+            {proposing_player.name}의 거래 제안을 수락하시겠습니까?
+            """)
 
         trade_response_schema = {
             "name": "trade_decision", # 함수 이름 (영문 유지 권장)
@@ -374,25 +460,30 @@ class Game:
             }
         }
 
+        route = self.router.route("trade_response", target_player, trades=[proposal_args])
         try:
-            response = client.chat.completions.create(
-                model="gpt-4.1",
-                messages=messages,
-                response_format={"type": "json_schema", "json_schema": trade_response_schema}, # JSON 스키마 사용
-                temperature=0.5
-            )
+            response, timing = complete_with_deadline({
+                "model": route.model,
+                "messages": messages,
+                "response_format": {"type": "json_schema", "json_schema": trade_response_schema}, # JSON 스키마 사용
+                "temperature": 0.5
+            }, self.llm_meta("trade_response", target_player, proposer=proposing_player.name, route=route.label), self.call_deadline())
             decision_data = json.loads(response.choices[0].message.content)
             decision = decision_data.get("decision")
             reasoning = decision_data.get("reasoning", "No reasoning provided.")
 
             logger.info(f"{target_player.name}'s response to trade proposal: {decision}. Reasoning: {reasoning}")
-            target_player.action_log.append(f"Turn {self.current_turn}: Responded '{decision}' to trade from {proposing_player.name}. Reason: {reasoning}")
+            target_player.record(ResponseEvent("trade", proposing_player.name, "responded", decision=decision, reasoning=reasoning, timing=timing.flags()))
 
             return decision == "accept"
 
+        except DeadlineExceeded as e:
+            logger.warning(f"Trade response of {target_player.name} missed the deadline ({e}). Defaulting to reject.")
+            target_player.record(ResponseEvent("trade", proposing_player.name, "deadline_default", decision="reject", timing=e.timing.flags()))
+            return False
         except Exception as e:
             logger.error(f"Error getting trade response from {target_player.name}: {e}")
-            target_player.action_log.append(f"Turn {self.current_turn}: Failed to respond to trade from {proposing_player.name} due to API error. Defaulting to reject.")
+            target_player.record(ResponseEvent("trade", proposing_player.name, "api_error"))
             return False # 오류 시 안전하게 거절 처리
 
     def ask_match_response(self, target_player: Player, proposing_player: Player, proposer_public_reasoning: str) -> Optional[str]:
@@ -404,18 +495,23 @@ class Game:
         available_cards = [card for card, count in target_player.cards.items() if count > 0]
         if not available_cards: # 낼 카드가 없으면 거절 외 선택지 없음
              logger.warning(f"{target_player.name} has no cards left to play. Rejecting match automatically.")
-             target_player.action_log.append(f"Turn {self.current_turn}: Rejected match from {proposing_player.name} (no cards left).")
+             target_player.record(ResponseEvent("match", proposing_player.name, "no_cards"))
              return None
 
+        fast = self.agents[target_player.name].fast_path.match_response(self, target_player, proposing_player)
+        if fast is not None:
+            card_choice, reasoning = fast
+            logger.info(f"{target_player.name}'s response to match proposal (fast-path): {'accept' if card_choice else 'reject'}. Reasoning: {reasoning}")
+            if card_choice:
+                target_player.record(ResponseEvent("match", proposing_player.name, "accepted", decision="accept", card=card_choice, reasoning=reasoning))
+            else:
+                target_player.record(ResponseEvent("match", proposing_player.name, "declined", decision="reject", reasoning=reasoning))
+            return card_choice
+
         # 대상 플레이어에게 상황 전달 및 결정 요청
-        action_history_str = "\n".join(target_player.action_log) if target_player.action_log else "아직 기록된 행동이 없습니다."
-        messages = [
-            {"role": "system", "content": target_player.persona_prompt + "\n\n" + self.get_game_rules_summary()},
-            {"role": "user", "content": f"""
+        messages = self.prompts.messages(target_player, "match_response", f"""
             ## 게임 제안 도착
             플레이어 '{proposing_player.name}' (별 {proposing_player.stars}개 보유) 가 당신에게 가위바위보 게임을 제안했습니다.
-            승리하면 상대의 별 1개를 얻고, 패배하면 당신의 별 1개를 잃습니다. 무승부 시 변화는 없습니다.
-            어떤 경우든 당신은 카드 1장을 소모하게 됩니다.
 
             **제안 이유 ({proposing_player.name} 제공):**
             {proposer_public_reasoning}
@@ -424,10 +520,7 @@ class Game:
 
             ## 당신의 결정
             이 게임 제안을 수락하시겠습니까? 만약 수락한다면, 어떤 카드를 내시겠습니까? ({', '.join(available_cards)} 중에서 선택)
-            당신의 생존 목표, 현재 자원, {proposing_player.name}의 상태, 당신의 과거 행동 등을 고려하여 전략적으로 판단하세요.
-            거절할 수도 있습니다. 하지만, 거절을 반복할 경우 카드를 제한시간안에 소모하지 못해 게임에 패배할 수 있습니다.
-            """}
-        ]
+            """)
 
         match_response_schema = {
             "name": "match_response",
@@ -455,13 +548,14 @@ class Game:
             }
         }
 
+        route = self.router.route("match_response", target_player, available_cards=available_cards)
         try:
-            response = client.chat.completions.create(
-                model="gpt-4.1",
-                messages=messages,
-                response_format={"type": "json_schema", "json_schema": match_response_schema}, # JSON 스키마 사용
-                temperature=0.6
-            )
+            response, timing = complete_with_deadline({
+                "model": route.model,
+                "messages": messages,
+                "response_format": {"type": "json_schema", "json_schema": match_response_schema}, # JSON 스키마 사용
+                "temperature": 0.6
+            }, self.llm_meta("match_response", target_player, proposer=proposing_player.name, available_cards=available_cards, route=route.label), self.call_deadline())
             # OpenAI API는 스키마를 준수하는 JSON 문자열을 message.content에 반환
             decision_data = json.loads(response.choices[0].message.content)
             decision = decision_data.get("decision")
@@ -473,30 +567,36 @@ class Game:
             # 결정 및 카드 유효성 검증 강화
             if decision == "accept":
                 if card_choice in available_cards:
-                    target_player.action_log.append(f"Turn {self.current_turn}: Accepted match from {proposing_player.name}, playing '{card_choice}'. Reason: {reasoning}")
+                    target_player.record(ResponseEvent("match", proposing_player.name, "accepted", decision=decision, card=card_choice, reasoning=reasoning, timing=timing.flags()))
                     return card_choice
                 else:
                     # 수락했지만 유효하지 않은 카드 선택 또는 카드 미선택
                     error_reason = f"chose unavailable/missing card '{card_choice}'" if card_choice else "did not choose a card"
                     logger.warning(f"{target_player.name} accepted match but {error_reason}. Treating as reject.")
-                    target_player.action_log.append(f"Turn {self.current_turn}: Rejected match from {proposing_player.name} ({error_reason}). Reason: {reasoning}")
+                    target_player.record(ResponseEvent("match", proposing_player.name, "invalid_card", decision=decision, card=card_choice, reasoning=reasoning, detail=error_reason))
                     return None
             elif decision == "reject":
-                 target_player.action_log.append(f"Turn {self.current_turn}: Rejected match from {proposing_player.name}. Reason: {reasoning}")
+                 target_player.record(ResponseEvent("match", proposing_player.name, "declined", decision=decision, reasoning=reasoning, timing=timing.flags()))
                  return None
             else:
                  # decision 값이 "accept" 또는 "reject"가 아닌 경우 (API 오류 또는 스키마 미준수)
                  logger.warning(f"{target_player.name} provided invalid decision '{decision}'. Treating as reject.")
-                 target_player.action_log.append(f"Turn {self.current_turn}: Rejected match from {proposing_player.name} (invalid decision '{decision}'). Reason: {reasoning}")
+                 target_player.record(ResponseEvent("match", proposing_player.name, "invalid_decision", decision=decision, reasoning=reasoning))
                  return None
 
+        except DeadlineExceeded as e:
+            card_choice = self.agents[target_player.name].fast_path.fallback_match_response(target_player)
+            decision = "accept" if card_choice else "reject"
+            logger.warning(f"Match response of {target_player.name} missed the deadline ({e}). Falling back to {decision} ({card_choice or 'N/A'}).")
+            target_player.record(ResponseEvent("match", proposing_player.name, "deadline_default", decision=decision, card=card_choice, timing=e.timing.flags()))
+            return card_choice
         except json.JSONDecodeError as e:
              logger.error(f"Error decoding JSON response from {target_player.name}: {e}. Response: {response.choices[0].message.content}")
-             target_player.action_log.append(f"Turn {self.current_turn}: Failed to respond to match from {proposing_player.name} due to invalid JSON response. Defaulting to reject.")
+             target_player.record(ResponseEvent("match", proposing_player.name, "invalid_json"))
              return None # JSON 파싱 오류 시 거절
         except Exception as e:
             logger.error(f"Error getting match response from {target_player.name}: {e}")
-            target_player.action_log.append(f"Turn {self.current_turn}: Failed to respond to match from {proposing_player.name} due to API error. Defaulting to reject.")
+            target_player.record(ResponseEvent("match", proposing_player.name, "api_error"))
             return None # 기타 오류 시 안전하게 거절
 
 
@@ -515,7 +615,6 @@ class Game:
     def check_game_end(self) -> bool:
         """ (Game Master 역할) 게임 종료 조건 확인 """
         active_players = self.get_active_players()
-        successful_players = [p for p in self.players.values() if p.status == config.PLAYER_STATUS_OUT_SUCCESS]
 
         # 1. 시간 종료
         if self.current_turn >= self.max_turns:
@@ -548,48 +647,68 @@ class Game:
 
         return False
 
-    def progress_turn(self):
-        """한 턴을 진행시킵니다."""
+    def _begin_turn(self) -> bool:
+        """턴 카운터를 증가시키고 턴 시작 로그를 남깁니다. 이미 게임이 끝났다면 False."""
         if self.game_over:
             logger.warning("Attempted to progress turn but game is already over.")
-            return
+            return False
 
         self.current_turn += 1
+        self.events.current_turn = self.current_turn
+        self.turn_deadline = time.monotonic() + config.TURN_DEADLINE_SECONDS if config.TURN_DEADLINE_SECONDS is not None else None
         logger.info(f"\n===== Turn {self.current_turn}/{self.max_turns} Start =====")
         logger.info(f"Remaining Time: {(self.max_turns - self.current_turn) * config.TIME_PER_TURN} minutes")
+        return True
 
+    def _get_player_order(self) -> List[str]:
         # 플레이어 순서 결정 (여기서는 고정 순서 사용, 랜덤화 가능)
         player_order = list(self.players.keys())
         # random.shuffle(player_order) # 매 턴 순서 섞기
+        return player_order
 
-        # 각 활성 플레이어의 행동 결정 및 처리
-        for player_name in player_order:
-            player = self.get_player(player_name)
-            if player and player.is_active():
-                agent = self.agents[player_name]
-
-                action = agent.decide_action() # AI가 행동 결정 (OpenAI API 호출)
-
-                if action:
-                    # 결정된 행동 처리 (Game Anchor 역할 수행)
-                    self.handle_action(player_name, action)
-                else:
-                    # 에이전트가 결정을 반환하지 못한 경우 (오류 등)
-                    logger.error(f"Agent for {player_name} failed to return an action.")
-                    player.action_log.append(f"Turn {self.current_turn}: Failed to get action decision.")
+    def _apply_player_action(self, player_name: str, action: Optional[Dict[str, Any]]) -> bool:
+        """결정된 행동(턴 계획이면 모든 단계)을 처리하고 탈락/종료 여부를 확인합니다. 게임이 끝났으면 True."""
+        player = self.get_player(player_name)
 
-                # 감정 업데이트
-                agent.update_current_emotion()
+        if action:
+            # 결정된 행동 처리 (Game Anchor 역할 수행)
+            steps = [action] + action.get("plan", [])
+            if len(steps) > 1:
+                self.plan_stats["plans"] += 1
+                self.plan_stats["planned_steps"] += len(steps)
+            for step, planned in enumerate(steps):
+                # 턴 계획의 다음 단계 전 재검증: 앞 단계 결과로 탈락/퇴장했거나 게임이 끝났으면 나머지는 버림
+                # (대상/카드/자원 유효성은 handle_action 이 현재 상태로 다시 확인)
+                if step:
+                    self.remove_eliminated_players()
+                    if self.check_game_end() or not player.is_active():
+                        self._skip_plan(player, steps[step:], "game over" if self.game_over else f"status {player.status}")
+                        break
+                    logger.info(f"{player_name} continues the turn plan ({step + 1}/{len(steps)}).")
+                    self.plan_stats["continued_steps"] += 1
+                with self.metrics.phase("handle_action"), self.profiler.span(f"handle_action:{planned['function_name']} ({player_name})"):
+                    self.handle_action(player_name, planned)
+        else:
+            # 에이전트가 결정을 반환하지 못한 경우 (오류 등)
+            logger.error(f"Agent for {player_name} failed to return an action.")
+            player.record(DecisionEvent("no_action"))
 
-                # 행동 후 즉시 별 개수 체크 (매치 후 바로 반영되지만, 혹시 모를 다른 상황 대비)
-                self.remove_eliminated_players()
-                # 중간에 게임 종료 조건 만족 시 루프 중단 (예: 전원 탈락)
-                if self.check_game_end(): break
+        # 감정 업데이트 (다음 결정 직전에 일괄 갱신)
+        self.emotion_scheduler.mark_dirty(player_name)
 
-            elif player and not player.is_active():
-                logger.debug(f"Skipping turn for {player_name} (Status: {player.status})")
+        # 행동 후 즉시 별 개수 체크 (매치 후 바로 반영되지만, 혹시 모를 다른 상황 대비)
+        self.remove_eliminated_players()
+        # 중간에 게임 종료 조건 만족 시 루프 중단 (예: 전원 탈락)
+        return self.check_game_end()
 
+    def _skip_plan(self, player: Player, steps: List[Dict[str, Any]], reason: str):
+        """실행하지 못한 턴 계획 단계를 기록"""
+        logger.info(f"Skipping {len(steps)} planned action(s) of {player.name} ({reason}).")
+        self.plan_stats["skipped_steps"] += len(steps)
+        for planned in steps:
+            player.record(DecisionEvent("plan_skipped", planned["function_name"], reason, planned["arguments"]))
 
+    def _end_turn(self):
         # --- Game Master 역할 수행 ---
         logger.info(f"--- End of Turn {self.current_turn} ---")
 
@@ -606,6 +725,110 @@ class Game:
         else:
              self.log_final_results()
 
+        # 4. 턴 경계 체크포인트 (바뀐 부분만 저널에 추가)
+        if self.checkpointer:
+            self.checkpointer.write_turn(self)
+
+        # 5. 끝난 턴 구간의 서사 요약을 백그라운드로 요청 (enable_narrative 호출 시)
+        if self.narrative:
+            self.narrative.on_turn_end(self.current_turn)
+
+    def progress_turn(self):
+        """한 턴을 진행시킵니다."""
+        if not self._begin_turn():
+            return
+        with self.metrics.phase("turn"), self.profiler.turn(self.current_turn):
+            self._progress_turn()
+
+    def _progress_turn(self):
+        # 오래된 행동 기록을 롤링 요약에 접어 넣음 (필요한 플레이어만 일괄)
+        with self.metrics.phase("history_refresh"):
+            refresh_histories(self, self.get_active_players())
+
+        # 각 활성 플레이어의 행동 결정 및 처리
+        for player_name in self._get_player_order():
+            player = self.get_player(player_name)
+            if player and player.is_active():
+                # 결정 직전, 그동안 상태가 바뀐 플레이어들의 감정을 한 번에 갱신
+                with self.metrics.phase("emotion_refresh"):
+                    self.emotion_scheduler.flush()
+                with self.metrics.phase("decision"):
+                    action = self.agents[player_name].decide_action() # AI가 행동 결정 (OpenAI API 호출)
+                if self._apply_player_action(player_name, action): break
+
+            elif player and not player.is_active():
+                logger.debug("Skipping turn for %s (Status: %s)", player_name, player.status)
+
+        if self.market and not self.game_over:
+            with self.metrics.phase("market_clearing"):
+                self.market.clear()
+        self._end_turn()
+
+    async def progress_turn_async(self):
+        """한 턴을 진행시킵니다. (결정 단계 동시 실행)
+
+        1. 턴 시작 시점의 상태로 모든 활성 플레이어의 프롬프트를 구성 (스냅샷)
+        2. 결정 요청을 동시에 전송 (MAX_CONCURRENT_REQUESTS 로 제한)
+        3. 기존 player_order 순서대로 행동을 처리. 거래/게임 유효성은 handle_action 에서 현재 상태로 재검증됨
+        """
+        if not self._begin_turn():
+            return
+        with self.metrics.phase("turn"), self.profiler.turn(self.current_turn):
+            await self._progress_turn_async()
+
+    async def _progress_turn_async(self):
+        player_order = self._get_player_order()
+        deciding = [name for name in player_order if self.players[name].is_active()]
+
+        # 0. 규칙만으로 결정되는 플레이어(fast-path)는 LLM 결정 요청에서 제외
+        local_actions = {name: self.agents[name].fast_path.decide(self, self.players[name]) for name in deciding}
+        requesting = [name for name in deciding if local_actions[name] is None]
+
+        # 지난 턴 동안 상태가 바뀐 플레이어들의 감정 갱신과 행동 기록 요약을 한 배치로 처리
+        with self.metrics.phase("emotion_refresh"):
+            await self.emotion_scheduler.flush_async(requesting)
+        with self.metrics.phase("history_refresh"):
+            await refresh_histories_async(self, self.get_active_players())
+
+        # 1. 스냅샷: 어떤 행동도 처리되기 전에 모든 프롬프트를 미리 구성
+        snapshot_messages = {name: self.agents[name].build_decision_messages() for name in requesting}
+
+        # 2. 동시 결정 요청 (fast-path 로 결정된 플레이어 제외)
+        import asyncio
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
+        logger.info(f"Requesting {len(requesting)} decisions concurrently (limit={config.MAX_CONCURRENT_REQUESTS}, fast-path={len(deciding) - len(requesting)}).")
+        with self.metrics.phase("decision_batch"):
+            responses = await asyncio.gather(
+                *(self.agents[name].fetch_decision_async(snapshot_messages[name], semaphore) for name in requesting),
+                return_exceptions=True
+            )
+        decisions = dict(zip(requesting, responses))
+        decisions.update({name: action for name, action in local_actions.items() if action is not None})
+
+        # 3. 결정론적 순서로 처리
+        for player_name in player_order:
+            player = self.get_player(player_name)
+            if player_name in decisions and player.is_active():
+                logger.info(f"--- {player_name}'s Turn ---")
+                outcome = decisions[player_name]
+                if local_actions[player_name] is not None:
+                    action = self.agents[player_name].record_fast_path(local_actions[player_name])
+                elif isinstance(outcome, tuple): # (응답, CallTiming)
+                    action = self.agents[player_name].resolve_decision(*outcome)
+                else: # 예외 (마감 초과 포함)
+                    action = self.agents[player_name].resolve_decision(outcome)
+                if self._apply_player_action(player_name, action): break
+
+            elif player_name in decisions:
+                # 결정 요청 이후 이번 턴 도중 탈락/퇴장한 경우 결정은 폐기
+                logger.info(f"Discarding decision of {player_name} (Status changed to {player.status} during the turn).")
+            else:
+                logger.debug("Skipping turn for %s (Status: %s)", player_name, player.status)
+
+        if self.market and not self.game_over:
+            with self.metrics.phase("market_clearing"):
+                await self.market.clear_async()
+        self._end_turn()
 
     def log_turn_summary(self):
         """턴 종료 시 요약 정보 로깅"""
@@ -632,7 +855,6 @@ class Game:
         # 상세 로그를 위해 플레이어별 최종 상태 저장
         self.final_player_statuses = {}
         for player in self.players.values():
-            final_status_reason = player.action_log[-1] if player.action_log else "N/A"
             status_info = {
                 "status": player.status,
                 "stars": player.stars,
@@ -659,6 +881,52 @@ class Game:
         else:
             logger.info("No players eliminated (should not happen if game ended).")
 
+        history_metrics = get_history_metrics(list(self.players.values()))
+        logger.info(f"Action history compaction: {history_metrics}")
+        logger.info(f"Fast-path decisions: {get_fast_path_metrics(self.agents)}")
+        logger.info(f"LLM usage: {self.metrics.totals()}")
+        logger.info(f"Prompt prefixes: {self.prompts.get_metrics()}")
+        logger.info(f"Visibility: {self.visibility.get_metrics()}")
+        logger.info(f"Turn plans: {self.plan_stats}")
+        logger.info(f"Model routing: {self.router.get_metrics()}")
+        if self.market:
+            logger.info(f"Trade market: {self.market.get_metrics()}")
+
+    def get_result(self) -> Dict[str, Any]:
+        """게임 결과 요약 (배치 실행/통계용)"""
+        return {
+            "turns": self.current_turn,
+            "game_over": self.game_over,
+            "players": [
+                {
+                    "name": player.name,
+                    "status": player.status,
+                    "survived": player.status == config.PLAYER_STATUS_OUT_SUCCESS,
+                    "stars": player.stars,
+                    "cards": player.get_total_cards(),
+                    "money": player.money,
+                    "initial_loan": player.initial_loan,
+                }
+                for player in self.players.values()
+            ],
+            "llm": self.metrics.totals(),
+        }
+
+    def write_metrics_report(self, name: str = None):
+        """계측 리포트를 config.METRICS_DIR 에 저장 (JSON, 설정 시 Prometheus 텍스트도)"""
+        name = name or time.strftime("game_%Y%m%d_%H%M%S")
+        prometheus = config.METRICS_PROMETHEUS or os.getenv("METRICS_PROMETHEUS") == "1"
+        self.metrics.sections["prompts"] = self.prompts.get_metrics()
+        self.metrics.sections["fast_path"] = get_fast_path_metrics(self.agents)
+        self.metrics.sections["visibility"] = self.visibility.get_metrics()
+        self.metrics.sections["turn_plans"] = dict(self.plan_stats)
+        self.metrics.sections["routing"] = self.router.get_metrics()
+        if self.market:
+            self.metrics.sections["market"] = self.market.get_metrics()
+        paths = self.metrics.write(config.METRICS_DIR, name, prometheus=prometheus)
+        logger.info(f"Metrics report written: {paths}")
+        return paths
+
     def get_game_rules_summary(self) -> str:
         """Agent에게 제공할 게임 규칙 요약"""
         return f"""
@@ -670,19 +938,43 @@ class Game:
         - 생존 조건: 총 {config.MAX_TURNS*config.TIME_PER_TURN}분 ({config.MAX_TURNS}턴) 안에 1) 모든 카드 소진, 2) 별 3개 이상 보유.
         - 탈락 조건: 별 0개 이하가 되거나, 제한 시간 초과 시.
         - 목표: 생존 조건을 만족하고 게임에서 나가는 것 ('declare_out_of_game' 함수 사용).
-        - 상호작용: `propose_trade`, `propose_match` 함수로 제안. 제안 받은 경우 AI가 응답.
+        - 상호작용: `propose_trade`, `propose_match` 함수로 제안. 제안 받은 경우 AI가 응답.{self._market_rules_line()}
         - 행동 없음: `do_nothing` 함수 사용 가능.
         - 시간: 매 턴 10분씩 감소.
         """
 
+    def _market_rules_line(self) -> str:
+        if not self.market:
+            return ""
+        return "\n        - 거래 시장: 거래 제안은 즉시 응답받지 않고 주문장에 올라가며, 턴 종료 시 상대방이 받은 제안을 한꺼번에 검토해 체결됩니다. 서로 조건이 맞는 맞교환 제안은 바로 체결됩니다."
+
     def run_simulation(self):
         """게임 시뮬레이션 실행"""
+        if config.USE_ASYNC_TURN_ENGINE:
+            import asyncio
+            asyncio.run(self.run_simulation_async())
+            return
+
         while not self.game_over:
             self.progress_turn()
             # time.sleep(1)
 
+    async def run_simulation_async(self):
+        """비동기 턴 엔진으로 게임 시뮬레이션 실행"""
+        while not self.game_over:
+            await self.progress_turn_async()
+
+    def render_turn_logs(self, turns: List[int]) -> str:
+        """지정한 턴들의 이벤트를 '--- Turn N ---' 블록으로 렌더링"""
+        blocks = []
+        for turn in turns:
+            lines = [f"[{event.player}] {event.render_body()}" for event in self.events.for_turn(turn)]
+            blocks.append(f"\n--- Turn {turn} ---\n" + "\n".join(lines) + "\n")
+        return "".join(blocks)
+
     def generate_narrative_summary(self):
-        """AI를 사용하여 게임의 서사적 요약을 생성합니다."""
+        """AI를 사용하여 게임의 서사적 요약을 생성합니다. (턴 구간 요약 -> 병합 -> 최종 서사 스트리밍)"""
+        from game.narrative import NarrativeBuilder
         if not self.game_over:
             logger.warning("게임이 끝나기 전에 서사 요약을 생성할 수 없습니다.")
             return
@@ -691,117 +983,14 @@ class Game:
         logger.info("AI를 사용하여 서사 요약 생성 중...")
         logger.info("="*30)
 
-        # 1. 모든 로그와 최종 상태 수집
-        full_log_text = ""
-        # 턴별로 로그를 모아 시간 순서대로 재구성
-        turn_logs = {} # {turn_number: [log_entry_string, ...]}
-
-        max_log_turn = 0
-        for name, player in self.players.items():
-            for log_entry in player.action_log:
-                 try:
-                     # 로그에서 턴 번호 추출 시도
-                     if log_entry.startswith("Turn "):
-                         turn_part = log_entry.split(":")[0] # "Turn X"
-                         turn_num = int(turn_part.split(" ")[1])
-                         max_log_turn = max(max_log_turn, turn_num)
-                         if turn_num not in turn_logs:
-                             turn_logs[turn_num] = []
-                         # 플레이어 이름과 함께 로그 추가
-                         turn_logs[turn_num].append(f"[{name}] {log_entry}")
-                     # 'Status changed' 로그 등 턴 정보 없는 경우 처리 (선택적)
-                     # else:
-                     #     if 0 not in turn_logs: turn_logs[0] = [] # 턴 0 또는 별도 그룹
-                     #     turn_logs[0].append(f"[{name}] {log_entry}")
-                 except Exception as e:
-                     logger.debug(f"Could not parse turn number from log: {log_entry} - {e}")
-                     # 파싱 실패 시 로그를 마지막 턴에 추가하거나 별도 처리
-                     if max_log_turn not in turn_logs: turn_logs[max_log_turn]=[]
-                     turn_logs[max_log_turn].append(f"[{name}] {log_entry}")
-
-
-        # 시간 순서대로 로그 결합
-        for turn in sorted(turn_logs.keys()):
-             # 턴 0 또는 기타 로그 먼저 표시 (선택적)
-             # if turn == 0:
-             #     full_log_text += "\n--- Game Setup/Misc Logs ---\n"
-             # else:
-             full_log_text += f"\n--- Turn {turn} ---\n"
-             # 해당 턴의 로그 추가
-             full_log_text += "\n".join(turn_logs[turn])
-             full_log_text += "\n"
-
-
-        final_status_summary = "\n--- Final Status ---\n"
-        if hasattr(self, 'final_player_statuses'):
-            for name, status_info in self.final_player_statuses.items():
-                 final_status_summary += (
-                     f"- {name}: Status={status_info['status']}, Stars={status_info['stars']}, "
-                     f"Cards={status_info['cards']}, Money={status_info['money']}\n"
-                 )
-        else: # log_final_results가 호출되지 않은 경우 대비
-             final_status_summary += "최종 상태 정보를 가져올 수 없습니다.\n"
-
-
-        # 2. AI에게 보낼 프롬프트 구성
-        narrative_prompt = f"""
-        다음은 '한정 가위바위보' 게임 시뮬레이션의 상세 로그와 최종 결과입니다.
-        당신은 이 게임의 모든 것을 지켜본 관찰자입니다. 아래 데이터를 바탕으로, 게임에서 벌어진 주요 사건, 플레이어들의 심리와 전략 변화, 결정적인 순간들을 포함하여, 마치 소설의 한 장면이나 흥미로운 분석 칼럼처럼 재구성해주세요.
-
-        **게임 개요:**
-        - 참가자: {list(self.players.keys())}
-        - 시작 조건: 별 {config.INITIAL_STARS}개, 카드 종류별 {config.INITIAL_CARDS_EACH_TYPE}장씩. 일부 플레이어는 초기 대출금이 있음.
-        - 목표: 제한 시간({config.MAX_TURNS*config.TIME_PER_TURN}분, {config.MAX_TURNS}턴) 내에 모든 카드를 소진하고 별 3개 이상을 보유하여 생존.
-        - 주요 행동: 다른 플레이어와 1:1 가위바위보 게임 (승패에 따라 별 이동), 자원(별, 카드, 현금) 거래.
-
-        **상세 게임 로그 (시간 순):**
-        {full_log_text}
-
-        **최종 결과:**
-        {final_status_summary}
-
-        **요청:**
-        위 로그에 기록된 플레이어들의 행동과 명시된 'Reasoning'(이유/근거)을 적극적으로 활용하여, 각 플레이어의 의도와 게임의 흐름을 생생하게 묘사해주세요. 단순히 로그를 나열하는 것이 아니라, 인과 관계와 극적인 요소를 부각하여 전지적 시점에서 읽기 쉬운 글을 작성해야 합니다. 전체 게임을 아우르는 하나의 완성된 이야기나 칼럼 형식으로 만들어주세요.
-        """
-
-        # 3. OpenAI API 호출 (텍스트 생성 요청)
+        # 게임 중 미리 요약된 구간이 있으면 이어서 사용
+        builder = self.narrative or NarrativeBuilder(self)
         try:
-            logger.info("OpenAI API 호출하여 서사 요약 생성 요청 중...")
-            response = client.chat.completions.create(
-                model="gpt-4.1", # 혹은 최신 GPT-4 모델
-                messages=[
-                    {"role": "system", "content": "당신은 복잡한 게임 로그를 분석하여 흥미로운 이야기나 칼럼으로 재구성하는 뛰어난 작가입니다."},
-                    {"role": "user", "content": narrative_prompt}
-                ],
-                temperature=0.7, # 창의성을 위해 약간 높게 설정
-                max_tokens=2048
-            )
-
-            narrative_summary = response.choices[0].message.content
-
             logger.info("--- AI 생성 서사 요약 ---")
-            logger_final.info(narrative_summary)
+            builder.generate()
             logger.info("--- 서사 요약 끝 ---")
-
         except Exception as e:
             logger.error(f"서사 요약 생성 중 오류 발생: {e}")
             print("\n[AI 서사 요약 생성에 실패했습니다.]")
-
-def get_stats_prompt(game: Game, player: Player):
-    prompt = f"""
-        ## 현재 당신의 상태
-        {player.get_current_stats_prompt()}
-
-        ## 현재 감정
-        {player.current_emotion}
-
-        ## 당신의 과거 행동 기록
-        {player.get_action_history()}
-
-        ## 현재 게임 상황 (전광판)
-        {game.get_current_stats_prmopt()}
-
-        ## 다른 활성 플레이어 정보 (이름과 보유 별 개수만 공개됨)
-        {game.get_other_players_info_prompt(player.name)}
-    """
-    return prompt
\ No newline at end of file
+        finally:
+            self.narrative = None
@@ -0,0 +1,239 @@
+from typing import List, Dict, Any, Tuple
+from collections import Counter, defaultdict
+from custom_logger import logger
+from player.events import ProposalEvent, ResponseEvent, ITEM_KEYS
+from agent.prompts import get_stats_prompt
+from llm.deadline import acomplete_with_deadline, DeadlineExceeded
+from config import config
+import json
+
+TRADE_BATCH_SCHEMA = {
+    "name": "trade_batch_decision",
+    "description": "받은 거래 제안 각각에 대해 결정(수락/거절)과 이유를 응답합니다.",
+    "schema": {
+        "type": "object",
+        "properties": {
+            "decisions": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "offer_id": {"type": "integer", "description": "제안 번호"},
+                        "decision": {"type": "string", "enum": ["accept", "reject"]},
+                        "reasoning": {"type": "string", "description": "결정에 대한 이유."}
+                    },
+                    "required": ["offer_id", "decision", "reasoning"]
+                }
+            }
+        },
+        "required": ["decisions"]
+    }
+}
+
+
+class TradeOffer:
+    """주문장에 올라간 거래 제안 1건 (args 는 propose_trade 인자 그대로)"""
+
+    __slots__ = ("offer_id", "proposer", "target", "args", "public_reasoning")
+
+    def __init__(self, offer_id: int, proposer: 'Player', target: 'Player', args: Dict[str, Any], public_reasoning: str):
+        self.offer_id = offer_id
+        self.proposer = proposer
+        self.target = target
+        self.args = args
+        self.public_reasoning = public_reasoning
+
+    def gives(self) -> Tuple[int, ...]:
+        return tuple(self.args.get(f"give_{key}", 0) for key in ITEM_KEYS)
+
+    def receives(self) -> Tuple[int, ...]:
+        return tuple(self.args.get(f"receive_{key}", 0) for key in ITEM_KEYS)
+
+    def crosses(self, other: 'TradeOffer') -> bool:
+        """반대 방향 제안 other 의 조건을 이 제안의 조건이 만족하는지 (other 제안자가 원하는 것 이상을 주고, 내놓겠다는 것 이하를 받음)"""
+        return (other.proposer is self.target and other.target is self.proposer
+                and all(give >= want for give, want in zip(self.gives(), other.receives()))
+                and all(take <= offered for take, offered in zip(self.receives(), other.gives())))
+
+    def render(self) -> str:
+        gives = ", ".join(f"{key} {amount}" for key, amount in zip(ITEM_KEYS, self.gives()) if amount) or "없음"
+        receives = ", ".join(f"{key} {amount}" for key, amount in zip(ITEM_KEYS, self.receives()) if amount) or "없음"
+        return (f"- 제안 #{self.offer_id} ({self.proposer.name}, 별 {self.proposer.stars}개)\n"
+                f"  - 당신에게 주려는 것: {gives}\n"
+                f"  - 당신에게 받으려는 것: {receives}\n"
+                f"  - 제안 이유: {self.public_reasoning}")
+
+
+# --- Trade Market ---
+class TradeMarket:
+    """턴 동안의 거래 제안을 주문장에 모았다가 턴 종료 시 일괄 체결하는 시장 모드
+
+    1. 서로 조건이 맞는 반대 방향 제안은 LLM 호출 없이 체결 (먼저 올라온 제안의 조건)
+    2. 규칙만으로 결론이 나는 제안은 fast-path 로 응답
+    3. 나머지는 상대방(응답자)별로 한 번의 요청에 모아 응답을 받고 (상대방끼리는 동시 요청)
+    4. 수락된 제안을 올라온 순서대로 현재 자원으로 재검증하며 체결
+    """
+
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self.book: List[TradeOffer] = []
+        self._next_id = 1
+        self.stats = Counter()
+
+    def post(self, proposer: 'Player', target: 'Player', args: Dict[str, Any], public_reasoning: str):
+        offer = TradeOffer(self._next_id, proposer, target, args, public_reasoning)
+        self._next_id += 1
+        self.book.append(offer)
+        self.stats["posted"] += 1
+        logger.info(f"{proposer.name} posted trade offer #{offer.offer_id} to {target.name} (order book: {len(self.book)}).")
+        proposer.record(ProposalEvent("trade", "queued", target.name))
+
+    def clear(self):
+        """동기 턴 엔진용 clear_async (스레드별 공용 루프 사용)"""
+        if self.book:
+            from llm.loop import run_sync
+            run_sync(self.clear_async())
+
+    async def clear_async(self):
+        offers, self.book = self.book, []
+        if not offers:
+            return
+        logger.info(f"Clearing trade order book: {len(offers)} offers.")
+        self.stats["clearings"] += 1
+
+        open_offers = []
+        for offer in offers:
+            if offer.proposer.is_active() and offer.target.is_active():
+                open_offers.append(offer)
+            else:
+                self.stats["expired"] += 1
+                offer.proposer.record(ProposalEvent("trade", "target_invalid", offer.target.name))
+
+        decisions: Dict[int, bool] = {}
+        pending = []
+        remaining, counters = self._match_crossing(open_offers, decisions)
+        absorbed = {counter.offer_id for counter in counters.values()}
+        for offer in remaining:
+            fast = self.game.agents[offer.target.name].fast_path.trade_response(self.game, offer.target, offer.proposer, offer.args)
+            if fast is None:
+                pending.append(offer)
+                continue
+            accepted, reasoning = fast
+            self.stats["fast_path"] += 1
+            decision = "accept" if accepted else "reject"
+            offer.target.record(ResponseEvent("trade", offer.proposer.name, "responded", decision=decision, reasoning=reasoning))
+            decisions[offer.offer_id] = accepted
+
+        decisions.update(await self._ask_batches(pending))
+
+        # 올라온 순서대로 체결 (앞선 체결로 자원이 바뀌었을 수 있으므로 매번 재검증)
+        for offer in open_offers:
+            if offer.offer_id in absorbed: # 맞교환 상대 제안으로 이미 체결됨
+                continue
+            accepted = decisions.get(offer.offer_id, False)
+            self.stats["accepted" if accepted else "rejected"] += 1
+            executed = self.game.settle_trade(offer.proposer, offer.target, offer.args, accepted)
+            if executed:
+                self.stats["executed"] += 1
+            counter = counters.get(offer.offer_id)
+            if counter is not None: # 흡수된 상대 제안의 결과는 체결 검증 뒤에 기록
+                counter.proposer.record(ProposalEvent("trade", "matched" if executed else "failed", counter.target.name))
+
+    def _match_crossing(self, offers: List[TradeOffer], decisions: Dict[int, bool]):
+        """서로 조건이 맞는 반대 방향 제안 쌍을 찾아 먼저 올라온 쪽을 수락 처리합니다.
+
+        (응답이 필요한 나머지 제안, 수락 처리된 제안 번호 -> 그 제안에 흡수된 상대 제안) 반환
+        """
+        remaining = []
+        consumed = set()
+        counters: Dict[int, TradeOffer] = {}
+        for index, offer in enumerate(offers):
+            if offer.offer_id in consumed:
+                continue
+            counter = next((other for other in offers[index + 1:] if other.offer_id not in consumed and offer.crosses(other)), None)
+            if counter is None:
+                remaining.append(offer)
+                continue
+            consumed.add(counter.offer_id)
+            counters[offer.offer_id] = counter
+            decisions[offer.offer_id] = True
+            self.stats["auto_matched"] += 1
+            logger.info(f"Offer #{offer.offer_id} ({offer.proposer.name} -> {offer.target.name}) crosses #{counter.offer_id}; matched without asking.")
+            offer.target.record(ResponseEvent("trade", offer.proposer.name, "auto_matched", decision="accept"))
+        return remaining, counters
+
+    async def _ask_batches(self, offers: List[TradeOffer]) -> Dict[int, bool]:
+        """상대방별로 제안을 묶어 (MARKET_MAX_OFFERS_PER_BATCH 단위) 동시에 응답을 요청"""
+        import asyncio
+        by_target = defaultdict(list)
+        for offer in offers:
+            by_target[offer.target.name].append(offer)
+        batches = []
+        for target_offers in by_target.values():
+            for start in range(0, len(target_offers), config.MARKET_MAX_OFFERS_PER_BATCH):
+                batches.append(target_offers[start:start + config.MARKET_MAX_OFFERS_PER_BATCH])
+        if not batches:
+            return {}
+
+        logger.info(f"Requesting {len(batches)} batched trade responses for {len(offers)} offers.")
+        semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
+        results = await asyncio.gather(*(self._ask_batch(batch, semaphore) for batch in batches))
+        decisions = {}
+        for result in results:
+            decisions.update(result)
+        return decisions
+
+    async def _ask_batch(self, offers: List[TradeOffer], semaphore) -> Dict[int, bool]:
+        target = offers[0].target
+        self.stats["batch_calls"] += 1
+        self.stats["batched_offers"] += len(offers)
+        offer_list = "\n".join(offer.render() for offer in offers)
+        messages = self.game.prompts.messages(target, "trade_batch_response", f"""
+            ## 이번 턴에 받은 거래 제안 ({len(offers)}건)
+            {offer_list}
+
+            {get_stats_prompt(self.game, target)}
+
+            ## 당신의 결정
+            각 제안 번호마다 수락 여부를 결정하세요. 수락한 제안은 번호 순서대로 체결되며, 그 시점에 자원이 부족하면 체결되지 않습니다.
+            """)
+        route = self.game.router.route("market_response", target, default=config.MARKET_RESPONSE_MODEL, trades=[offer.args for offer in offers])
+        meta = self.game.llm_meta("market_response", target, offer_ids=[offer.offer_id for offer in offers], route=route.label)
+        request = {
+            "model": route.model,
+            "messages": messages,
+            "response_format": {"type": "json_schema", "json_schema": TRADE_BATCH_SCHEMA},
+            "temperature": 0.5
+        }
+
+        try:
+            async with semaphore:
+                response, timing = await acomplete_with_deadline(request, meta, self.game.call_deadline())
+            data = json.loads(response.choices[0].message.content)
+            answers = {item.get("offer_id"): item for item in data.get("decisions", []) if isinstance(item, dict)}
+        except DeadlineExceeded as e:
+            logger.warning(f"Batched trade response of {target.name} missed the deadline ({e}). Defaulting to reject.")
+            for offer in offers:
+                target.record(ResponseEvent("trade", offer.proposer.name, "deadline_default", decision="reject", timing=e.timing.flags()))
+            return {offer.offer_id: False for offer in offers}
+        except Exception as e:
+            logger.error(f"Error getting batched trade response from {target.name}: {e}")
+            for offer in offers:
+                target.record(ResponseEvent("trade", offer.proposer.name, "api_error"))
+            return {offer.offer_id: False for offer in offers}
+
+        decisions = {}
+        for offer in offers:
+            answer = answers.get(offer.offer_id, {})
+            decision = answer.get("decision", "reject")
+            reasoning = answer.get("reasoning", "No decision provided.")
+            logger.info(f"{target.name}'s response to trade offer #{offer.offer_id} from {offer.proposer.name}: {decision}. Reasoning: {reasoning}")
+            target.record(ResponseEvent("trade", offer.proposer.name, "responded", decision=decision, reasoning=reasoning, timing=timing.flags()))
+            decisions[offer.offer_id] = decision == "accept"
+        return decisions
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.stats)
+        if self.stats["batch_calls"]:
+            metrics["offers_per_call"] = round(self.stats["batched_offers"] / self.stats["batch_calls"], 2)
+        return metrics
@@ -0,0 +1,217 @@
+from typing import List, Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
+from custom_logger import logger, logger_final
+from custom_logger.handlers import FILE_ONLY
+from llm import get_backend
+from llm.tokens import estimate_tokens
+from config import config
+import contextvars
+import sys
+
+NARRATIVE_SYSTEM_PROMPT = "당신은 복잡한 게임 로그를 분석하여 흥미로운 이야기나 칼럼으로 재구성하는 뛰어난 작가입니다."
+
+
+class _StreamPrinter:
+    """스트리밍 조각을 stdout 에는 바로, logger_final 에는 줄 단위로 기록 (콘솔 중복 출력 없이 파일에만)"""
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self._line = ""
+
+    def __call__(self, delta: str):
+        self.parts.append(delta)
+        sys.stdout.write(delta)
+        sys.stdout.flush()
+        self._line += delta
+        while "\n" in self._line:
+            line, self._line = self._line.split("\n", 1)
+            logger_final.info(line, extra=FILE_ONLY)
+
+    def close(self) -> str:
+        if self._line:
+            logger_final.info(self._line, extra=FILE_ONLY)
+            self._line = ""
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+        return "".join(self.parts)
+
+
+# --- Narrative Pipeline ---
+class NarrativeBuilder:
+    """긴 게임의 서사 요약을 map-reduce 로 생성
+
+    1. map: NARRATIVE_WINDOW_TURNS 턴 구간마다 로그를 요약 (구간 로그가 NARRATIVE_MAX_CHUNK_TOKENS 를 넘으면 여러 조각으로 나눔)
+       게임 진행 중에는 on_turn_end 에서 끝난 구간을 백그라운드 스레드로 미리 요약합니다.
+    2. reduce: 부분 요약을 NARRATIVE_MERGE_FANOUT 개씩 병렬로 병합 (합이 NARRATIVE_FINAL_INPUT_TOKENS 이하가 될 때까지)
+    3. 최종 서사를 스트리밍으로 받아 stdout 과 logger_final 에 바로 출력
+    """
+
+    def __init__(self, game: 'Game', window_turns: int = None):
+        self.game = game
+        self.window_turns = window_turns or config.NARRATIVE_WINDOW_TURNS
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._partials: List[Tuple[int, int, Future]] = [] # (첫 턴, 마지막 턴, 요약 future), 턴 순서
+        self._next_turn = 1 # 아직 요약 요청하지 않은 첫 턴
+
+    def _submit(self, fn, *args) -> Future:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=config.NARRATIVE_MAX_WORKERS, thread_name_prefix="narrative")
+        # 게임 스레드의 컨텍스트(게임별 수집기/프로파일러)를 이어받아 실행
+        return self._executor.submit(contextvars.copy_context().run, fn, *args)
+
+    # --- map ---
+
+    def on_turn_end(self, turn: int):
+        """turn 까지 끝났을 때 호출. 완성된 구간의 요약을 백그라운드로 요청"""
+        while self._next_turn + self.window_turns - 1 <= turn:
+            self._map_window(self._next_turn, self._next_turn + self.window_turns - 1)
+
+    def _map_window(self, first: int, last: int):
+        self._next_turn = last + 1
+        turns = [turn for turn in range(first, last + 1) if self.game.events.for_turn(turn)]
+        if not turns:
+            return
+        # 로그 렌더링은 게임 스레드에서 (이후 이벤트가 추가되어도 영향 없음)
+        chunks = self._split(self.game.render_turn_logs(turns))
+        for index, chunk in enumerate(chunks, 1):
+            label = f"턴 {first}-{last}" + (f" ({index}/{len(chunks)})" if len(chunks) > 1 else "")
+            self._partials.append((first, last, self._submit(self._summarize_window, label, chunk)))
+        logger.debug("Narrative window %s queued (%d chunks).", f"{first}-{last}", len(chunks))
+
+    @staticmethod
+    def _split(log_text: str) -> List[str]:
+        """NARRATIVE_MAX_CHUNK_TOKENS 이하가 되도록 줄 단위로 나눔"""
+        chunks, lines, tokens = [], [], 0
+        for line in log_text.splitlines(keepends=True):
+            line_tokens = estimate_tokens(line)
+            if lines and tokens + line_tokens > config.NARRATIVE_MAX_CHUNK_TOKENS:
+                chunks.append("".join(lines))
+                lines, tokens = [], 0
+            lines.append(line)
+            tokens += line_tokens
+        if lines:
+            chunks.append("".join(lines))
+        return chunks
+
+    def _summarize_window(self, label: str, log_text: str) -> str:
+        prompt = f"""
+        다음은 '한정 가위바위보' 게임 로그 중 {label} 부분입니다.
+        이 구간에서 벌어진 주요 사건(거래, 게임, 탈락)과 플레이어들이 밝힌 의도('Reasoning')를 시간 순서대로 간결하게 요약하세요.
+        나중에 다른 구간 요약과 합쳐 전체 이야기를 만들 때 쓰이므로, 인과 관계와 결정적인 순간, 플레이어 이름을 빠뜨리지 마세요.
+
+        **게임 로그 ({label}):**
+        {log_text}
+        """
+        return self._complete(prompt, "narrative_window", config.NARRATIVE_MAP_MODEL, config.NARRATIVE_SUMMARY_MAX_TOKENS)
+
+    # --- reduce ---
+
+    @staticmethod
+    def _sections(summaries: List[Tuple[int, int, str]]) -> str:
+        return "\n\n".join(f"### 턴 {first}-{last}\n{summary}" for first, last, summary in summaries)
+
+    def _merge(self, summaries: List[Tuple[int, int, str]]) -> str:
+        sections = self._sections(summaries)
+        prompt = f"""
+        다음은 '한정 가위바위보' 게임의 연속된 구간별 요약입니다.
+        이를 하나의 시간 순 요약으로 합치세요. 여러 구간에 걸친 플레이어의 전략 변화와 관계(배신, 협력, 복수)를 연결하고, 중복은 줄이세요.
+
+        {sections}
+        """
+        return self._complete(prompt, "narrative_merge", config.NARRATIVE_MAP_MODEL, config.NARRATIVE_SUMMARY_MAX_TOKENS)
+
+    def _reduce(self, summaries: List[Tuple[int, int, str]]) -> List[Tuple[int, int, str]]:
+        """부분 요약의 토큰 합이 최종 입력 한도 이하가 될 때까지 계층적으로 병합 (같은 단계의 병합은 병렬)"""
+        fanout = max(2, config.NARRATIVE_MERGE_FANOUT)
+        while len(summaries) > 1 and sum(estimate_tokens(summary) for _, _, summary in summaries) > config.NARRATIVE_FINAL_INPUT_TOKENS:
+            groups = [summaries[start:start + fanout] for start in range(0, len(summaries), fanout)]
+            logger.info(f"Merging {len(summaries)} narrative summaries into {len(groups)}.")
+            futures = [self._submit(self._merge, group) if len(group) > 1 else None for group in groups]
+            summaries = [
+                (group[0][0], group[-1][1], future.result()) if future else group[0]
+                for group, future in zip(groups, futures)
+            ]
+        return summaries
+
+    # --- 최종 서사 ---
+
+    def generate(self) -> str:
+        """남은 구간을 요약하고 병합한 뒤 최종 서사를 스트리밍하고, 전체 서사 텍스트를 반환"""
+        last_turn = max(self.game.events.turns(), default=0)
+        if self._next_turn <= last_turn:
+            self._map_window(self._next_turn, last_turn)
+
+        summaries = []
+        for first, last, future in self._partials:
+            try:
+                summaries.append((first, last, future.result()))
+            except Exception as e:
+                logger.error(f"Narrative summary for turns {first}-{last} failed: {e}")
+                summaries.append((first, last, "(이 구간의 요약을 생성하지 못했습니다.)"))
+
+        try:
+            return self._stream_final(self._reduce(summaries))
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+    def _final_status(self) -> str:
+        final_status_summary = "\n--- Final Status ---\n"
+        if hasattr(self.game, 'final_player_statuses'):
+            for name, status_info in self.game.final_player_statuses.items():
+                final_status_summary += (
+                    f"- {name}: Status={status_info['status']}, Stars={status_info['stars']}, "
+                    f"Cards={status_info['cards']}, Money={status_info['money']}\n"
+                )
+        else: # log_final_results가 호출되지 않은 경우 대비
+            final_status_summary += "최종 상태 정보를 가져올 수 없습니다.\n"
+        return final_status_summary
+
+    def _stream_final(self, summaries: List[Tuple[int, int, str]]) -> str:
+        narrative_prompt = f"""
+        다음은 '한정 가위바위보' 게임 시뮬레이션의 구간별 요약과 최종 결과입니다.
+        당신은 이 게임의 모든 것을 지켜본 관찰자입니다. 아래 데이터를 바탕으로, 게임에서 벌어진 주요 사건, 플레이어들의 심리와 전략 변화, 결정적인 순간들을 포함하여, 마치 소설의 한 장면이나 흥미로운 분석 칼럼처럼 재구성해주세요.
+
+        **게임 개요:**
+        - 참가자: {list(self.game.players.keys())}
+        - 시작 조건: 별 {config.INITIAL_STARS}개, 카드 종류별 {config.INITIAL_CARDS_EACH_TYPE}장씩. 일부 플레이어는 초기 대출금이 있음.
+        - 목표: 제한 시간({config.MAX_TURNS*config.TIME_PER_TURN}분, {config.MAX_TURNS}턴) 내에 모든 카드를 소진하고 별 3개 이상을 보유하여 생존.
+        - 주요 행동: 다른 플레이어와 1:1 가위바위보 게임 (승패에 따라 별 이동), 자원(별, 카드, 현금) 거래.
+
+        **구간별 요약 (시간 순):**
+        {self._sections(summaries)}
+
+        **최종 결과:**
+        {self._final_status()}
+
+        **요청:**
+        요약에 기록된 플레이어들의 행동과 의도를 적극적으로 활용하여, 각 플레이어의 의도와 게임의 흐름을 생생하게 묘사해주세요. 단순히 사건을 나열하는 것이 아니라, 인과 관계와 극적인 요소를 부각하여 전지적 시점에서 읽기 쉬운 글을 작성해야 합니다. 전체 게임을 아우르는 하나의 완성된 이야기나 칼럼 형식으로 만들어주세요.
+        """
+        route = self.game.router.route("narrative", default=config.NARRATIVE_MODEL)
+        printer = _StreamPrinter()
+        try:
+            get_backend().stream(self._request(route.model, narrative_prompt, config.NARRATIVE_MAX_TOKENS, temperature=0.7),
+                                 self.game.llm_meta("narrative", route=route.label), printer)
+        finally:
+            narrative = printer.close()
+        return narrative
+
+    # --- 공통 ---
+
+    @staticmethod
+    def _request(model: str, prompt: str, max_tokens: int, temperature: float = 0.3) -> Dict[str, Any]:
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": NARRATIVE_SYSTEM_PROMPT},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+
+    def _complete(self, prompt: str, call_site: str, default_model: str, max_tokens: int) -> str:
+        route = self.game.router.route(call_site, default=default_model)
+        response = get_backend().complete(self._request(route.model, prompt, max_tokens), self.game.llm_meta(call_site, route=route.label))
+        return response.choices[0].message.content or ""
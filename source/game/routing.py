@@ -0,0 +1,144 @@
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from custom_logger import logger
+from player.events import ITEM_KEYS
+from config import config
+import os
+import threading
+
+
+class Route(NamedTuple):
+    """라우팅 결정: 사용할 모델과 이유. label 은 meta["route"] 로 전달되어 호출 결과(지연/비용)가 결정별로 집계됨"""
+    model: str
+    reason: str
+    label: str
+
+
+def _budget(env: str, value: Optional[float]) -> Optional[float]:
+    raw = os.getenv(env)
+    if raw:
+        return float(raw)
+    return value
+
+
+# --- Model Router ---
+class ModelRouter:
+    """호출 위치와 게임 상황에 따라 LLM 모델을 고릅니다.
+
+    1. 호출 위치별 기본 모델 (MODEL_ROUTES, 없으면 호출부가 넘긴 기본값)
+    2. 상황 규칙
+       - complex_trade: 자원 종류가 ROUTING_COMPLEX_TRADE_ITEMS 이상 오가는 거래 응답은 가장 큰 모델로 승격
+       - simple_match: 낼 수 있는 카드 종류가 적은 게임 응답은 ROUTING_SMALL_MODEL
+       - endgame: 대부분의 플레이어가 끝난(탈락/퇴장) 게임의 결정/응답은 ROUTING_SMALL_MODEL
+    3. 게임당 예산 (추정 비용, LLM 호출 지연 합계): 예산의 ROUTING_BUDGET_SOFT_RATIO 를 넘으면 MODEL_LADDER 한 단계 강등,
+       예산을 넘으면 가장 저렴한 모델. 사용량은 게임의 MetricsCollector 합계를 사용하므로 계측이 꺼져 있으면 적용되지 않습니다.
+
+    결정은 "호출 위치/모델/이유" 라벨로 meta 에 실려 MetricsCollector.by_route 에 지연/비용 결과와 함께 집계됩니다.
+    """
+
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self.enabled = config.MODEL_ROUTING_ENABLED
+        self.ladder = list(config.MODEL_LADDER)
+        self.cost_budget = _budget("ROUTING_COST_BUDGET_USD", config.ROUTING_COST_BUDGET_USD)
+        self.latency_budget = _budget("ROUTING_LATENCY_BUDGET_SECONDS", config.ROUTING_LATENCY_BUDGET_SECONDS)
+        self.decisions: Dict[str, int] = {} # 라벨 -> 결정 횟수
+        self._lock = threading.Lock() # 서사 요약 스레드에서도 호출됨
+        self._budget_level = 0 # 0: 여유, 1: 한 단계 강등, 2: 가장 저렴한 모델 (단계가 바뀔 때만 로그)
+
+    # --- 상황 규칙 ---
+
+    @staticmethod
+    def _trade_items(args: Dict[str, Any]) -> int:
+        return sum(1 for side in ("give", "receive") for key in ITEM_KEYS if args.get(f"{side}_{key}", 0))
+
+    def _endgame(self) -> bool:
+        total = len(self.game.players)
+        finished = total - len(self.game.state_index.active)
+        return bool(total) and finished / total >= config.ROUTING_ENDGAME_FINISHED_RATIO
+
+    def _situation(self, call_site: str, situation: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """(모델, 이유) 또는 None (기본 모델 유지)"""
+        trades: List[Dict[str, Any]] = situation.get("trades") or []
+        if any(self._trade_items(args) >= config.ROUTING_COMPLEX_TRADE_ITEMS for args in trades):
+            return self.ladder[-1], "complex_trade"
+        if call_site == "match_response" and len(situation.get("available_cards") or ()) <= config.ROUTING_SIMPLE_MATCH_MAX_CARD_TYPES:
+            return config.ROUTING_SMALL_MODEL, "simple_match"
+        if call_site in ("decision", "trade_response", "match_response", "market_response") and self._endgame():
+            return config.ROUTING_SMALL_MODEL, "endgame"
+        return None
+
+    # --- 예산 ---
+
+    def _usage_level(self) -> Tuple[int, str]:
+        """(예산 단계, 예산 종류). 두 예산 중 더 많이 쓴 쪽 기준"""
+        totals = self.game.metrics.totals()
+        level, kind = 0, ""
+        for name, budget, used in (("cost", self.cost_budget, totals["cost_usd"]), ("latency", self.latency_budget, totals["llm_seconds"])):
+            if not budget:
+                continue
+            usage = used / budget
+            name_level = 2 if usage >= 1.0 else 1 if usage >= config.ROUTING_BUDGET_SOFT_RATIO else 0
+            if name_level > level:
+                level, kind = name_level, name
+        return level, kind
+
+    def _downgrade(self, model: str, level: int) -> str:
+        if level >= 2:
+            return self.ladder[0]
+        if model in self.ladder:
+            return self.ladder[max(0, self.ladder.index(model) - 1)]
+        return model
+
+    # --- 라우팅 ---
+
+    def route(self, call_site: str, player: Optional['Player'] = None, default: Optional[str] = None, **situation) -> Route:
+        """call_site 호출에 사용할 모델. situation: trades=[거래 인자, ...], available_cards=[...]"""
+        model = config.MODEL_ROUTES.get(call_site) or default
+        reason = "default"
+        if self.enabled:
+            rule = self._situation(call_site, situation)
+            if rule and rule[0] != model:
+                model, reason = rule
+            if self.cost_budget or self.latency_budget:
+                level, kind = self._usage_level()
+                if level != self._budget_level:
+                    logger.warning(f"Model routing budget level changed: {self._budget_level} -> {level} ({kind or 'within budget'}).")
+                    self._budget_level = level
+                if level:
+                    downgraded = self._downgrade(model, level)
+                    if downgraded != model:
+                        model, reason = downgraded, f"{kind}_budget"
+
+        label = f"{call_site}/{model}/{reason}"
+        with self._lock:
+            self.decisions[label] = self.decisions.get(label, 0) + 1
+        if reason != "default":
+            logger.debug("Routed %s%s to %s (%s).", call_site, f" for {player.name}" if player else "", model, reason)
+        return Route(model, reason, label)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """체크포인트용 상태 (결정 횟수와 예산 단계)"""
+        with self._lock:
+            return {"decisions": dict(self.decisions), "budget_level": self._budget_level}
+
+    def restore(self, state: Dict[str, Any]):
+        with self._lock:
+            self.decisions = dict(state["decisions"])
+        self._budget_level = state["budget_level"]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """라우팅 결정별 횟수와 호출 결과 (평균 지연, 추정 비용)"""
+        outcomes = self.game.metrics.by_route
+        with self._lock:
+            decisions = sorted(self.decisions.items())
+        routes = {}
+        for label, count in decisions:
+            stats = outcomes.get(label)
+            routes[label] = {
+                "decisions": count,
+                "calls": stats.calls if stats else 0,
+                "mean_latency": round(stats.latency.sum / stats.calls, 4) if stats and stats.calls else 0.0,
+                "cost_usd": round(stats.cost_usd, 6) if stats else 0.0,
+            }
+        return {"enabled": self.enabled, "budget_level": self._budget_level, "cost_budget_usd": self.cost_budget,
+                "latency_budget_seconds": self.latency_budget, "routes": routes}
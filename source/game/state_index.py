@@ -0,0 +1,121 @@
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+CARD_TYPES = ("rock", "scissors", "paper")
+_INACTIVE = (False, 0, (0, 0, 0))
+
+
+# --- Game State Index ---
+class GameStateIndex:
+    """활성 플레이어 집합과 전광판 집계를 증분으로 유지하는 인덱스
+
+    플레이어 자원/상태가 바뀐 직후 refresh(player) 를 호출하면 그 플레이어의 이전 기여분과 비교해
+    카드 종류별 합계, 별 합계, 활성 집합을 O(1) 로 갱신합니다.
+    공개 정보(이름, 별)는 플레이어별 dict 를 제자리에서 고치고, 목록은 활성 집합이 바뀔 때만 다시 만듭니다.
+    리더보드는 별/활성 집합이 바뀐 뒤 처음 조회할 때 한 번 정렬합니다.
+    별 개수별 활성 플레이어 버킷(by_stars)은 시야 모델(game.visibility)의 상위/후보/집계 조회에 사용됩니다.
+    """
+
+    def __init__(self):
+        self.active: Dict[str, 'Player'] = {} # 이름 -> 플레이어 (등록 순서 유지)
+        self.card_totals = {card_type: 0 for card_type in CARD_TYPES} # 활성 플레이어 기준
+        self.star_total = 0 # 활성 플레이어 기준
+        self.by_stars: Dict[int, Dict[str, 'Player']] = {} # 별 개수 -> 활성 플레이어 (버킷 안에서는 최근에 들어온 순서)
+        self._order: Dict[str, int] = {} # 등록 순서 (턴 순서와 동일)
+        self._contributions: Dict[str, Tuple[bool, int, Tuple[int, int, int]]] = {}
+        self._info: Dict[str, Dict[str, Any]] = {} # 이름 -> 공개 정보 dict (별 변화 시 제자리 갱신)
+        self._active_list: Optional[List['Player']] = None
+        self._public_info: Optional[List[Dict[str, Any]]] = None
+        self._leaderboard: Optional[List[Dict[str, Any]]] = None
+        self.refreshes = 0
+        self.rebuilds = 0
+
+    def add(self, player: 'Player'):
+        self._order.setdefault(player.name, len(self._order))
+        self.refresh(player)
+
+    def refresh(self, player: 'Player'):
+        """플레이어의 현재 상태로 집계를 갱신합니다. (변화가 없으면 아무것도 하지 않음)"""
+        self.refreshes += 1
+        old = self._contributions.get(player.name, _INACTIVE)
+        if player.is_active():
+            new = (True, player.stars, tuple(player.cards[card_type] for card_type in CARD_TYPES))
+        else:
+            new = _INACTIVE
+        if new == old:
+            return
+
+        self._contributions[player.name] = new
+        self.star_total += new[1] - old[1]
+        if old[0]:
+            self._bucket_remove(player.name, old[1])
+        if new[0]:
+            self.by_stars.setdefault(new[1], {})[player.name] = player
+        for card_type, before, after in zip(CARD_TYPES, old[2], new[2]):
+            self.card_totals[card_type] += after - before
+
+        if new[0] != old[0]:
+            if new[0]:
+                out_of_order = self.active and self._order[player.name] < self._order[next(reversed(self.active))]
+                self.active[player.name] = player
+                self._info[player.name] = {"user_name": player.name, "user_stars": player.stars}
+                if out_of_order:
+                    # 다시 활성화된 경우(체크포인트 복원 등)에도 등록 순서 유지
+                    self.active = dict(sorted(self.active.items(), key=lambda item: self._order[item[0]]))
+            else:
+                self.active.pop(player.name, None)
+                self._info.pop(player.name, None)
+            self._active_list = None
+            self._public_info = None
+            self._leaderboard = None
+        elif new[1] != old[1]:
+            self._info[player.name]["user_stars"] = player.stars
+            self._leaderboard = None
+
+    def rebuild(self, players: Iterable['Player']):
+        """전체 재계산 (체크포인트 복원처럼 플레이어 상태를 직접 덮어쓴 뒤 사용)"""
+        self.rebuilds += 1
+        self.active = {}
+        self.card_totals = {card_type: 0 for card_type in CARD_TYPES}
+        self.star_total = 0
+        self.by_stars = {}
+        self._contributions = {}
+        self._info = {}
+        self._active_list = self._public_info = self._leaderboard = None
+        for player in players:
+            self.add(player)
+
+    def _bucket_remove(self, name: str, stars: int):
+        bucket = self.by_stars[stars]
+        del bucket[name]
+        if not bucket:
+            del self.by_stars[stars]
+
+    # --- 조회 ---
+
+    def active_players(self) -> List['Player']:
+        """활성 플레이어 목록 (캐시된 목록이므로 호출부에서 수정하지 말 것)"""
+        if self._active_list is None:
+            self._active_list = list(self.active.values())
+        return self._active_list
+
+    def active_count(self) -> int:
+        return len(self.active)
+
+    def public_info(self) -> List[Dict[str, Any]]:
+        """활성 플레이어의 공개 정보 (이름과 별 개수, 턴 순서)"""
+        if self._public_info is None:
+            self._public_info = [self._info[name] for name in self.active]
+        return self._public_info
+
+    def leaderboard(self) -> List[Dict[str, Any]]:
+        """별 개수 내림차순 공개 리더보드 (동률은 턴 순서)"""
+        if self._leaderboard is None:
+            self._leaderboard = sorted(self.public_info(), key=lambda info: -info["user_stars"])
+        return self._leaderboard
+
+    def star_counts(self) -> Dict[int, int]:
+        """별 개수 -> 활성 플레이어 수"""
+        return {stars: len(bucket) for stars, bucket in self.by_stars.items()}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {"refreshes": self.refreshes, "rebuilds": self.rebuilds, "active": len(self.active)}
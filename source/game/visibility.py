@@ -0,0 +1,135 @@
+from typing import List, Dict, Iterable, Optional, Tuple
+from llm.tokens import estimate_tokens
+from config import config
+
+
+# --- Visibility Model ---
+class VisibilityModel:
+    """플레이어별 공개 정보 시야 (대규모 로비에서 '다른 활성 플레이어 정보' 섹션 크기를 제한)
+
+    다른 활성 플레이어 전체 목록이 VISIBILITY_TOKEN_BUDGET 안에 들어가면 그대로 보여주고,
+    넘으면 아래 우선순위로 개별 항목을 예산까지 채운 뒤 나머지는 별 개수별 인원 집계로 보여줍니다.
+    1. 별 개수 상위 VISIBILITY_TOP_K 명
+    2. 최근 상호작용(거래/게임/제안) 상대 VISIBILITY_RECENT_PARTNERS 명
+    3. 필요한 것을 가진 상대 VISIBILITY_CANDIDATES 명: 별이 부족하면 별이 남는 플레이어, 아니면 별이 부족한 플레이어 (판매 상대)
+       (카드 보유량은 비공개이므로 공개 정보인 별 개수만 사용)
+
+    조회는 모두 증분 인덱스(state_index.by_stars, events.recent_partners)를 사용하므로 비용이 로비 크기에 비례하지 않습니다.
+    """
+
+    def __init__(self, game: 'Game', token_budget: int = None):
+        self.game = game
+        self.token_budget = token_budget or config.VISIBILITY_TOKEN_BUDGET
+        self.views = 0
+        self.partial_views = 0
+
+    # --- 후보 조회 ---
+
+    def _by_stars_desc(self) -> Iterable['Player']:
+        by_stars = self.game.state_index.by_stars
+        for stars in sorted(by_stars, reverse=True):
+            yield from by_stars[stars].values()
+
+    def _surplus_stars(self) -> Iterable['Player']:
+        by_stars = self.game.state_index.by_stars
+        for stars in sorted((stars for stars in by_stars if stars > config.SURVIVAL_STARS), reverse=True):
+            yield from by_stars[stars].values()
+
+    def _short_of_stars(self) -> Iterable['Player']:
+        by_stars = self.game.state_index.by_stars
+        for stars in sorted(stars for stars in by_stars if stars < config.SURVIVAL_STARS):
+            yield from by_stars[stars].values()
+
+    def _recent_partners(self, player: 'Player') -> Iterable['Player']:
+        for name in self.game.events.recent_partners(player.name):
+            partner = self.game.state_index.active.get(name)
+            if partner is not None:
+                yield partner
+
+    def _sections(self, player: 'Player') -> List[Tuple[str, Iterable['Player'], int]]:
+        if player.stars < config.SURVIVAL_STARS:
+            candidates = ("별 여유", self._surplus_stars())
+        else:
+            candidates = ("별 부족", self._short_of_stars())
+        return [
+            ("상위", self._by_stars_desc(), config.VISIBILITY_TOP_K),
+            ("최근 상대", self._recent_partners(player), config.VISIBILITY_RECENT_PARTNERS),
+            (candidates[0], candidates[1], config.VISIBILITY_CANDIDATES),
+        ]
+
+    # --- 시야 구성 ---
+
+    @staticmethod
+    def _line(other: 'Player', tag: str = "") -> str:
+        return f"- {other.name}: 별 {other.stars}개" + (f" ({tag})" if tag else "")
+
+    def _full_view(self, player: 'Player') -> Optional[List[Tuple['Player', str]]]:
+        """전체 목록이 예산 안에 들어가면 턴 순서대로의 항목, 아니면 None (예산을 넘는 순간 중단)"""
+        entries, tokens = [], 0
+        for other in self.game.state_index.active_players():
+            if other is player:
+                continue
+            tokens += estimate_tokens(self._line(other))
+            if tokens > self.token_budget:
+                return None
+            entries.append((other, ""))
+        return entries
+
+    def view(self, player: 'Player') -> Tuple[List[Tuple['Player', str]], Optional[str]]:
+        """(개별로 보이는 (플레이어, 표시) 목록, 나머지 집계 줄 또는 None)"""
+        entries = self._full_view(player)
+        if entries is not None:
+            return entries, None
+
+        shown: Dict[str, None] = {player.name: None}
+        entries, tokens = [], 0
+        for tag, others, limit in self._sections(player):
+            count = 0
+            for other in others:
+                if count >= limit:
+                    break
+                if other.name in shown:
+                    continue
+                line_tokens = estimate_tokens(self._line(other, tag))
+                if tokens + line_tokens > self.token_budget:
+                    break
+                shown[other.name] = None
+                entries.append((other, tag))
+                tokens += line_tokens
+                count += 1
+        return entries, self._aggregate(shown)
+
+    def _aggregate(self, shown: Dict[str, None]) -> str:
+        """목록에 없는 나머지 활성 플레이어의 별 개수별 인원"""
+        cap = config.VISIBILITY_STAR_BIN_MAX
+        bins: Dict[int, int] = {}
+        for stars, count in self.game.state_index.star_counts().items():
+            bins[min(stars, cap)] = bins.get(min(stars, cap), 0) + count
+        for name in shown:
+            other = self.game.state_index.active.get(name)
+            if other is not None:
+                bins[min(other.stars, cap)] -= 1
+        rest = sum(bins.values())
+        if not rest:
+            return "- 그 외 다른 활성 플레이어는 없습니다."
+        parts = [f"{stars}개{' 이상' if stars == cap else ''} {count}명" for stars, count in sorted(bins.items()) if count]
+        return f"- 그 외 {rest}명 (별 개수별 인원): " + ", ".join(parts)
+
+    # --- 조회 ---
+
+    def render(self, player: 'Player') -> str:
+        """player 에게 보여줄 다른 활성 플레이어 정보"""
+        self.views += 1
+        entries, aggregate = self.view(player)
+        lines = [self._line(other, tag) for other, tag in entries]
+        if aggregate:
+            self.partial_views += 1
+            lines.append(aggregate)
+        return "\n".join(lines) if lines else "다른 활성 플레이어가 없습니다."
+
+    def visible_names(self, player: 'Player') -> List[str]:
+        """시야에 개별로 보이는 다른 플레이어 이름 (mock 백엔드의 대상 후보 힌트)"""
+        return [other.name for other, _ in self.view(player)[0]]
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {"views": self.views, "partial_views": self.partial_views, "token_budget": self.token_budget}
@@ -0,0 +1,47 @@
+from .backend import LLMBackend
+from config import config
+import os
+
+_backend = None
+
+
+def create_backend(name: str = None, instrument: bool = True) -> LLMBackend:
+    """설정 이름으로 백엔드를 생성합니다. ('openai' | 'mock')
+
+    instrument=False 면 계측 래퍼를 씌우지 않습니다. (배치 로컬 처리기처럼 바깥에서 이미 계측하는 경우)
+    """
+    name = name or os.getenv("LLM_BACKEND", config.LLM_BACKEND)
+    if name == "openai":
+        from .openai_backend import OpenAIBackend
+        backend = OpenAIBackend(sdk_retries=not config.LLM_SCHEDULER_ENABLED)
+        if config.LLM_SCHEDULER_ENABLED:
+            from .scheduler import RequestScheduler, ScheduledBackend
+            shared_path = os.getenv("LLM_RATE_LIMIT_SHARED_PATH", config.LLM_RATE_LIMIT_SHARED_PATH)
+            backend = ScheduledBackend(backend, RequestScheduler(shared_path=shared_path))
+    elif name == "mock":
+        from .mock_backend import MockBackend
+        backend = MockBackend(seed=config.MOCK_LLM_SEED, latency=config.MOCK_LLM_LATENCY, latency_jitter=config.MOCK_LLM_LATENCY_JITTER,
+                              plan_prob=config.MOCK_LLM_PLAN_PROB)
+    else:
+        raise ValueError(f"Unknown LLM backend: {name}")
+
+    if config.LLM_CACHE_ENABLED or os.getenv("LLM_CACHE") == "1":
+        from .cache import CachedBackend, ResponseCache
+        backend = CachedBackend(backend, ResponseCache(os.getenv("LLM_CACHE_PATH", config.LLM_CACHE_PATH), config.LLM_CACHE_MAX_BYTES))
+
+    if instrument and config.METRICS_ENABLED:
+        from .instrumented import InstrumentedBackend
+        backend = InstrumentedBackend(backend)
+    return backend
+
+
+def get_backend() -> LLMBackend:
+    global _backend
+    if _backend is None:
+        _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend: LLMBackend):
+    global _backend
+    _backend = backend
@@ -0,0 +1,70 @@
+from typing import Any, Callable, Dict, Optional
+from types import SimpleNamespace
+import time
+
+
+class StreamInterruptedError(Exception):
+    """스트리밍 응답이 일부 출력된 뒤 실패한 경우 (이미 출력된 부분이 있으므로 재시도하지 않음)"""
+
+
+class CallAbandonedError(Exception):
+    """호출부가 더 이상 결과를 기다리지 않아 (마감 초과, 헤지 경쟁에서 패배) 호출을 중단한 경우"""
+
+
+def call_abandoned(meta: Optional[Dict[str, Any]]) -> bool:
+    """마감 호출(llm.deadline)의 결과가 버려지는지: meta["deadline"] 시각이 지났거나 meta["abandoned"] 가 설정됨"""
+    if not meta:
+        return False
+    abandoned = meta.get("abandoned")
+    if abandoned is not None and abandoned.is_set():
+        return True
+    deadline = meta.get("deadline")
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def to_namespace(value: Any) -> Any:
+    """dict/list 구조를 OpenAI SDK 응답처럼 속성 접근이 가능한 객체로 변환합니다."""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(item) for item in value]
+    return value
+
+
+def response_to_dict(response: Any) -> Any:
+    """SDK 응답(pydantic 모델) 또는 to_namespace 결과를 순수 dict 로 되돌립니다."""
+    if hasattr(response, "model_dump"):
+        return response.model_dump()
+    if isinstance(response, SimpleNamespace):
+        return {key: response_to_dict(item) for key, item in vars(response).items()}
+    if isinstance(response, list):
+        return [response_to_dict(item) for item in response]
+    return response
+
+
+# --- LLM Backend Interface ---
+class LLMBackend:
+    """LLM 호출 백엔드 인터페이스
+
+    request 는 chat.completions.create 에 넘기는 키워드 인자 그대로이며 (model, messages, tools, ...)
+    반환값은 OpenAI 응답과 같은 모양 (response.choices[0].message.content / tool_calls, response.usage)입니다.
+    meta 는 호출 위치 정보 (call_site, player, turn 등)로, 실제 API 요청에는 포함되지 않습니다.
+    마감 호출이면 meta 에 deadline (time.monotonic 기준)과 abandoned (threading.Event)가 실리며, 재시도하는 백엔드는 call_abandoned 로 확인합니다.
+    stream 은 텍스트 조각이 도착할 때마다 on_delta 를 호출하고, 끝나면 complete 와 같은 모양의 전체 응답을 반환합니다.
+    """
+
+    name = "base"
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        raise NotImplementedError
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        raise NotImplementedError
+
+    def stream(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]], on_delta: Callable[[str], None]) -> Any:
+        """기본 구현: 스트리밍을 지원하지 않는 백엔드는 전체 응답을 한 조각으로 전달"""
+        response = self.complete(request, meta)
+        content = response.choices[0].message.content
+        if content:
+            on_delta(content)
+        return response
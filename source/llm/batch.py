@@ -0,0 +1,334 @@
+from typing import Any, Dict, List, Optional
+from custom_logger import logger
+from llm.backend import LLMBackend, to_namespace, response_to_dict
+from config import config
+import json
+import os
+import threading
+import time
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+FINAL_BATCH_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchRequestError(Exception):
+    """배치 결과 파일에서 해당 요청이 실패로 돌아온 경우"""
+
+
+class _PendingRequest:
+    __slots__ = ("custom_id", "game", "request", "meta", "event", "loop", "future", "response", "error")
+
+    def __init__(self, custom_id: str, game: str, request: Dict[str, Any], meta: Dict[str, Any]):
+        self.custom_id = custom_id
+        self.game = game
+        self.request = request
+        self.meta = meta
+        self.event = None # 동기 호출: threading.Event
+        self.loop = None # 비동기 호출: (이벤트 루프, future)
+        self.future = None
+        self.response = None
+        self.error = None
+
+    def resolve(self, response: Any = None, error: Optional[BaseException] = None):
+        self.response = response
+        self.error = error
+        if self.event is not None:
+            self.event.set()
+        elif error is not None:
+            self.loop.call_soon_threadsafe(_set_future, self.future, None, error)
+        else:
+            self.loop.call_soon_threadsafe(_set_future, self.future, response, None)
+
+
+def _set_future(future, response, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(response)
+
+
+# --- Batch Queue ---
+class BatchQueue:
+    """여러 게임 스레드의 LLM 요청을 모아 한 번에 배치 파일로 처리하는 조정자
+
+    각 게임은 자기 스레드에서 진행되고 (register_game / bind_thread / game_finished), 요청은 응답이 올 때까지 그 게임을 멈춥니다.
+    살아 있는 모든 게임이 응답을 기다리는 상태가 되고 BATCH_SETTLE_SECONDS 동안 새 요청이 없으면
+    (또는 BATCH_MAX_REQUESTS 에 도달하면) 대기 중인 요청 전체를 한 배치로 처리합니다.
+    """
+
+    def __init__(self, processor: 'BatchProcessor', directory: str):
+        self.processor = processor
+        self.directory = directory
+        self._lock = threading.Condition()
+        self._pending: List[_PendingRequest] = []
+        self._waiting_by_game: Dict[str, int] = {}
+        self._live_games = set()
+        self._local = threading.local()
+        self._sequence = 0
+        self._last_enqueue = 0.0
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes: List[int] = []
+
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    # --- 게임 스레드 쪽 ---
+
+    def register_game(self, game_id: str):
+        """게임 등록 (게임 스레드 시작 전에 호출해야 첫 배치가 모든 게임을 기다림)"""
+        with self._lock:
+            self._live_games.add(game_id)
+            self._waiting_by_game.setdefault(game_id, 0)
+
+    def bind_thread(self, game_id: str):
+        """현재 스레드의 요청을 game_id 게임의 요청으로 표시"""
+        self._local.game = game_id
+
+    def game_finished(self, game_id: str):
+        with self._lock:
+            self._live_games.discard(game_id)
+            self._lock.notify_all()
+
+    def _enqueue(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]]) -> _PendingRequest:
+        game_id = getattr(self._local, "game", "unregistered")
+        with self._lock:
+            self._sequence += 1
+            pending = _PendingRequest(f"{game_id}-r{self._sequence}", game_id, request, dict(meta or {}))
+            return pending
+
+    def _submit(self, pending: _PendingRequest):
+        with self._lock:
+            self._pending.append(pending)
+            self._waiting_by_game[pending.game] = self._waiting_by_game.get(pending.game, 0) + 1
+            self._last_enqueue = time.monotonic()
+            self._lock.notify_all()
+
+    def _done_waiting(self, pending: _PendingRequest):
+        with self._lock:
+            self._waiting_by_game[pending.game] -= 1
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        pending = self._enqueue(request, meta)
+        pending.event = threading.Event()
+        self._submit(pending)
+        pending.event.wait()
+        self._done_waiting(pending)
+        if pending.error is not None:
+            raise pending.error
+        return pending.response
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        import asyncio
+        pending = self._enqueue(request, meta)
+        pending.loop = asyncio.get_running_loop()
+        pending.future = pending.loop.create_future()
+        self._submit(pending)
+        try:
+            return await pending.future
+        finally:
+            self._done_waiting(pending)
+
+    # --- 조정자(메인 스레드) 쪽 ---
+
+    def _ready(self) -> bool:
+        if not self._pending:
+            return False
+        if len(self._pending) >= config.BATCH_MAX_REQUESTS:
+            return True
+        all_blocked = all(self._waiting_by_game.get(game_id, 0) > 0 for game_id in self._live_games)
+        return all_blocked and time.monotonic() - self._last_enqueue >= config.BATCH_SETTLE_SECONDS
+
+    def run(self, threads: List[threading.Thread]):
+        """게임 스레드가 모두 끝날 때까지 배치를 모아 처리합니다."""
+        while True:
+            with self._lock:
+                while not self._ready():
+                    if not self._live_games and not self._pending and not any(thread.is_alive() for thread in threads):
+                        return
+                    self._lock.wait(timeout=config.BATCH_SETTLE_SECONDS)
+                batch = self._pending[:config.BATCH_MAX_REQUESTS]
+                self._pending = self._pending[config.BATCH_MAX_REQUESTS:]
+            self._process(batch)
+
+    def _process(self, batch: List[_PendingRequest]):
+        self.batches += 1
+        self.requests += len(batch)
+        self.batch_sizes.append(len(batch))
+        name = f"batch_{self.batches:05d}"
+        input_path = os.path.join(self.directory, f"{name}.input.jsonl")
+        meta_path = os.path.join(self.directory, f"{name}.meta.jsonl")
+        output_path = os.path.join(self.directory, f"{name}.output.jsonl")
+
+        write_batch_input(input_path, meta_path, batch)
+        started = time.perf_counter()
+        logger.info(f"Submitting {name}: {len(batch)} requests from {len({pending.game for pending in batch})} games via {self.processor.name}.")
+        try:
+            self.processor.process(input_path, meta_path, output_path)
+            results = read_batch_output(output_path)
+        except Exception as e:
+            logger.error(f"Batch {name} failed: {e}")
+            for pending in batch:
+                pending.resolve(error=BatchRequestError(f"batch {name} failed: {e}"))
+            return
+        logger.info(f"{name} finished in {time.perf_counter() - started:.2f}s.")
+
+        for pending in batch:
+            result = results.get(pending.custom_id)
+            if result is None:
+                pending.resolve(error=BatchRequestError(f"no result for {pending.custom_id}"))
+            elif isinstance(result, BatchRequestError):
+                pending.resolve(error=result)
+            else:
+                pending.resolve(response=to_namespace(result))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "max_batch_size": max(self.batch_sizes) if self.batch_sizes else 0,
+        }
+
+
+class BatchBackend(LLMBackend):
+    """요청을 BatchQueue 에 넣고 배치 결과가 올 때까지 기다리는 백엔드"""
+
+    name = "batch"
+
+    def __init__(self, queue: BatchQueue):
+        self.queue = queue
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        return self.queue.complete(request, meta)
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        return await self.queue.acomplete(request, meta)
+
+
+# --- Batch 파일 형식 (OpenAI Batch API) ---
+
+def write_batch_input(input_path: str, meta_path: str, batch: List[_PendingRequest]):
+    """요청 파일(Batch API 형식)과 호출 위치 정보 파일(로컬 처리기용, custom_id 기준)을 기록"""
+    with open(input_path, "w", encoding="utf-8") as f_input, open(meta_path, "w", encoding="utf-8") as f_meta:
+        for pending in batch:
+            f_input.write(json.dumps({"custom_id": pending.custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": pending.request}, ensure_ascii=False) + "\n")
+            f_meta.write(json.dumps({"custom_id": pending.custom_id, "meta": pending.meta}, ensure_ascii=False, default=str) + "\n")
+
+
+def read_batch_output(output_path: str) -> Dict[str, Any]:
+    """결과 파일을 custom_id -> 응답 본문 dict (실패 시 BatchRequestError) 로 읽습니다."""
+    results = {}
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            response = item.get("response") or {}
+            if item.get("error") or response.get("status_code", 200) != 200:
+                results[item["custom_id"]] = BatchRequestError(str(item.get("error") or response.get("body")))
+            else:
+                results[item["custom_id"]] = response["body"]
+    return results
+
+
+def _output_line(custom_id: str, body: Any = None, error: Optional[BaseException] = None) -> str:
+    if error is not None:
+        return json.dumps({"id": f"batch_req_{custom_id}", "custom_id": custom_id, "response": None,
+                           "error": {"code": type(error).__name__, "message": str(error)}}, ensure_ascii=False)
+    return json.dumps({"id": f"batch_req_{custom_id}", "custom_id": custom_id,
+                       "response": {"status_code": 200, "request_id": custom_id, "body": body}, "error": None}, ensure_ascii=False)
+
+
+# --- Batch Processors ---
+class BatchProcessor:
+    """요청 파일을 처리해 결과 파일(output_path)을 만드는 처리기 인터페이스"""
+
+    name = "base"
+
+    def process(self, input_path: str, meta_path: str, output_path: str):
+        raise NotImplementedError
+
+
+class LocalBatchProcessor(BatchProcessor):
+    """로컬 대체 처리기: 요청 파일을 읽어 백엔드(mock 등)로 처리하고 Batch API 와 같은 형식의 결과 파일을 씁니다."""
+
+    name = "local"
+
+    def __init__(self, backend: LLMBackend, workers: int = None):
+        self.backend = backend
+        self.workers = workers or config.BATCH_LOCAL_WORKERS
+
+    def process(self, input_path: str, meta_path: str, output_path: str):
+        from concurrent.futures import ThreadPoolExecutor
+
+        metas = {}
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    item = json.loads(line)
+                    metas[item["custom_id"]] = item["meta"]
+        with open(input_path, "r", encoding="utf-8") as f:
+            items = [json.loads(line) for line in f if line.strip()]
+
+        def run(item):
+            try:
+                response = self.backend.complete(item["body"], metas.get(item["custom_id"], {}))
+                return _output_line(item["custom_id"], body=response_to_dict(response))
+            except Exception as e:
+                return _output_line(item["custom_id"], error=e)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            lines = list(executor.map(run, items))
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, output_path)
+
+
+class OpenAIBatchProcessor(BatchProcessor):
+    """OpenAI Batch API 로 요청 파일을 업로드하고 작업이 끝나면 결과(와 오류) 파일을 내려받습니다."""
+
+    name = "openai"
+
+    def __init__(self, poll_seconds: float = None, completion_window: str = None):
+        self.poll_seconds = poll_seconds or config.BATCH_POLL_SECONDS
+        self.completion_window = completion_window or config.BATCH_COMPLETION_WINDOW
+
+    def process(self, input_path: str, meta_path: str, output_path: str):
+        import openai_client
+        client = openai_client.get_client()
+        with open(input_path, "rb") as f:
+            uploaded = client.files.create(file=f, purpose="batch")
+        batch = client.batches.create(input_file_id=uploaded.id, endpoint=BATCH_ENDPOINT, completion_window=self.completion_window)
+        logger.info(f"OpenAI batch {batch.id} created for {input_path}.")
+
+        while batch.status not in FINAL_BATCH_STATUSES:
+            time.sleep(self.poll_seconds)
+            batch = client.batches.retrieve(batch.id)
+            logger.debug("OpenAI batch %s status: %s", batch.id, batch.status)
+        if batch.status != "completed":
+            raise BatchRequestError(f"OpenAI batch {batch.id} ended with status {batch.status}")
+
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    f.write(client.files.content(file_id).text.rstrip("\n") + "\n")
+        os.replace(tmp_path, output_path)
+
+
+class ExternalBatchProcessor(BatchProcessor):
+    """외부에서 실행한 배치 작업이 결과 파일을 만들 때까지 기다립니다. (결과 파일은 원자적으로 생성되어야 함)"""
+
+    name = "external"
+
+    def __init__(self, poll_seconds: float = None):
+        self.poll_seconds = poll_seconds or config.BATCH_POLL_SECONDS
+
+    def process(self, input_path: str, meta_path: str, output_path: str):
+        logger.info(f"Waiting for external batch results: {output_path}")
+        while not os.path.exists(output_path):
+            time.sleep(self.poll_seconds)
@@ -0,0 +1,151 @@
+from typing import Any, Callable, Dict, Optional
+from custom_logger import logger
+from llm.backend import LLMBackend, to_namespace, response_to_dict
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# 캐시 키에서 제외하는 요청 필드 (응답 내용에 영향이 없는 전달/기록용 옵션). 나머지 필드는 모두 키에 포함
+CACHE_KEY_IGNORED_FIELDS = ("user", "metadata", "store", "stream", "stream_options", "timeout", "extra_headers", "service_tier")
+EVICT_TARGET_RATIO = 0.9 # 상한을 넘으면 이 비율까지 한 번에 삭제 (삭제 때마다 다시 넘지 않도록)
+
+
+def make_cache_key(request: Dict[str, Any]) -> str:
+    payload = {field: value for field, value in request.items() if field not in CACHE_KEY_IGNORED_FIELDS}
+    encoded = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+# --- SQLite Response Cache ---
+class ResponseCache:
+    """LLM 응답을 디스크(SQLite)에 저장하는 크기 제한 LRU 캐시
+
+    :param path: SQLite 파일 경로
+    :param max_bytes: 저장된 응답 크기 합의 상한. 초과 시 가장 오래 사용되지 않은 항목부터 삭제
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL") # 여러 프로세스가 같은 캐시를 공유할 수 있도록
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+        self._bytes = self._total_bytes() # 저장된 응답 크기 합 (열 때 한 번 읽고 삽입/삭제 시 갱신)
+
+    def _total_bytes(self) -> int:
+        return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]):
+        encoded = json.dumps(value, ensure_ascii=False)
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                (key, encoded, size, time.time())
+            )
+            self._bytes += size - (previous[0] if previous else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """가장 오래 사용되지 않은 항목부터 EVICT_TARGET_RATIO 까지 삭제"""
+        # 같은 파일을 쓰는 다른 프로세스의 삽입/삭제를 반영하도록 삭제 직전에만 합계를 다시 읽음
+        self._bytes = self._total_bytes()
+        target = int(self.max_bytes * EVICT_TARGET_RATIO)
+        while self._bytes > target:
+            rows = self._conn.execute("SELECT key, size FROM responses ORDER BY last_access ASC LIMIT 256").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self.evictions += 1
+                self._bytes -= size
+                if self._bytes <= target:
+                    break
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": entries, "bytes": total}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedBackend(LLMBackend):
+    """다른 백엔드 앞에서 ResponseCache 를 먼저 조회하는 래퍼 백엔드"""
+
+    def __init__(self, backend: LLMBackend, cache: ResponseCache):
+        self.backend = backend
+        self.cache = cache
+        self.name = f"cached({backend.name})"
+
+    def _lookup(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]]):
+        key = make_cache_key(request)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if meta is not None:
+                meta["cache_hit"] = True # 바깥의 InstrumentedBackend 가 집계
+            logger.debug("LLM cache hit for %s (%s)", (meta or {}).get('call_site'), key[:12])
+        return key, cached
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        key, cached = self._lookup(request, meta)
+        if cached is not None:
+            return to_namespace(cached)
+        response = self.backend.complete(request, meta)
+        self.cache.put(key, response_to_dict(response))
+        return response
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        key, cached = self._lookup(request, meta)
+        if cached is not None:
+            return to_namespace(cached)
+        response = await self.backend.acomplete(request, meta)
+        self.cache.put(key, response_to_dict(response))
+        return response
+
+    def stream(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]], on_delta: Callable[[str], None]) -> Any:
+        key, cached = self._lookup(request, meta)
+        if cached is not None:
+            response = to_namespace(cached)
+            if response.choices[0].message.content:
+                on_delta(response.choices[0].message.content)
+            return response
+        response = self.backend.stream(request, meta, on_delta)
+        self.cache.put(key, response_to_dict(response))
+        return response
@@ -0,0 +1,173 @@
+from typing import Any, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from llm import get_backend
+from llm.backend import CallAbandonedError
+from metrics import get_collector
+from custom_logger import logger
+from config import config
+import contextvars
+import threading
+import time
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+class DeadlineExceeded(Exception):
+    """마감 시간 안에 응답을 받지 못한 경우 (호출부는 저비용 정책으로 대체)"""
+
+    def __init__(self, timing: 'CallTiming'):
+        super().__init__(f"LLM call missed its deadline after {timing.elapsed:.2f}s (hedged={timing.hedged})")
+        self.timing = timing
+
+
+class CallTiming:
+    """마감/헤지 호출 1회의 결과 정보
+
+    - late: 헤지 기준 시간(호출 위치별 지연 분위수)보다 늦게 응답
+    - hedged: 중복 요청을 보냄
+    - defaulted: 마감 시간을 넘겨 응답을 버리고 기본값 사용
+    """
+
+    __slots__ = ("hedge_after", "elapsed", "hedged", "late", "defaulted", "winner")
+
+    def __init__(self, hedge_after: Optional[float]):
+        self.hedge_after = hedge_after
+        self.elapsed = 0.0
+        self.hedged = False
+        self.late = False
+        self.defaulted = False
+        self.winner = None # "primary" | "hedge"
+
+    def flags(self) -> str:
+        """이벤트 기록용 표시 ('late,hedged' 등, 정상이면 빈 문자열)"""
+        return ",".join(name for name in ("late", "hedged", "defaulted") if getattr(self, name))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def hedge_delay(call_site: Optional[str]) -> Optional[float]:
+    """호출 위치의 지금까지 지연 분포에서 LLM_HEDGE_PERCENTILE 분위수 (샘플이 부족하면 기본값)"""
+    if not config.LLM_HEDGE_ENABLED:
+        return None
+    latency = get_collector().by_call_site[call_site or "unknown"].latency
+    if latency.count < config.LLM_HEDGE_MIN_SAMPLES:
+        return config.LLM_HEDGE_DEFAULT_DELAY
+    return max(config.LLM_HEDGE_MIN_DELAY, latency.quantile(config.LLM_HEDGE_PERCENTILE))
+
+
+def call_deadline(turn_deadline: Optional[float] = None) -> Optional[float]:
+    """호출 1회의 마감 시각 (time.monotonic 기준). 호출 마감과 턴 마감 중 이른 쪽"""
+    deadlines = [turn_deadline]
+    if config.LLM_CALL_DEADLINE_SECONDS is not None:
+        deadlines.append(time.monotonic() + config.LLM_CALL_DEADLINE_SECONDS)
+    deadlines = [deadline for deadline in deadlines if deadline is not None]
+    return min(deadlines) if deadlines else None
+
+
+def _next_wait(timing: CallTiming, started: float, deadline: Optional[float], pending: int, meta: Dict[str, Any]) -> Optional[float]:
+    """다음 이벤트(헤지 발사 또는 마감)까지 대기할 시간. 마감이 지났으면 DeadlineExceeded"""
+    now = time.monotonic()
+    timing.elapsed = now - started
+    waits = []
+    if deadline is not None:
+        if now >= deadline:
+            timing.defaulted = True
+            get_collector().record_timing(meta, timing)
+            raise DeadlineExceeded(timing)
+        waits.append(deadline - now)
+    if timing.hedge_after is not None and not timing.hedged and pending:
+        waits.append(max(0.0, started + timing.hedge_after - now))
+    return min(waits) if waits else None
+
+
+def _should_hedge(timing: CallTiming, started: float) -> bool:
+    return timing.hedge_after is not None and not timing.hedged and time.monotonic() - started >= timing.hedge_after
+
+
+def _finish(timing: CallTiming, started: float, winner: str, meta: Dict[str, Any]) -> CallTiming:
+    timing.elapsed = time.monotonic() - started
+    timing.winner = winner
+    timing.late = timing.hedge_after is not None and timing.elapsed > timing.hedge_after
+    get_collector().record_timing(meta, timing)
+    if timing.late or timing.hedged:
+        logger.info(f"Slow LLM call {meta.get('call_site')} for {meta.get('player')}: {timing.elapsed:.2f}s ({timing.flags()}, winner={winner})")
+    return timing
+
+
+async def acomplete_with_deadline(request: Dict[str, Any], meta: Dict[str, Any], deadline: Optional[float] = None) -> Tuple[Any, CallTiming]:
+    """마감 시각까지 응답을 기다리고, 헤지 기준 시간을 넘기면 같은 요청을 한 번 더 보내 먼저 온 응답을 사용합니다."""
+    import asyncio
+    backend = get_backend()
+    started = time.monotonic()
+    timing = CallTiming(hedge_delay(meta.get("call_site")))
+    _next_wait(timing, started, deadline, 0, meta) # 턴 마감이 이미 지났으면 요청하지 않음
+    if deadline is None and timing.hedge_after is None:
+        # 마감/헤지가 없으면 태스크를 만들지 않고 바로 기다림
+        return await backend.acomplete(request, meta), _finish(timing, started, "primary", meta)
+    meta = dict(meta, deadline=deadline) # 스케줄러가 마감 뒤로 넘어가는 재시도를 하지 않도록
+    labels = {asyncio.ensure_future(backend.acomplete(request, meta)): "primary"}
+    error = None
+    try:
+        while labels:
+            timeout = _next_wait(timing, started, deadline, len(labels), meta)
+            done, _ = await asyncio.wait(labels, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                label = labels.pop(task)
+                if task.exception() is None:
+                    return task.result(), _finish(timing, started, label, meta)
+                error = task.exception()
+            if _should_hedge(timing, started) and labels:
+                timing.hedged = True
+                labels[asyncio.ensure_future(backend.acomplete(request, dict(meta, hedge=True)))] = "hedge"
+        raise error
+    finally:
+        for task in labels:
+            task.cancel()
+
+
+def _start(backend, request: Dict[str, Any], meta: Dict[str, Any]) -> Any:
+    """풀 워커에서 실행. 차례를 기다리는 동안 버려진 호출은 백엔드를 부르지 않고 워커를 바로 돌려줌"""
+    if meta["abandoned"].is_set():
+        raise CallAbandonedError(f"LLM call {meta.get('call_site')} abandoned before it started")
+    return backend.complete(request, meta)
+
+
+def complete_with_deadline(request: Dict[str, Any], meta: Dict[str, Any], deadline: Optional[float] = None) -> Tuple[Any, CallTiming]:
+    """acomplete_with_deadline 의 동기 버전 (스레드 풀 사용, 이벤트 루프 안의 동기 코드에서도 호출 가능)
+
+    실행 중인 요청의 스레드는 중단할 수 없으므로, 결과를 버리는 시점(마감 초과, 다른 쪽 응답 도착)에 meta["abandoned"] 를 설정해
+    아직 시작하지 않은 호출은 건너뛰고 스케줄러가 더 이상 재시도하지 않게 합니다.
+    """
+    global _executor
+    backend = get_backend()
+    started = time.monotonic()
+    timing = CallTiming(hedge_delay(meta.get("call_site")))
+    _next_wait(timing, started, deadline, 0, meta) # 턴 마감이 이미 지났으면 요청하지 않음
+    if deadline is None and timing.hedge_after is None:
+        # 마감/헤지가 없으면 스레드 풀을 거치지 않고 호출한 스레드에서 바로 실행 (배치 모드는 게임 스레드 식별에 필요)
+        return backend.complete(request, meta), _finish(timing, started, "primary", meta)
+
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=config.MAX_CONCURRENT_REQUESTS * 2, thread_name_prefix="llm-call")
+    meta = dict(meta, deadline=deadline, abandoned=threading.Event())
+    # 풀 워커는 게임 스레드가 아니므로 컨텍스트(게임별 수집기/프로파일러)를 복사해 실행
+    labels = {_executor.submit(contextvars.copy_context().run, _start, backend, request, meta): "primary"}
+    error = None
+    try:
+        while labels:
+            timeout = _next_wait(timing, started, deadline, len(labels), meta)
+            done, _ = wait(labels, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                label = labels.pop(future)
+                if future.exception() is None:
+                    return future.result(), _finish(timing, started, label, meta)
+                error = future.exception()
+            if _should_hedge(timing, started) and labels:
+                timing.hedged = True
+                labels[_executor.submit(contextvars.copy_context().run, _start, backend, request, dict(meta, hedge=True))] = "hedge"
+        raise error
+    finally:
+        meta["abandoned"].set()
+        for future in labels:
+            future.cancel()
@@ -0,0 +1,54 @@
+from typing import Any, Callable, Dict, Optional
+from llm.backend import LLMBackend
+from metrics import get_collector
+from metrics.collector import prefix_cache_group
+from metrics.profiling import get_profiler
+import time
+
+
+class InstrumentedBackend(LLMBackend):
+    """모든 LLM 호출의 지연 시간, 토큰 사용량, 오류를 현재 MetricsCollector 에 기록하는 래퍼 백엔드 (프로파일러 spans 구간 포함)
+
+    캐시보다 바깥에 두어 캐시 적중도 호출 1회로 집계합니다. (CachedBackend 가 meta["cache_hit"] 표시)
+    meta["prefix_group"] 에 제공자 프리픽스 캐시 그룹을 실어 그룹별 prefix_hit_ratio 를 따로 집계합니다.
+    """
+
+    def __init__(self, backend: LLMBackend):
+        self.backend = backend
+        self.name = backend.name
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        meta = dict(meta or {}, prefix_group=prefix_cache_group(request))
+        started = time.perf_counter()
+        try:
+            with get_profiler().llm_span(meta):
+                response = self.backend.complete(request, meta)
+        except Exception as e:
+            get_collector().record_call(meta, request.get("model"), time.perf_counter() - started, error=e)
+            raise
+        get_collector().record_call(meta, request.get("model"), time.perf_counter() - started, response=response)
+        return response
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        meta = dict(meta or {}, prefix_group=prefix_cache_group(request))
+        started = time.perf_counter()
+        try:
+            with get_profiler().llm_span(meta):
+                response = await self.backend.acomplete(request, meta)
+        except Exception as e:
+            get_collector().record_call(meta, request.get("model"), time.perf_counter() - started, error=e)
+            raise
+        get_collector().record_call(meta, request.get("model"), time.perf_counter() - started, response=response)
+        return response
+
+    def stream(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]], on_delta: Callable[[str], None]) -> Any:
+        meta = dict(meta or {}, prefix_group=prefix_cache_group(request))
+        started = time.perf_counter()
+        try:
+            with get_profiler().llm_span(meta):
+                response = self.backend.stream(request, meta, on_delta)
+        except Exception as e:
+            get_collector().record_call(meta, request.get("model"), time.perf_counter() - started, error=e)
+            raise
+        get_collector().record_call(meta, request.get("model"), time.perf_counter() - started, response=response)
+        return response
@@ -0,0 +1,16 @@
+import asyncio
+import threading
+
+_local = threading.local()
+
+
+def run_sync(coro):
+    """동기 턴 엔진에서 코루틴을 실행합니다. (이벤트 루프 밖의 동기 코드에서만 호출)
+
+    호출마다 asyncio.run 으로 루프를 새로 만들면 루프에 묶인 클라이언트/세마포어가 닫힌 루프에 남으므로,
+    스레드마다 하나의 이벤트 루프를 계속 재사용합니다. (batch_sweep.py 처럼 게임별 스레드에서도 안전)
+    """
+    loop = getattr(_local, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = _local.loop = asyncio.new_event_loop()
+    return loop.run_until_complete(coro)
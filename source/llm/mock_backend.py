@@ -0,0 +1,181 @@
+from typing import Any, Callable, Dict, List, Optional
+from llm.backend import LLMBackend, to_namespace
+from llm.tokens import estimate_tokens
+import asyncio
+import hashlib
+import itertools
+import json
+import random
+import re
+import time
+
+CARD_TYPES = ["rock", "scissors", "paper"]
+
+MOCK_EMOTIONS = [
+    "불안하지만 아직 기회가 남아 있다고 믿는다.",
+    "초조함 속에서도 침착하게 다음 수를 계산하고 있다.",
+    "상대를 믿을 수 없다는 의심이 커지고 있다.",
+    "조금씩 자신감이 붙고 있다.",
+    "시간이 줄어들수록 공포가 밀려온다.",
+]
+
+
+# --- Offline Mock Backend ---
+class MockBackend(LLMBackend):
+    """네트워크 없이 유효한 응답을 돌려주는 시드 고정 로컬 백엔드 (부하 테스트/오프라인 시뮬레이션용)
+
+    같은 seed 와 같은 요청에는 항상 같은 응답을 반환합니다. (동시 실행 순서와 무관)
+    응답 생성에 필요한 게임 정보(대상 후보, 보유 카드 등)는 meta 힌트로 전달받습니다.
+    """
+
+    name = "mock"
+
+    def __init__(self, seed: int = 0, latency: float = 0.0, latency_jitter: float = 0.0, plan_prob: float = 0.0):
+        self.seed = seed
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.plan_prob = plan_prob # 턴 계획(여러 함수 호출)에 행동을 하나 더 붙일 확률
+        self._ids = itertools.count(1)
+        self._seen_prefixes = set() # 제공자 프롬프트 캐시 흉내 (메시지 단위 프리픽스 해시)
+
+    def _rng(self, request: Dict[str, Any], meta: Dict[str, Any]) -> random.Random:
+        digest = hashlib.sha1(json.dumps(request.get("messages", []), ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+        return random.Random(f"{self.seed}:{meta.get('call_site')}:{meta.get('player')}:{meta.get('turn')}:{digest}")
+
+    def _delay(self, rng: random.Random) -> float:
+        return max(0.0, self.latency + rng.uniform(-self.latency_jitter, self.latency_jitter))
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        meta = meta or {}
+        rng = self._rng(request, meta)
+        delay = self._delay(rng)
+        if delay:
+            time.sleep(delay)
+        return self._respond(request, meta, rng)
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        meta = meta or {}
+        rng = self._rng(request, meta)
+        delay = self._delay(rng)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._respond(request, meta, rng)
+
+    def stream(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]], on_delta: Callable[[str], None]) -> Any:
+        """complete 결과를 단어 단위 조각으로 나눠 전달"""
+        response = self.complete(request, meta)
+        for piece in re.findall(r"\S+\s*", response.choices[0].message.content or ""):
+            on_delta(piece)
+        return response
+
+    # --- 응답 생성 ---
+
+    def _respond(self, request: Dict[str, Any], meta: Dict[str, Any], rng: random.Random) -> Any:
+        message = {"role": "assistant", "content": None, "tool_calls": None}
+        response_format = request.get("response_format") or {}
+        schema_name = response_format.get("json_schema", {}).get("name")
+
+        if request.get("tools"):
+            message["tool_calls"] = [{
+                "id": f"call_mock_{next(self._ids)}",
+                "type": "function",
+                "function": {"name": name, "arguments": json.dumps(args, ensure_ascii=False)}
+            } for name, args in self._plan_actions(meta, rng)]
+        elif schema_name == "trade_decision":
+            message["content"] = json.dumps(self._trade_decision(meta, rng), ensure_ascii=False)
+        elif schema_name == "trade_batch_decision":
+            message["content"] = json.dumps({"decisions": [dict(self._trade_decision(meta, rng), offer_id=offer_id) for offer_id in meta.get("offer_ids", [])]}, ensure_ascii=False)
+        elif schema_name == "match_response":
+            message["content"] = json.dumps(self._match_response(meta, rng), ensure_ascii=False)
+        elif meta.get("call_site") == "emotion":
+            message["content"] = rng.choice(MOCK_EMOTIONS)
+        else:
+            message["content"] = f"[mock] {meta.get('call_site', 'completion')} 응답입니다."
+
+        prompt_tokens, cached_tokens = self._prompt_usage(request)
+        completion_text = message["content"] or message["tool_calls"][0]["function"]["arguments"]
+        completion_tokens = estimate_tokens(completion_text)
+        return to_namespace({
+            "id": f"chatcmpl-mock-{next(self._ids)}",
+            "object": "chat.completion",
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if message["tool_calls"] else "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        })
+
+    def _prompt_usage(self, request: Dict[str, Any]):
+        """(prompt_tokens, cached_tokens). 이전 요청과 같은 (모델, 도구 + 메시지) 프리픽스 중 가장 긴 것을 캐시 적중으로 계산
+
+        OpenAI 와 같이 캐시는 모델별로 분리되고, 1024 토큰 이상인 프리픽스만 128 토큰 단위로 캐시됩니다.
+        """
+        parts = [json.dumps(request.get("tools") or [], ensure_ascii=False)]
+        parts += [str(m.get("content", "")) for m in request.get("messages", [])]
+        digest = hashlib.sha1(str(request.get("model")).encode("utf-8"))
+        tokens = 0
+        cached = 0
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            tokens += estimate_tokens(part) if part else 0
+            key = digest.hexdigest()
+            if key in self._seen_prefixes:
+                cached = tokens
+            self._seen_prefixes.add(key)
+        cached = cached // 128 * 128 if cached >= 1024 else 0
+        return tokens, cached
+
+    def _plan_actions(self, meta: Dict[str, Any], rng: random.Random) -> List[tuple]:
+        """턴 계획: 첫 행동 뒤에 plan_prob 확률로 거래/게임 제안을 max_actions 까지 이어 붙임"""
+        actions = [self._decide_action(meta, rng)]
+        while len(actions) < meta.get("max_actions", 1) and actions[-1][0] in ("propose_trade", "propose_match") and rng.random() < self.plan_prob:
+            name, args = self._decide_action(meta, rng)
+            if name not in ("propose_trade", "propose_match"):
+                break
+            actions.append((name, args))
+        return actions
+
+    def _decide_action(self, meta: Dict[str, Any], rng: random.Random):
+        targets: List[str] = meta.get("targets", [])
+        available_cards: List[str] = meta.get("available_cards", [])
+
+        if meta.get("can_exit"):
+            return "declare_out_of_game", {"reasoning": "[mock] 생존 조건을 만족했습니다."}
+        if not targets:
+            return "do_nothing", {"internal_reasoning": "[mock] 상대가 없습니다."}
+
+        roll = rng.random()
+        target = rng.choice(targets)
+        if available_cards and roll < 0.6:
+            return "propose_match", {
+                "target_player_name": target,
+                "card_to_play": rng.choice(available_cards),
+                "internal_reasoning": "[mock] 카드를 소진하기 위해 게임을 제안합니다.",
+                "public_reasoning": "[mock] 한 판 하시죠."
+            }
+        if roll < 0.85:
+            # 카드 1장을 넘기고 현금을 받거나, 현금으로 별을 사는 단순 거래
+            if available_cards and rng.random() < 0.5:
+                args = {f"give_{rng.choice(available_cards)}": 1, "receive_money": rng.choice([100000, 200000, 500000])}
+            else:
+                args = {"give_money": rng.choice([300000, 500000, 1000000]), "receive_stars": 1}
+            args.update({
+                "target_player_name": target,
+                "internal_reasoning": "[mock] 자원을 교환합니다.",
+                "public_reasoning": "[mock] 서로에게 이득인 거래입니다."
+            })
+            return "propose_trade", args
+        return "do_nothing", {"internal_reasoning": "[mock] 이번 턴은 관망합니다."}
+
+    def _trade_decision(self, meta: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+        decision = "accept" if rng.random() < 0.5 else "reject"
+        return {"decision": decision, "reasoning": f"[mock] {decision}"}
+
+    def _match_response(self, meta: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+        available_cards = meta.get("available_cards", CARD_TYPES)
+        if available_cards and rng.random() < 0.7:
+            return {"decision": "accept", "card_to_play": rng.choice(available_cards), "reasoning": "[mock] 수락합니다."}
+        return {"decision": "reject", "card_to_play": None, "reasoning": "[mock] 거절합니다."}
@@ -0,0 +1,72 @@
+from typing import Any, Callable, Dict, Optional
+from llm.backend import LLMBackend, to_namespace
+import asyncio
+import weakref
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI API 백엔드. 클라이언트는 첫 호출 시점에 가져옵니다. (비동기 클라이언트는 이벤트 루프마다)
+
+    sdk_retries=False 면 SDK 내부 재시도를 끄고 재시도를 RequestScheduler 에 맡깁니다.
+    """
+
+    name = "openai"
+
+    def __init__(self, client=None, async_client=None, sdk_retries: bool = True):
+        self._client = client
+        self._async_client = async_client
+        self._async_clients = weakref.WeakKeyDictionary() # 이벤트 루프 -> 비동기 클라이언트
+        self.sdk_retries = sdk_retries
+
+    def _sync_client(self):
+        if self._client is None:
+            import openai_client
+            self._client = openai_client.get_client()
+            if not self.sdk_retries:
+                self._client = self._client.with_options(max_retries=0)
+        return self._client
+
+    def _loop_client(self):
+        """실행 중인 이벤트 루프의 비동기 클라이언트 (생성자로 받은 클라이언트가 있으면 그것)"""
+        if self._async_client is not None:
+            return self._async_client
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import openai_client
+            client = openai_client.get_async_client()
+            if not self.sdk_retries:
+                client = client.with_options(max_retries=0)
+            self._async_clients[loop] = client
+        return client
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        return self._sync_client().chat.completions.create(**request)
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._loop_client().chat.completions.create(**request)
+
+    def stream(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]], on_delta: Callable[[str], None]) -> Any:
+        """stream=True 로 요청해 조각마다 on_delta 를 호출하고, 조각을 모아 일반 응답 모양으로 반환"""
+        client = self._sync_client()
+        parts = []
+        usage = None
+        response_id = model = finish_reason = None
+        for chunk in client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True}):
+            response_id, model = chunk.id, chunk.model
+            if chunk.usage is not None: # 마지막 조각 (choices 없음)
+                usage = chunk.usage.model_dump()
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            finish_reason = choice.finish_reason or finish_reason
+            if choice.delta.content:
+                parts.append(choice.delta.content)
+                on_delta(choice.delta.content)
+        return to_namespace({
+            "id": response_id,
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(parts), "tool_calls": None}, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
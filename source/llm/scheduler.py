@@ -0,0 +1,377 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+from llm.backend import LLMBackend, StreamInterruptedError, CallAbandonedError, call_abandoned
+from llm.tokens import estimate_tokens
+from metrics import get_collector
+from custom_logger import logger
+from config import config
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import weakref
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError", "TimeoutError", "ConnectionError"}
+
+
+class LLMUnavailableError(Exception):
+    """스케줄러가 호출을 포기(degrade)한 경우. reason 에 사유 ('circuit_open', 'retries_exhausted:RateLimitError' 등)"""
+
+    def __init__(self, reason: str, cause: Optional[BaseException] = None):
+        super().__init__(f"LLM call degraded ({reason})" + (f": {cause}" if cause else ""))
+        self.reason = reason
+        self.cause = cause
+
+
+# --- Token Buckets ---
+class TokenBucket:
+    """프로세스 내 토큰 버킷 (분당 rate_per_min 만큼 채워지고 최대 capacity 까지 누적)"""
+
+    def __init__(self, rate_per_min: float, capacity: Optional[float] = None):
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity or rate_per_min
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self, amount: float) -> float:
+        """amount 만큼 차감하고, 잔량이 음수가 되면 채워질 때까지 기다려야 할 시간(초)을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            self.level -= amount
+            return max(0.0, -self.level / self.rate)
+
+    def settle(self, delta: float):
+        """예상치와 실제 사용량의 차이를 반영 (delta > 0: 추가 차감)"""
+        with self._lock:
+            self.level -= delta
+
+
+class SharedTokenBucket:
+    """여러 프로세스(토너먼트 워커 등)가 하나의 한도를 나눠 쓰는 SQLite 기반 토큰 버킷"""
+
+    def __init__(self, path: str, name: str, rate_per_min: float, capacity: Optional[float] = None):
+        self.path = path
+        self.name = name
+        self.rate = rate_per_min / 60.0
+        self.capacity = capacity or rate_per_min
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, level REAL, updated REAL)")
+            conn.execute("INSERT OR IGNORE INTO buckets VALUES (?, ?, ?)", (name, self.capacity, time.time()))
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def _update(self, delta: float, refill: bool) -> float:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE") # 프로세스 간 원자적 갱신
+            level, updated = conn.execute("SELECT level, updated FROM buckets WHERE name = ?", (self.name,)).fetchone()
+            now = time.time()
+            if refill:
+                level = min(self.capacity, level + max(0.0, now - updated) * self.rate)
+                updated = now
+            level -= delta
+            conn.execute("UPDATE buckets SET level = ?, updated = ? WHERE name = ?", (level, updated, self.name))
+            conn.execute("COMMIT")
+            return level
+        finally:
+            conn.close()
+
+    def take(self, amount: float) -> float:
+        return max(0.0, -self._update(amount, refill=True) / self.rate)
+
+    def settle(self, delta: float):
+        self._update(delta, refill=False)
+
+
+def create_bucket(name: str, rate_per_min: float, shared_path: Optional[str]):
+    if shared_path:
+        return SharedTokenBucket(shared_path, name, rate_per_min)
+    return TokenBucket(rate_per_min)
+
+
+# --- Circuit Breaker ---
+class CircuitBreaker:
+    """연속 실패가 threshold 에 도달하면 reset_seconds 동안 호출을 차단 (이후 1회 시험 호출 허용)"""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, reset_seconds: float):
+        self.threshold = threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> Optional[str]:
+        """허용하면 이번 호출의 상태 (CLOSED, 시험 호출이면 HALF_OPEN), 차단이면 None"""
+        with self._lock:
+            now = time.monotonic()
+            if (self.state == self.OPEN and now - self.opened_at >= self.reset_seconds
+                    or self.state == self.HALF_OPEN and now - self.trial_at >= self.reset_seconds):
+                # 결과를 남기지 못한 시험 호출이 reset_seconds 를 넘기면 새 시험 호출 허용
+                self.state = self.HALF_OPEN
+                self.trial_at = now
+                return self.HALF_OPEN
+            return self.CLOSED if self.state == self.CLOSED else None
+
+    def release(self):
+        """시험 호출이 성공/실패 기록 없이 끝난 경우 (중단, 취소) OPEN 으로 되돌려 다음 호출이 바로 시험하도록 함"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+# --- Retry Policy ---
+def classify_error(error: BaseException) -> Tuple[bool, str]:
+    """(재시도 가능 여부, 사유) 반환. openai 예외 클래스 이름과 HTTP 상태 코드로 판단"""
+    name = type(error).__name__
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS, f"{name}({status})"
+    return name in RETRYABLE_ERRORS, name
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """응답 헤더의 Retry-After / retry-after-ms 값 (초)"""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms") is not None:
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after") is not None:
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None # HTTP-date 형식 등은 지수 백오프로 대체
+    return None
+
+
+class RequestScheduler:
+    """OpenAI 호출 앞단의 중앙 스케줄러
+
+    - 분당 요청 수/토큰 수 토큰 버킷 (shared_path 지정 시 프로세스 간 공유)
+    - 모델별 동시 요청 수 제한
+    - Retry-After 를 따르는 지터 지수 백오프 재시도
+    - 모델별 서킷 브레이커 (연속 실패 시 즉시 degrade)
+    """
+
+    def __init__(self, rpm: float = config.LLM_RATE_LIMIT_RPM, tpm: float = config.LLM_RATE_LIMIT_TPM,
+                 shared_path: Optional[str] = None, max_retries: int = config.LLM_MAX_RETRIES,
+                 base_delay: float = config.LLM_RETRY_BASE_DELAY, max_delay: float = config.LLM_RETRY_MAX_DELAY):
+        self.requests = create_bucket("requests", rpm, shared_path)
+        self.tokens = create_bucket("tokens", tpm, shared_path)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._thread_slots: Dict[str, threading.Semaphore] = {}
+        self._async_slots = weakref.WeakKeyDictionary() # 이벤트 루프 -> {모델: asyncio.Semaphore} (루프가 사라지면 함께 삭제)
+
+    # --- 자원 ---
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(config.LLM_CIRCUIT_FAILURE_THRESHOLD, config.LLM_CIRCUIT_RESET_SECONDS)
+        return self._breakers[model]
+
+    @staticmethod
+    def concurrency_limit(model: str) -> int:
+        return config.LLM_MODEL_CONCURRENCY.get(model, config.LLM_DEFAULT_MODEL_CONCURRENCY)
+
+    def thread_slot(self, model: str) -> threading.Semaphore:
+        if model not in self._thread_slots:
+            self._thread_slots[model] = threading.Semaphore(self.concurrency_limit(model))
+        return self._thread_slots[model]
+
+    def async_slot(self, model: str) -> asyncio.Semaphore:
+        # asyncio.Semaphore 는 이벤트 루프에 묶이므로 루프 객체별로 생성 (id 는 닫힌 루프와 겹칠 수 있음)
+        slots = self._async_slots.setdefault(asyncio.get_running_loop(), {})
+        if model not in slots:
+            slots[model] = asyncio.Semaphore(self.concurrency_limit(model))
+        return slots[model]
+
+    @staticmethod
+    def estimate_request_tokens(request: Dict[str, Any]) -> int:
+        prompt = estimate_tokens(json.dumps(request.get("messages", []), ensure_ascii=False))
+        return prompt + (request.get("max_tokens") or config.LLM_EXPECTED_COMPLETION_TOKENS)
+
+    def reserve(self, request: Dict[str, Any]) -> Tuple[float, int]:
+        """요청 1건과 예상 토큰을 버킷에서 차감. (대기 시간, 예상 토큰) 반환"""
+        estimate = self.estimate_request_tokens(request)
+        return max(self.requests.take(1), self.tokens.take(estimate)), estimate
+
+    def settle(self, estimate: int, response: Any):
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            self.tokens.settle(usage.total_tokens - estimate)
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(self.max_delay, retry_after) + random.uniform(0, self.base_delay)
+        # full jitter
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    # --- 판단/보고 ---
+
+    def _check_breaker(self, model: str, meta: Dict[str, Any]) -> bool:
+        """차단 중이면 degrade. 이번 호출이 시험 호출인지 반환"""
+        state = self.breaker(model).allow()
+        if state is None:
+            self._degrade(meta, model, "circuit_open")
+        return state == CircuitBreaker.HALF_OPEN
+
+    def _on_error(self, model: str, meta: Dict[str, Any], attempt: int, error: BaseException) -> float:
+        """실패 처리. 재시도하면 대기 시간(초)을 반환하고, 포기하면 LLMUnavailableError 를 발생"""
+        retryable, reason = classify_error(error)
+        if not retryable: # 요청 자체의 문제 (400 등) 는 서비스 장애로 보지 않음 (서비스는 응답했으므로 성공으로 기록)
+            self.breaker(model).record_success()
+            self._degrade(meta, model, f"non_retryable:{reason}", error)
+        self.breaker(model).record_failure()
+        if attempt >= self.max_retries:
+            self._degrade(meta, model, f"retries_exhausted:{reason}", error)
+        delay = self.backoff(attempt, error)
+        deadline = meta.get("deadline")
+        if deadline is not None and time.monotonic() + delay >= deadline: # 재시도 응답은 어차피 마감 뒤에 도착
+            self._abandon(meta, error)
+        get_collector().record_retry(meta, model, reason)
+        logger.warning(f"Retrying LLM call {meta.get('call_site')} for {meta.get('player')} "
+                       f"(attempt {attempt + 1}/{self.max_retries}, reason={reason}, wait={delay:.2f}s)")
+        return delay
+
+    def _degrade(self, meta: Dict[str, Any], model: str, reason: str, error: Optional[BaseException] = None):
+        get_collector().record_degraded(meta, model, reason)
+        logger.error(f"Degrading LLM call {meta.get('call_site')} for {meta.get('player')} (reason={reason})")
+        raise LLMUnavailableError(reason, error)
+
+    @staticmethod
+    def _abandon(meta: Dict[str, Any], error: Optional[BaseException] = None):
+        """호출부가 결과를 버리는 마감 호출은 재시도하지 않고 중단 (서비스 장애가 아니므로 degraded 로 집계하지 않음)"""
+        logger.debug("Abandoning LLM call %s for %s after its deadline.", meta.get("call_site"), meta.get("player"))
+        raise CallAbandonedError(f"LLM call {meta.get('call_site')} abandoned" + (f" after {error}" if error else "")) from error
+
+    def _sleep(self, meta: Dict[str, Any], delay: float):
+        """재시도/속도 제한 대기. 마감 호출은 호출부가 포기하면 (meta["abandoned"]) 바로 깨어나 중단"""
+        abandoned = meta.get("abandoned")
+        if abandoned is None:
+            time.sleep(delay)
+        elif abandoned.wait(delay):
+            self._abandon(meta)
+
+    # --- 실행 ---
+
+    def call(self, backend: LLMBackend, request: Dict[str, Any], meta: Dict[str, Any],
+             invoke: Optional[Callable[[Dict[str, Any], Dict[str, Any]], Any]] = None) -> Any:
+        """invoke 가 주어지면 backend.complete 대신 사용 (스트리밍 호출 등)"""
+        model = request.get("model") or "unknown"
+        invoke = invoke or backend.complete
+        for attempt in range(self.max_retries + 1):
+            if call_abandoned(meta): # 재시도 대기 중 마감이 지남
+                self._abandon(meta)
+            trial = self._check_breaker(model, meta)
+            try:
+                wait, estimate = self.reserve(request)
+                if wait:
+                    self._sleep(meta, wait)
+                # 동시 요청 슬롯은 요청 중에만 점유 (속도 제한/재시도 대기 중에는 다른 호출에 양보)
+                with self.thread_slot(model):
+                    try:
+                        response = invoke(request, meta)
+                        error = None
+                    except Exception as e:
+                        error = e
+                if error is None:
+                    self.breaker(model).record_success()
+                    self.settle(estimate, response)
+                    return response
+                delay = self._on_error(model, meta, attempt, error)
+            finally:
+                if trial: # 결과 없이 끝난 시험 호출 (중단 등) 이 브레이커를 HALF_OPEN 에 묶어두지 않도록
+                    self.breaker(model).release()
+            self._sleep(meta, delay)
+
+    async def acall(self, backend: LLMBackend, request: Dict[str, Any], meta: Dict[str, Any]) -> Any:
+        model = request.get("model") or "unknown"
+        for attempt in range(self.max_retries + 1):
+            if call_abandoned(meta):
+                self._abandon(meta)
+            trial = self._check_breaker(model, meta)
+            try:
+                wait, estimate = self.reserve(request)
+                if wait:
+                    await asyncio.sleep(wait)
+                async with self.async_slot(model):
+                    try:
+                        response = await backend.acomplete(request, meta)
+                        error = None
+                    except Exception as e:
+                        error = e
+                if error is None:
+                    self.breaker(model).record_success()
+                    self.settle(estimate, response)
+                    return response
+                delay = self._on_error(model, meta, attempt, error)
+            finally:
+                if trial: # 헤지/마감으로 취소된 경우 포함
+                    self.breaker(model).release()
+            await asyncio.sleep(delay)
+
+
+class ScheduledBackend(LLMBackend):
+    """RequestScheduler 를 거쳐 호출하는 래퍼 백엔드"""
+
+    def __init__(self, backend: LLMBackend, scheduler: RequestScheduler):
+        self.backend = backend
+        self.scheduler = scheduler
+        self.name = backend.name
+
+    def complete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        return self.scheduler.call(self.backend, request, meta if meta is not None else {})
+
+    async def acomplete(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]] = None) -> Any:
+        return await self.scheduler.acall(self.backend, request, meta if meta is not None else {})
+
+    def stream(self, request: Dict[str, Any], meta: Optional[Dict[str, Any]], on_delta: Callable[[str], None]) -> Any:
+        emitted = False
+
+        def forward(delta: str):
+            nonlocal emitted
+            emitted = True
+            on_delta(delta)
+
+        def invoke(request: Dict[str, Any], meta: Dict[str, Any]) -> Any:
+            try:
+                return self.backend.stream(request, meta, forward)
+            except Exception as e:
+                if emitted: # 일부가 이미 출력되었으므로 재시도하면 내용이 중복됨
+                    raise StreamInterruptedError(str(e)) from e
+                raise
+
+        return self.scheduler.call(self.backend, request, meta if meta is not None else {}, invoke=invoke)
@@ -0,0 +1,24 @@
+# 프롬프트 토큰 수 추정. tiktoken 이 설치되어 있으면 사용하고, 없으면 UTF-8 바이트 기반 근사값을 사용합니다.
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception:
+            _encoding = None
+    return _encoding
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return max(1, len(text.encode("utf-8")) // 4)
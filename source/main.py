@@ -2,9 +2,18 @@ from custom_logger import logger
 from game.game import Game
 from config import config
 from config import persona
+import argparse
+import os
+import time
 
 # --- 시뮬레이션 실행 ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Limited Rock-Paper-Scissors simulation")
+    parser.add_argument("--resume", metavar="DIR", help="이 체크포인트 디렉토리의 마지막 턴 경계부터 이어서 실행")
+    parser.add_argument("--checkpoint-dir", metavar="DIR", help=f"체크포인트 저장 위치 (기본: {config.CHECKPOINT_DIR}/<시각>)")
+    parser.add_argument("--no-checkpoint", action="store_true", help="체크포인트를 기록하지 않음")
+    args = parser.parse_args()
+
     # 플레이어 설정
     player_configurations = [
         {"name": "카이지", "persona": persona.kaiji_persona, "loan": 3000000},
@@ -22,8 +31,16 @@ if __name__ == "__main__":
         logger.warning(f"Number of player configurations ({len(player_configurations)}) does not match TOTAL_PLAYERS ({config.TOTAL_PLAYERS}). Adjusting TOTAL_PLAYERS.")
         TOTAL_PLAYERS = len(player_configurations)
 
-    # 게임 인스턴스 생성 및 실행
-    game = Game(player_configurations)
+    # 게임 인스턴스 생성 (또는 체크포인트에서 복원) 및 실행
+    if args.resume:
+        game = Game.resume(args.resume)
+    else:
+        checkpoint_dir = None
+        if not args.no_checkpoint:
+            checkpoint_dir = args.checkpoint_dir or os.path.join(config.CHECKPOINT_DIR, time.strftime("%Y%m%d-%H%M%S"))
+        game = Game(player_configurations, checkpoint_dir=checkpoint_dir)
+    if config.NARRATIVE_INCREMENTAL:
+        game.enable_narrative() # 끝난 턴 구간의 서사 요약을 게임 진행 중에 미리 생성
     game.run_simulation()
 
     # --- 시뮬레이션 종료 후 서사 요약 생성 호출 추가 ---
@@ -37,3 +54,6 @@ if __name__ == "__main__":
     else:
         logger.warning("시뮬레이션이 정상적으로 종료되지 않아 서사 요약을 생성할 수 없습니다.")
 
+    # LLM 호출/게임 단계 계측 리포트 저장
+    game.write_metrics_report()
+
@@ -0,0 +1,18 @@
+from .collector import MetricsCollector
+import contextvars
+
+_collector = MetricsCollector()
+# 한 프로세스에서 여러 게임을 스레드로 돌릴 때 (batch_sweep.py) 게임별 수집기.
+# 스레드 풀/태스크에 넘기는 작업은 contextvars.copy_context() 로 실행해야 게임의 수집기를 이어받음 (llm.deadline, 서사 요약)
+_current: contextvars.ContextVar = contextvars.ContextVar("metrics_collector", default=None)
+
+
+def get_collector() -> MetricsCollector:
+    """현재 게임의 계측 수집기 (Game 생성 시 새 수집기로 교체됨, 게임을 만든 컨텍스트에서는 그 게임의 수집기)"""
+    return _current.get() or _collector
+
+
+def set_collector(collector: MetricsCollector):
+    global _collector
+    _collector = collector
+    _current.set(collector)
@@ -0,0 +1,398 @@
+from typing import Any, Dict, List, Optional, Tuple
+from collections import defaultdict
+from contextlib import contextmanager
+from config import config
+import json
+import math
+import os
+import time
+
+# 지연 시간 히스토그램 버킷 (초)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, math.inf)
+
+
+# --- Histogram ---
+class Histogram:
+    """고정 버킷 누적 히스토그램 + 정확한 분위수 계산용 원본 샘플"""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.samples: List[float] = []
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def to_state(self) -> Dict[str, Any]:
+        """체크포인트용 원본 상태 (merge 로 다른 히스토그램에 더할 수 있음)"""
+        return {"counts": list(self.counts), "samples": list(self.samples), "sum": self.sum}
+
+    def merge(self, state: Dict[str, Any]):
+        self.counts = [count + other for count, other in zip(self.counts, state["counts"])]
+        self.samples.extend(state["samples"])
+        self.sum += state["sum"]
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(상한, 누적 개수) 목록 (Prometheus le 라벨 형식)"""
+        total = 0
+        result = []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p90": round(self.quantile(0.9), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(max(self.samples), 6) if self.samples else 0.0,
+            "buckets": {("+Inf" if math.isinf(bound) else str(bound)): count for bound, count in self.cumulative()},
+        }
+
+
+class CallStats:
+    """호출 묶음(호출 위치/플레이어/턴 단위) 집계"""
+
+    COUNTERS = ("calls", "errors", "retries", "degraded", "cache_hits", "late", "hedged", "deadline_defaults",
+                "prompt_tokens", "completion_tokens", "cached_tokens", "cost_usd")
+    REASONS = ("error_types", "retry_reasons", "degrade_reasons")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.degraded = 0 # 재시도 소진/서킷 차단 등으로 포기한 호출
+        self.cache_hits = 0
+        self.late = 0 # 헤지 기준 시간보다 늦은 응답
+        self.hedged = 0 # 중복 요청을 보낸 호출
+        self.deadline_defaults = 0 # 마감을 넘겨 기본값으로 대체된 호출
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.cost_usd = 0.0
+        self.error_types: Dict[str, int] = defaultdict(int)
+        self.retry_reasons: Dict[str, int] = defaultdict(int)
+        self.degrade_reasons: Dict[str, int] = defaultdict(int)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_types": dict(self.error_types),
+            "retries": self.retries,
+            "retry_reasons": dict(self.retry_reasons),
+            "degraded": self.degraded,
+            "degrade_reasons": dict(self.degrade_reasons),
+            "cache_hits": self.cache_hits,
+            "late": self.late,
+            "hedged": self.hedged,
+            "deadline_defaults": self.deadline_defaults,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "prefix_hit_ratio": prefix_hit_ratio(self.cached_tokens, self.prompt_tokens),
+            "cost_usd": round(self.cost_usd, 6),
+            "latency": self.latency.to_dict(),
+        }
+
+    def to_state(self) -> Dict[str, Any]:
+        state = {name: getattr(self, name) for name in self.COUNTERS}
+        state.update({name: dict(getattr(self, name)) for name in self.REASONS})
+        state["latency"] = self.latency.to_state()
+        return state
+
+    def merge(self, state: Dict[str, Any]):
+        for name in self.COUNTERS:
+            setattr(self, name, getattr(self, name) + state[name])
+        for name in self.REASONS:
+            counts = getattr(self, name)
+            for key, value in state[name].items():
+                counts[key] += value
+        self.latency.merge(state["latency"])
+
+
+def prefix_hit_ratio(cached_tokens: int, prompt_tokens: int) -> float:
+    """프롬프트 토큰 중 제공자 캐시(usage.prompt_tokens_details.cached_tokens)로 처리된 비율
+
+    제공자 캐시는 모델별로, 그리고 도구 스키마부터 시작하는 프리픽스 단위로 나뉘므로 같은 메시지 프리픽스라도
+    모델/도구 유무가 다른 호출끼리는 공유되지 않습니다. 그룹별 비율은 리포트의 by_prefix_group 참고.
+    """
+    return round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0
+
+
+def prefix_cache_group(request: Dict[str, Any]) -> str:
+    """요청이 공유할 수 있는 제공자 프리픽스 캐시 그룹 ("모델/tools" 또는 "모델/no_tools")"""
+    return f"{request.get('model') or 'unknown'}/{'tools' if request.get('tools') else 'no_tools'}"
+
+
+def sum_totals(totals_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """여러 게임의 MetricsCollector.totals() 합계. 비율은 더하지 않고 합계 토큰으로 다시 계산"""
+    summed: Dict[str, Any] = defaultdict(int)
+    for totals in totals_list:
+        for key, value in totals.items():
+            if key != "prefix_hit_ratio":
+                summed[key] += value
+    result = dict(summed)
+    result["prefix_hit_ratio"] = prefix_hit_ratio(result.get("cached_tokens", 0), result.get("prompt_tokens", 0))
+    for key in ("cost_usd", "llm_seconds"):
+        if key in result:
+            result[key] = round(result[key], 6)
+    return result
+
+
+def estimate_cost(model: Optional[str], prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """config.MODEL_PRICES (1M 토큰당 USD) 기준 비용 추정. 가격표에 없는 모델은 0"""
+    prices = config.MODEL_PRICES.get(model or "")
+    if not prices:
+        return 0.0
+    uncached = max(0, prompt_tokens - cached_tokens)
+    return (uncached * prices["input"] + cached_tokens * prices.get("cached_input", prices["input"])
+            + completion_tokens * prices["output"]) / 1_000_000
+
+
+def _usage_tokens(response: Any) -> Tuple[int, int, int]:
+    """response.usage 에서 (prompt, completion, cached) 토큰 수 추출"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return 0, 0, 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", 0) if details is not None else 0
+    return getattr(usage, "prompt_tokens", 0) or 0, getattr(usage, "completion_tokens", 0) or 0, cached or 0
+
+
+# --- Metrics Collector ---
+class MetricsCollector:
+    """게임 하나의 LLM 호출/게임 단계 계측값 수집기
+
+    LLM 호출은 호출 위치(call_site), 모델, 플레이어, 턴, 라우팅 결정, 제공자 캐시 그룹 단위로 각각 집계하고,
+    게임 단계(턴, 결정 배치, 감정 갱신 등)는 단계별 지연 히스토그램으로 집계합니다.
+    체크포인트 중에는 track_deltas 이후 기록을 따로 모아 take_delta 로 저널에 넘기고, 복원 시 merge_state 로 다시 더합니다.
+    """
+
+    GROUPS = ("by_call_site", "by_player", "by_turn", "by_model", "by_route", "by_prefix_group")
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.by_call_site: Dict[str, CallStats] = defaultdict(CallStats)
+        self.by_player: Dict[str, CallStats] = defaultdict(CallStats)
+        self.by_turn: Dict[int, CallStats] = defaultdict(CallStats)
+        self.by_model: Dict[str, CallStats] = defaultdict(CallStats)
+        self.by_route: Dict[str, CallStats] = defaultdict(CallStats) # 모델 라우팅 결정별 ("호출 위치/모델/이유", meta["route"])
+        self.by_prefix_group: Dict[str, CallStats] = defaultdict(CallStats) # 제공자 캐시 그룹별 ("모델/tools|no_tools", meta["prefix_group"])
+        self.phases: Dict[str, Histogram] = defaultdict(Histogram)
+        self.sections: Dict[str, Any] = {} # 리포트에 함께 저장할 부가 정보 (프롬프트 프리픽스, fast-path 등)
+        self._pending: Optional['MetricsCollector'] = None # 마지막 take_delta 이후 기록 (체크포인트 저널용)
+
+    def _groups(self, meta: Dict[str, Any], model: Optional[str]) -> List[CallStats]:
+        groups = [self.by_call_site[meta.get("call_site") or "unknown"], self.by_model[model or "unknown"]]
+        if meta.get("player"):
+            groups.append(self.by_player[meta["player"]])
+        if meta.get("turn") is not None:
+            groups.append(self.by_turn[meta["turn"]])
+        if meta.get("route"):
+            groups.append(self.by_route[meta["route"]])
+        if meta.get("prefix_group"):
+            groups.append(self.by_prefix_group[meta["prefix_group"]])
+        if self._pending is not None:
+            groups += self._pending._groups(meta, model)
+        return groups
+
+    def record_call(self, meta: Optional[Dict[str, Any]], model: Optional[str], latency: float,
+                    response: Any = None, error: Optional[BaseException] = None):
+        """LLM 호출 1회 기록 (성공 시 response, 실패 시 error)"""
+        meta = meta or {}
+        prompt, completion, cached = _usage_tokens(response) if response is not None else (0, 0, 0)
+        cache_hit = bool(meta.get("cache_hit"))
+        cost = 0.0 if cache_hit else estimate_cost(model, prompt, completion, cached)
+        for stats in self._groups(meta, model):
+            stats.calls += 1
+            stats.latency.observe(latency)
+            if error is not None:
+                stats.errors += 1
+                stats.error_types[type(error).__name__] += 1
+                continue
+            stats.cache_hits += int(cache_hit)
+            stats.prompt_tokens += prompt
+            stats.completion_tokens += completion
+            stats.cached_tokens += cached
+            stats.cost_usd += cost
+
+    def record_retry(self, meta: Optional[Dict[str, Any]], model: Optional[str], reason: str = "unknown"):
+        """재시도 1회 기록 (재시도를 수행하는 계층에서 호출)"""
+        for stats in self._groups(meta or {}, model):
+            stats.retries += 1
+            stats.retry_reasons[reason] += 1
+
+    def record_degraded(self, meta: Optional[Dict[str, Any]], model: Optional[str], reason: str):
+        """호출 포기 1회 기록 (호출부는 do_nothing/거절 등 기본값으로 대체)"""
+        for stats in self._groups(meta or {}, model):
+            stats.degraded += 1
+            stats.degrade_reasons[reason] += 1
+
+    def record_timing(self, meta: Optional[Dict[str, Any]], timing: 'CallTiming'):
+        """마감/헤지 호출 결과 기록 (llm.deadline 에서 호출, 모델 구분 없음)"""
+        meta = meta or {}
+        groups = [self.by_call_site[meta.get("call_site") or "unknown"]]
+        if meta.get("player"):
+            groups.append(self.by_player[meta["player"]])
+        if meta.get("turn") is not None:
+            groups.append(self.by_turn[meta["turn"]])
+        for stats in groups:
+            stats.late += int(timing.late)
+            stats.hedged += int(timing.hedged)
+            stats.deadline_defaults += int(timing.defaulted)
+        if self._pending is not None:
+            self._pending.record_timing(meta, timing)
+
+    @contextmanager
+    def phase(self, name: str):
+        """게임 단계 구간의 벽시계 시간 측정 (동기/비동기 코드 모두 with 블록으로 사용)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name].observe(elapsed)
+            if self._pending is not None:
+                self._pending.phases[name].observe(elapsed)
+
+    # --- 체크포인트 ---
+
+    def track_deltas(self):
+        """이후 기록을 take_delta 용으로 따로 모으기 시작"""
+        self._pending = MetricsCollector()
+
+    def take_delta(self) -> Dict[str, Any]:
+        """마지막 take_delta (또는 track_deltas) 이후 기록의 원본 상태 (저널 한 줄에 추가)"""
+        pending, self._pending = self._pending, MetricsCollector()
+        return pending.to_state() if pending is not None else {}
+
+    def to_state(self) -> Dict[str, Any]:
+        state = {group: {str(key): stats.to_state() for key, stats in getattr(self, group).items()} for group in self.GROUPS}
+        state["phases"] = {name: histogram.to_state() for name, histogram in self.phases.items()}
+        return state
+
+    def merge_state(self, state: Dict[str, Any]):
+        """to_state/take_delta 결과를 현재 집계에 더합니다. (복원 시 저널 순서대로)"""
+        for group in self.GROUPS:
+            stats_by_key = getattr(self, group)
+            for key, stats in state.get(group, {}).items():
+                stats_by_key[int(key) if group == "by_turn" else key].merge(stats)
+        for name, histogram in state.get("phases", {}).items():
+            self.phases[name].merge(histogram)
+
+    # --- 내보내기 ---
+
+    def totals(self) -> Dict[str, Any]:
+        """전체 합계 (모든 호출은 정확히 하나의 call_site 에 속함)"""
+        sites = self.by_call_site.values()
+        prompt_tokens = sum(s.prompt_tokens for s in sites)
+        cached_tokens = sum(s.cached_tokens for s in sites)
+        return {
+            "calls": sum(s.calls for s in sites),
+            "errors": sum(s.errors for s in sites),
+            "retries": sum(s.retries for s in sites),
+            "degraded": sum(s.degraded for s in sites),
+            "late": sum(s.late for s in sites),
+            "hedged": sum(s.hedged for s in sites),
+            "deadline_defaults": sum(s.deadline_defaults for s in sites),
+            "cache_hits": sum(s.cache_hits for s in sites),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": sum(s.completion_tokens for s in sites),
+            "cached_tokens": cached_tokens,
+            "prefix_hit_ratio": prefix_hit_ratio(cached_tokens, prompt_tokens),
+            "cost_usd": round(sum(s.cost_usd for s in sites), 6),
+            "llm_seconds": round(sum(s.latency.sum for s in sites), 6),
+        }
+
+    def to_report(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "wall_seconds": round(time.time() - self.started_at, 6),
+            "totals": self.totals(),
+            "by_call_site": {name: stats.to_dict() for name, stats in sorted(self.by_call_site.items())},
+            "by_model": {name: stats.to_dict() for name, stats in sorted(self.by_model.items())},
+            "by_route": {name: stats.to_dict() for name, stats in sorted(self.by_route.items())},
+            "by_prefix_group": {name: stats.to_dict() for name, stats in sorted(self.by_prefix_group.items())},
+            "by_player": {name: stats.to_dict() for name, stats in sorted(self.by_player.items())},
+            "by_turn": {str(turn): stats.to_dict() for turn, stats in sorted(self.by_turn.items())},
+            "phases": {name: histogram.to_dict() for name, histogram in sorted(self.phases.items())},
+            **self.sections,
+        }
+
+    def to_prometheus(self, prefix: str = "rrps") -> str:
+        """Prometheus 텍스트 형식 (OpenMetrics 호환 '# EOF' 포함). 카디널리티를 위해 턴 라벨은 제외"""
+        lines = []
+
+        def histogram(name: str, help_text: str, label: str, items: Dict[str, Histogram]):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, hist in sorted(items.items()):
+                for bound, count in hist.cumulative():
+                    le = "+Inf" if math.isinf(bound) else repr(bound)
+                    lines.append(f'{prefix}_{name}_bucket{{{label}="{_escape(key)}",le="{le}"}} {count}')
+                lines.append(f'{prefix}_{name}_sum{{{label}="{_escape(key)}"}} {hist.sum:.6f}')
+                lines.append(f'{prefix}_{name}_count{{{label}="{_escape(key)}"}} {hist.count}')
+
+        def counter(name: str, help_text: str, label: str, groups: Dict[str, CallStats], attr: str):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, stats in sorted(groups.items()):
+                lines.append(f'{prefix}_{name}_total{{{label}="{_escape(key)}"}} {getattr(stats, attr)}')
+
+        histogram("llm_request_duration_seconds", "LLM call latency by call site.", "call_site",
+                  {name: stats.latency for name, stats in self.by_call_site.items()})
+        for label, groups in (("call_site", self.by_call_site), ("player", self.by_player), ("model", self.by_model), ("route", self.by_route),
+                              ("prefix_group", self.by_prefix_group)):
+            suffix = "" if label == "call_site" else f"_by_{label}"
+            counter(f"llm_requests{suffix}", f"LLM calls by {label}.", label, groups, "calls")
+            counter(f"llm_errors{suffix}", f"Failed LLM calls by {label}.", label, groups, "errors")
+            counter(f"llm_retries{suffix}", f"LLM call retries by {label}.", label, groups, "retries")
+            counter(f"llm_degraded{suffix}", f"LLM calls given up (defaulted) by {label}.", label, groups, "degraded")
+            counter(f"llm_prompt_tokens{suffix}", f"Prompt tokens by {label}.", label, groups, "prompt_tokens")
+            counter(f"llm_completion_tokens{suffix}", f"Completion tokens by {label}.", label, groups, "completion_tokens")
+            counter(f"llm_cached_prompt_tokens{suffix}", f"Prompt tokens served from the provider prefix cache by {label}.", label, groups, "cached_tokens")
+            counter(f"llm_hedged{suffix}", f"Hedged LLM calls by {label}.", label, groups, "hedged")
+            counter(f"llm_deadline_defaults{suffix}", f"LLM calls replaced by a fallback after the deadline by {label}.", label, groups, "deadline_defaults")
+            counter(f"llm_cost_usd{suffix}", f"Estimated cost in USD by {label}.", label, groups, "cost_usd")
+        histogram("phase_duration_seconds", "Game phase wall time.", "phase", dict(self.phases))
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str, name: str, prometheus: bool = False) -> List[str]:
+        """<directory>/<name>.json (과 선택적으로 <name>.prom) 저장. 저장한 경로 목록 반환"""
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+        paths = [os.path.join(directory, f"{name}.json")]
+        with open(paths[0], "w", encoding="utf-8") as f:
+            json.dump(self.to_report(), f, ensure_ascii=False, indent=2)
+        if prometheus:
+            paths.append(os.path.join(directory, f"{name}.prom"))
+            with open(paths[1], "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+        return paths
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,298 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+from contextlib import contextmanager
+from custom_logger import logger
+from config import config
+import contextvars
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+
+PROFILE_MODES = ("cprofile", "sampling", "tracemalloc", "spans")
+SPEEDSCOPE_SCHEMA = "https://www.speedscope.app/file-format-schema.json"
+
+
+def parse_turns(value: Optional[str]) -> Optional[Set[int]]:
+    """'3,10-12' -> {3, 10, 11, 12}. 비어 있으면 None (모든 턴)"""
+    if not value:
+        return None
+    turns = set()
+    for part in str(value).split(","):
+        part = part.strip()
+        if "-" in part:
+            first, last = part.split("-", 1)
+            turns.update(range(int(first), int(last) + 1))
+        elif part:
+            turns.add(int(part))
+    return turns
+
+
+def _split_names(value: Optional[str]) -> Optional[Set[str]]:
+    names = {name.strip() for name in (value or "").split(",") if name.strip()}
+    return names or None
+
+
+class _NullContext:
+    """비활성 프로파일러용 no-op 컨텍스트 (with 블록 1회 비용만 남김)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+_run_ids = itertools.count(1) # 같은 프로세스의 여러 게임(batch_sweep.py) 산출물 디렉토리 구분
+
+
+class NullProfiler:
+    """프로파일링이 꺼져 있을 때 사용하는 프로파일러 (모든 훅이 no-op)"""
+
+    enabled = False
+
+    def turn(self, turn: int):
+        return _NULL_CONTEXT
+
+    def span(self, name: str, lane: str = "game"):
+        return _NULL_CONTEXT
+
+    def llm_span(self, meta: Optional[Dict[str, Any]]):
+        return _NULL_CONTEXT
+
+
+# --- Sampling Profiler ---
+class StackSampler:
+    """대상 스레드의 호출 스택을 일정 간격으로 수집하는 샘플링 프로파일러 (speedscope sampled 형식으로 내보냄)"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: List[Tuple[str, ...]] = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples.append(tuple(reversed(stack))) # 루트 -> 리프
+
+
+# --- Profiler ---
+class Profiler:
+    """턴/행동 처리/LLM 호출 위치별 프로파일링 훅 (PROFILE 설정 또는 환경변수로 켬)
+
+    선택된 턴마다 PROFILE_DIR/<실행 이름>/ 아래에 산출물을 하나씩 기록합니다.
+    - cprofile: turn_NNNN.pstats (python -m pstats / snakeviz)
+    - sampling, spans: turn_NNNN.speedscope.json (https://www.speedscope.app)
+      spans 는 턴, handle_action, LLM 호출(call_site 별)의 벽시계 구간. 동시에 진행된 LLM 호출은 별도 레인(profile)으로 나뉨
+    - tracemalloc: turn_NNNN.tracemalloc.txt (턴 시작 대비 할당 증가 상위 위치)
+    """
+
+    enabled = True
+
+    def __init__(self, modes: Set[str], directory: str, turns: Optional[Set[int]] = None, call_sites: Optional[Set[str]] = None):
+        self.modes = modes
+        self.directory = directory
+        self.turns = turns
+        self.call_sites = call_sites
+        self.artifacts: List[str] = []
+        self._active_turn: Optional[int] = None
+        self._spans: List[Tuple[str, str, float, float]] = [] # (레인, 이름, 시작, 끝)
+        self._lock = threading.Lock()
+
+        if "tracemalloc" in modes:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(config.PROFILE_TRACEMALLOC_FRAMES)
+
+    @contextmanager
+    def turn(self, turn: int):
+        """턴 1회 프로파일링 (선택되지 않은 턴은 그대로 통과)"""
+        if self.turns is not None and turn not in self.turns:
+            yield
+            return
+
+        cprofile = sampler = snapshot = None
+        if "cprofile" in self.modes:
+            import cProfile
+            cprofile = cProfile.Profile()
+        if "sampling" in self.modes:
+            sampler = StackSampler(threading.get_ident(), config.PROFILE_SAMPLE_INTERVAL)
+            sampler.start()
+        if "tracemalloc" in self.modes:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+
+        self._active_turn = turn
+        self._spans = []
+        started = time.perf_counter()
+        if cprofile:
+            cprofile.enable()
+        try:
+            with self.span(f"turn {turn}"):
+                yield
+        finally:
+            if cprofile:
+                cprofile.disable()
+            if sampler:
+                sampler.stop()
+            self._active_turn = None
+            self._write_turn(turn, started, cprofile, sampler, snapshot)
+
+    @contextmanager
+    def span(self, name: str, lane: str = "game"):
+        """벽시계 구간 기록 (spans 모드, 프로파일링 중인 턴 안에서만)"""
+        if "spans" not in self.modes or self._active_turn is None:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._spans.append((lane, name, started, time.perf_counter()))
+
+    def llm_span(self, meta: Optional[Dict[str, Any]]):
+        call_site = (meta or {}).get("call_site") or "unknown"
+        if self.call_sites is not None and call_site not in self.call_sites:
+            return _NULL_CONTEXT
+        player = (meta or {}).get("player")
+        return self.span(f"llm:{call_site}" + (f" ({player})" if player else ""), lane="llm")
+
+    # --- 산출물 ---
+
+    def _path(self, turn: int, suffix: str) -> str:
+        if not os.path.exists(self.directory):
+            os.makedirs(self.directory)
+        path = os.path.join(self.directory, f"turn_{turn:04d}.{suffix}")
+        self.artifacts.append(path)
+        return path
+
+    def _write_turn(self, turn: int, started: float, cprofile, sampler: Optional[StackSampler], snapshot):
+        try:
+            if cprofile:
+                cprofile.dump_stats(self._path(turn, "pstats"))
+            if sampler or "spans" in self.modes:
+                self._write_speedscope(turn, started, sampler)
+            if snapshot is not None:
+                self._write_tracemalloc(turn, snapshot)
+        except Exception as e:
+            logger.error(f"Failed to write profile for turn {turn}: {e}")
+
+    def _write_speedscope(self, turn: int, started: float, sampler: Optional[StackSampler]):
+        frames: List[Dict[str, str]] = []
+        frame_index: Dict[str, int] = {}
+
+        def frame(name: str) -> int:
+            if name not in frame_index:
+                frame_index[name] = len(frames)
+                frames.append({"name": name})
+            return frame_index[name]
+
+        profiles = []
+        for lane_name, spans in self._lanes():
+            events = []
+            end_value = 0.0
+            stack: List[Tuple[int, float]] = []
+            # 시작 순(같으면 긴 구간 먼저)으로 열고, 스택으로 중첩 순서대로 닫음
+            for _, name, span_start, span_end in sorted(spans, key=lambda span: (span[2], -span[3])):
+                opened_at = (span_start - started) * 1000
+                while stack and stack[-1][1] <= opened_at:
+                    closing, closed_at = stack.pop()
+                    events.append({"type": "C", "frame": closing, "at": closed_at})
+                closes_at = (span_end - started) * 1000
+                if stack: # 부모보다 늦게 끝나는 구간은 부모 끝에 맞춤 (evented 형식은 완전한 중첩 필요)
+                    closes_at = min(closes_at, stack[-1][1])
+                index = frame(name)
+                events.append({"type": "O", "frame": index, "at": opened_at})
+                stack.append((index, closes_at))
+                end_value = max(end_value, closes_at)
+            while stack:
+                closing, closed_at = stack.pop()
+                events.append({"type": "C", "frame": closing, "at": closed_at})
+            profiles.append({"type": "evented", "name": f"turn {turn} {lane_name}", "unit": "milliseconds",
+                             "startValue": 0, "endValue": end_value, "events": events})
+
+        if sampler and sampler.samples:
+            samples = [[frame(name) for name in stack] for stack in sampler.samples]
+            profiles.append({"type": "sampled", "name": f"turn {turn} samples", "unit": "seconds",
+                             "startValue": 0, "endValue": len(samples) * sampler.interval,
+                             "samples": samples, "weights": [sampler.interval] * len(samples)})
+
+        with open(self._path(turn, "speedscope.json"), "w", encoding="utf-8") as f:
+            json.dump({"$schema": SPEEDSCOPE_SCHEMA, "shared": {"frames": frames}, "profiles": profiles,
+                       "name": f"turn {turn}", "exporter": "restricted-rps"}, f, ensure_ascii=False)
+
+    def _lanes(self) -> List[Tuple[str, List[Tuple[str, str, float, float]]]]:
+        """게임 레인 + 겹치지 않게 나눈 LLM 레인들"""
+        with self._lock:
+            spans = list(self._spans)
+        lanes = [("game", [span for span in spans if span[0] == "game"])]
+        llm_lanes: List[List[Tuple[str, str, float, float]]] = []
+        for span in sorted((span for span in spans if span[0] != "game"), key=lambda span: span[2]):
+            lane = next((lane for lane in llm_lanes if lane[-1][3] <= span[2]), None)
+            if lane is None:
+                lane = []
+                llm_lanes.append(lane)
+            lane.append(span)
+        lanes += [(f"llm #{index}", lane) for index, lane in enumerate(llm_lanes, 1)]
+        return [(name, lane) for name, lane in lanes if lane]
+
+    def _write_tracemalloc(self, turn: int, before):
+        import tracemalloc
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        lines = [f"turn {turn}: traced current={current} bytes, peak={peak} bytes", ""]
+        lines += [str(stat) for stat in after.compare_to(before, "lineno")[:config.PROFILE_TRACEMALLOC_TOP]]
+        with open(self._path(turn, "tracemalloc.txt"), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+def create_profiler() -> 'Profiler':
+    """PROFILE_MODES(환경변수 PROFILE), PROFILE_TURNS, PROFILE_CALL_SITES 설정으로 게임별 프로파일러 생성"""
+    modes_value = os.getenv("PROFILE", ",".join(config.PROFILE_MODES))
+    modes = {mode.strip() for mode in modes_value.split(",") if mode.strip()}
+    if not modes:
+        return NullProfiler()
+    unknown = modes - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile modes: {sorted(unknown)} (available: {PROFILE_MODES})")
+
+    turns = parse_turns(os.getenv("PROFILE_TURNS", config.PROFILE_TURNS))
+    call_sites = _split_names(os.getenv("PROFILE_CALL_SITES", config.PROFILE_CALL_SITES))
+    directory = os.path.join(os.getenv("PROFILE_DIR", config.PROFILE_DIR), f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{next(_run_ids)}")
+    logger.info(f"Profiling enabled: modes={sorted(modes)}, turns={sorted(turns) if turns else 'all'}, "
+                f"call_sites={sorted(call_sites) if call_sites else 'all'}, dir={directory}")
+    return Profiler(modes, directory, turns, call_sites)
+
+
+_profiler = NullProfiler()
+_current: contextvars.ContextVar = contextvars.ContextVar("profiler", default=None)
+
+
+def get_profiler():
+    """현재 게임의 프로파일러 (get_collector 와 같은 방식: 게임을 만든 컨텍스트 우선, 없으면 마지막으로 만든 게임)"""
+    return _current.get() or _profiler
+
+
+def set_profiler(profiler):
+    global _profiler
+    _profiler = profiler
+    _current.set(profiler)
@@ -1,19 +1,51 @@
-import openai
 from custom_logger import logger
-from dotenv import load_dotenv
+import asyncio
 import os
+import weakref
 
-# --- Configuration ---
-load_dotenv() # Load environment variables from .env file if it exists
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
-# --- Placeholder for API Key setup ---
-try:
-    # Use the new client interface
-    client = openai.OpenAI()
-    # Example: Check connection by listing models (optional)
-    # client.models.list()
-    logger.info("OpenAI client initialized successfully.")
-except Exception as e:
-    logger.error(f"Failed to initialize OpenAI client: {e}")
-    exit()
\ No newline at end of file
+# --- Lazy Client ---
+# import 만으로는 .env 로드, SDK import, 클라이언트 생성을 하지 않습니다. (오프라인 분석/mock 실행에 API 키 불필요)
+_client = None
+_async_clients = weakref.WeakKeyDictionary() # 이벤트 루프 -> 비동기 클라이언트 (asyncio.run 마다 새 루프)
+
+
+class OpenAIClientError(RuntimeError):
+    """OpenAI 클라이언트를 만들 수 없는 경우 (API 키 누락 등)"""
+
+
+def _load_api_key():
+    from dotenv import load_dotenv
+    load_dotenv() # Load environment variables from .env file if it exists
+    return os.getenv("OPENAI_API_KEY")
+
+
+def get_client():
+    """동기 클라이언트 (첫 호출 시 생성)"""
+    global _client
+    if _client is None:
+        _client = _create("OpenAI")
+    return _client
+
+
+def get_async_client():
+    """턴 단위 동시 요청용 비동기 클라이언트 (실행 중인 이벤트 루프마다 생성)
+
+    비동기 클라이언트의 연결은 만든 루프에 묶이므로, 닫힌 루프의 클라이언트를 다음 asyncio.run 에서 재사용하지 않습니다.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = _create("AsyncOpenAI")
+    return client
+
+
+def _create(class_name: str):
+    api_key = _load_api_key()
+    try:
+        import openai
+        client = getattr(openai, class_name)(api_key=api_key)
+    except Exception as e:
+        logger.error(f"Failed to initialize OpenAI client: {e}")
+        raise OpenAIClientError(f"Failed to initialize OpenAI client: {e}") from e
+    logger.info(f"OpenAI client initialized successfully ({class_name}).")
+    return client
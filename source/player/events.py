@@ -0,0 +1,263 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# 거래 자원 순서: (별, 바위, 가위, 보, 현금)
+ITEM_KEYS = ("stars", "rock", "scissors", "paper", "money")
+
+
+# --- Event Records ---
+class Event:
+    """append-only 이벤트 레코드. seq/turn/player 는 EventStore.append 시점에 채워집니다."""
+    __slots__ = ("seq", "turn", "player")
+    kind = "event"
+
+    def render_body(self) -> str:
+        raise NotImplementedError
+
+    def partner(self) -> Optional[str]:
+        """상호작용한 상대 플레이어 이름 (거래/게임/제안/응답 이벤트만)"""
+        return None
+
+    def render(self) -> str:
+        """프롬프트용 한 줄 기록"""
+        return f"Turn {self.turn}: {self.render_body()}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {"kind": self.kind, "seq": self.seq, "turn": self.turn, "player": self.player}
+        for cls in type(self).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if slot not in data:
+                    data[slot] = getattr(self, slot)
+        return data
+
+
+class EmotionEvent(Event):
+    __slots__ = ("emotion",)
+    kind = "emotion"
+
+    def __init__(self, emotion: str):
+        self.emotion = emotion
+
+    def render_body(self) -> str:
+        return f"Update Current Emotion : {self.emotion}"
+
+
+class DecisionEvent(Event):
+    """행동 결정. outcome: decided | implicit | api_error | invalid_response | no_action | deadline_default | plan_skipped
+
+    timing 은 지연 표시 ('late', 'hedged', 'defaulted' 조합)로, 프롬프트에는 렌더링하지 않습니다.
+    """
+    __slots__ = ("function_name", "reasoning", "args", "outcome", "timing")
+    kind = "decision"
+
+    TEMPLATES = {
+        "decided": "Decided '{function_name}'. Internal Reason: {reasoning}. Args: {args}",
+        "implicit": "Decided 'do_nothing' (Implicit). Reason: No function call returned.",
+        "api_error": "Action failed due to API error. Defaulting to 'do_nothing'.",
+        "invalid_response": "Action failed due to invalid response. Defaulting to 'do_nothing'.",
+        "no_action": "Failed to get action decision.",
+        "deadline_default": "No decision before the deadline. Defaulted to '{function_name}'. Args: {args}",
+        "plan_skipped": "Planned '{function_name}' was not executed ({reasoning}). Args: {args}",
+    }
+
+    def __init__(self, outcome: str, function_name: str = "do_nothing", reasoning: str = "", args: Optional[Dict[str, Any]] = None,
+                 timing: str = ""):
+        self.outcome = outcome
+        self.function_name = function_name
+        self.reasoning = reasoning
+        self.args = args
+        self.timing = timing
+
+    def render_body(self) -> str:
+        return self.TEMPLATES[self.outcome].format(function_name=self.function_name, reasoning=self.reasoning, args=self.args)
+
+
+def _format_items(items: Tuple[int, ...]) -> str:
+    stars, rock, scissors, paper, money = items
+    return f"{stars}*, R:{rock}, S:{scissors}, P:{paper}, M:{money}"
+
+
+class TradeEvent(Event):
+    """성사된 거래. gave/received 는 기록 주체 기준 (별, 바위, 가위, 보, 현금)"""
+    __slots__ = ("counterparty", "role", "gave", "received")
+    kind = "trade"
+
+    def __init__(self, counterparty: str, role: str, gave: Tuple[int, ...], received: Tuple[int, ...]):
+        self.counterparty = counterparty
+        self.role = role # "proposer" | "acceptor"
+        self.gave = gave
+        self.received = received
+
+    def partner(self) -> Optional[str]:
+        return self.counterparty
+
+    def render_body(self) -> str:
+        head = f"Trade executed with {self.counterparty}." if self.role == "proposer" else f"Accepted trade with {self.counterparty}."
+        return f"{head} Gave: {_format_items(self.gave)}. Received: {_format_items(self.received)}."
+
+
+class MatchEvent(Event):
+    __slots__ = ("opponent", "card", "opponent_card", "result", "stars")
+    kind = "match"
+
+    def __init__(self, opponent: str, card: str, opponent_card: str, result: str, stars: int):
+        self.opponent = opponent
+        self.card = card
+        self.opponent_card = opponent_card
+        self.result = result # "Win" | "Lose" | "Draw"
+        self.stars = stars
+
+    def partner(self) -> Optional[str]:
+        return self.opponent
+
+    def render_body(self) -> str:
+        return f"Played '{self.card}' against {self.opponent} ('{self.opponent_card}'). Result: {self.result}. Stars: {self.stars}."
+
+
+class ProposalEvent(Event):
+    """제안자 측에서 본, 성사되지 않은 제안의 결과"""
+    __slots__ = ("action", "counterparty", "outcome")
+    kind = "proposal"
+
+    TEMPLATES = {
+        ("trade", "target_invalid"): "Trade proposal to {counterparty} failed (target inactive/invalid).",
+        ("trade", "failed_validation"): "Trade with {counterparty} accepted but failed validation.",
+        ("trade", "rejected"): "Trade proposal to {counterparty} was rejected.",
+        ("trade", "queued"): "Trade offer to {counterparty} posted to the order book (settled at turn end).",
+        ("trade", "matched"): "Trade offer to {counterparty} was matched against their own offer.",
+        ("trade", "failed"): "Trade offer to {counterparty} was matched against their own offer but failed validation.",
+        ("match", "invalid"): "Match proposal to {counterparty} failed (invalid).",
+        ("match", "cancelled"): "Match with {counterparty} cancelled (opponent chose invalid card).",
+        ("match", "rejected"): "Match proposal to {counterparty} was rejected.",
+        ("exit", "failed_conditions"): "Attempted 'Out of Game' but failed conditions.",
+    }
+
+    def __init__(self, action: str, outcome: str, counterparty: Optional[str] = None):
+        self.action = action
+        self.outcome = outcome
+        self.counterparty = counterparty
+
+    def partner(self) -> Optional[str]:
+        return self.counterparty
+
+    def render_body(self) -> str:
+        return self.TEMPLATES[(self.action, self.outcome)].format(counterparty=self.counterparty)
+
+
+class ResponseEvent(Event):
+    """제안을 받은 측의 응답과 그 결과"""
+    __slots__ = ("action", "proposer", "outcome", "decision", "card", "reasoning", "detail", "timing")
+    kind = "response"
+
+    TEMPLATES = {
+        ("trade", "responded"): "Responded '{decision}' to trade from {proposer}. Reason: {reasoning}",
+        ("trade", "api_error"): "Failed to respond to trade from {proposer} due to API error. Defaulting to reject.",
+        ("trade", "deadline_default"): "No response to trade from {proposer} before the deadline. Defaulting to reject.",
+        ("trade", "rejected"): "Rejected trade proposal from {proposer}.",
+        ("trade", "failed_validation"): "Accepted trade with {proposer} but failed validation.",
+        ("trade", "auto_matched"): "Trade offer from {proposer} matched your own offer and was accepted.",
+        ("match", "accepted"): "Accepted match from {proposer}, playing '{card}'. Reason: {reasoning}",
+        ("match", "declined"): "Rejected match from {proposer}. Reason: {reasoning}",
+        ("match", "no_cards"): "Rejected match from {proposer} (no cards left).",
+        ("match", "invalid_card"): "Rejected match from {proposer} ({detail}). Reason: {reasoning}",
+        ("match", "invalid_decision"): "Rejected match from {proposer} (invalid decision '{decision}'). Reason: {reasoning}",
+        ("match", "invalid_json"): "Failed to respond to match from {proposer} due to invalid JSON response. Defaulting to reject.",
+        ("match", "api_error"): "Failed to respond to match from {proposer} due to API error. Defaulting to reject.",
+        ("match", "deadline_default"): "No response to match from {proposer} before the deadline. Defaulted to '{decision}' ({card}).",
+        ("match", "rejected"): "Rejected match proposal from {proposer}.",
+        ("match", "cancelled"): "Accepted match with {proposer} but chose invalid card '{card}'.",
+    }
+
+    def __init__(self, action: str, proposer: str, outcome: str, decision: Optional[str] = None,
+                 card: Optional[str] = None, reasoning: str = "", detail: str = "", timing: str = ""):
+        self.action = action
+        self.proposer = proposer
+        self.outcome = outcome
+        self.decision = decision
+        self.card = card
+        self.reasoning = reasoning
+        self.detail = detail
+        self.timing = timing # DecisionEvent.timing 과 같음
+
+    def partner(self) -> Optional[str]:
+        return self.proposer
+
+    def render_body(self) -> str:
+        return self.TEMPLATES[(self.action, self.outcome)].format(
+            proposer=self.proposer, decision=self.decision, card=self.card, reasoning=self.reasoning, detail=self.detail
+        )
+
+
+class StatusEvent(Event):
+    __slots__ = ("status", "reason")
+    kind = "status"
+
+    def __init__(self, status: str, reason: str = ""):
+        self.status = status
+        self.reason = reason
+
+    def render_body(self) -> str:
+        return f"Status changed to {self.status}. Reason: {self.reason}"
+
+
+EVENT_TYPES = {cls.kind: cls for cls in (EmotionEvent, DecisionEvent, TradeEvent, MatchEvent, ProposalEvent, ResponseEvent, StatusEvent)}
+
+
+def event_from_dict(data: Dict[str, Any]) -> Event:
+    """Event.to_dict 의 역변환 (체크포인트 복원용). seq/turn/player 는 그대로 유지"""
+    cls = EVENT_TYPES[data["kind"]]
+    event = cls.__new__(cls)
+    for key, value in data.items():
+        if key != "kind":
+            setattr(event, key, tuple(value) if isinstance(value, list) and key in ("gave", "received") else value)
+    return event
+
+
+# --- Event Store ---
+class EventStore:
+    """게임 전체의 append-only 이벤트 저장소 (턴별/플레이어별/최근 상호작용 상대 인덱스 유지)"""
+
+    def __init__(self):
+        self.events: List[Event] = []
+        self.current_turn = 0 # Game 이 턴 시작 시 갱신. 새 이벤트의 turn 으로 사용
+        self._by_turn: Dict[int, List[Event]] = {}
+        self._by_player: Dict[str, List[Event]] = {}
+        self._partners: Dict[str, Dict[str, None]] = {} # 플레이어 -> 상호작용 상대 (마지막 상호작용이 뒤)
+
+    def _index(self, event: Event):
+        self._by_turn.setdefault(event.turn, []).append(event)
+        self._by_player.setdefault(event.player, []).append(event)
+        partner = event.partner()
+        if partner:
+            partners = self._partners.setdefault(event.player, {})
+            partners.pop(partner, None)
+            partners[partner] = None
+
+    def append(self, player_name: str, event: Event) -> Event:
+        event.seq = len(self.events)
+        event.turn = self.current_turn
+        event.player = player_name
+        self.events.append(event)
+        self._index(event)
+        return event
+
+    def restore(self, event: Event) -> Event:
+        """체크포인트에서 읽은 이벤트를 seq/turn 을 유지한 채 다시 넣습니다."""
+        self.events.append(event)
+        self._index(event)
+        return event
+
+    def for_turn(self, turn: int) -> List[Event]:
+        return self._by_turn.get(turn, [])
+
+    def for_player(self, player_name: str) -> List[Event]:
+        return self._by_player.get(player_name, [])
+
+    def recent_partners(self, player_name: str):
+        """최근 상호작용 상대 이름 (최근 순 이터레이터)"""
+        return reversed(self._partners.get(player_name, {}))
+
+    def turns(self) -> List[int]:
+        return sorted(self._by_turn)
+
+    def __len__(self) -> int:
+        return len(self.events)
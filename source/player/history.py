@@ -0,0 +1,180 @@
+from typing import Any, Dict, List, Optional
+from custom_logger import logger
+from config import config
+from llm.tokens import estimate_tokens
+from player.events import Event
+
+EMPTY_HISTORY = "아직 기록된 행동이 없습니다."
+
+
+# --- History Compactor ---
+class HistoryCompactor:
+    """프롬프트에 넣을 행동 기록을 일정 크기로 유지합니다.
+
+    - 최근 keep_recent 개 항목은 원문 그대로 유지
+    - 그보다 오래된 항목이 fold_chunk 개 이상 쌓이면 롤링 요약(summary)에 접어 넣음 (이전 요약 + 새 항목만 전송)
+    - 렌더링 결과가 token_budget 을 넘으면 오래된 최근 항목부터 생략
+    """
+
+    def __init__(self,
+                 player_name: str,
+                 keep_recent: int = config.HISTORY_KEEP_RECENT,
+                 token_budget: int = config.HISTORY_TOKEN_BUDGET,
+                 fold_chunk: int = config.HISTORY_FOLD_CHUNK):
+        self.player_name = player_name
+        self.keep_recent = keep_recent
+        self.token_budget = token_budget
+        self.fold_chunk = fold_chunk
+
+        self.summary = ""
+        self.folded = 0 # 요약에 접힌 이벤트 수
+
+        # 메트릭
+        self._counted = 0 # 토큰 수를 센 이벤트 수 (증분 계산)
+        self._events_tokens = 0
+        self.renders = 0
+        self.full_tokens = 0 # 전체 기록을 그대로 보냈을 때의 누적 토큰
+        self.rendered_tokens = 0 # 실제로 보낸 누적 토큰
+        self.fold_calls = 0
+
+    # --- 요약 (fold) ---
+
+    def pending_fold(self, events: List[Event]) -> List[str]:
+        """요약에 접어야 할 오래된 항목. 아직 fold_chunk 만큼 쌓이지 않았다면 빈 리스트"""
+        boundary = len(events) - self.keep_recent
+        if boundary - self.folded >= self.fold_chunk:
+            return events[self.folded:boundary]
+        return []
+
+    def build_fold_request(self, entries: List[Event], model: Optional[str] = None) -> Dict[str, Any]:
+        previous = self.summary or "(없음)"
+        new_entries = "\n".join(entry.render() for entry in entries)
+        return {
+            "model": model or config.HISTORY_SUMMARY_MODEL,
+            "messages": [
+                {"role": "system", "content": (
+                    "당신은 게임 기록 요약가입니다. 플레이어 본인의 관점에서 이전 요약과 새 기록을 합쳐 "
+                    f"{config.HISTORY_SUMMARY_MAX_SENTENCES}문장 이내의 한국어 요약으로 갱신하세요. "
+                    "거래/게임 상대, 승패, 별과 카드의 변화, 신뢰/배신 같은 중요한 사실만 남기세요."
+                )},
+                {"role": "user", "content": f"## 이전 요약\n{previous}\n\n## 새 기록\n{new_entries}"}
+            ],
+            "temperature": 0
+        }
+
+    def apply_fold(self, entries: List[Event], response: Any):
+        """요약 응답을 반영합니다. 실패 시 새 항목을 잘라 붙이는 방식으로 대체합니다."""
+        if isinstance(response, BaseException) or response is None:
+            logger.error(f"Error folding action history for {self.player_name}: {response}")
+            fallback = "\n".join(entry.render()[:80] for entry in entries)
+            summary = f"{self.summary}\n{fallback}".strip()
+        else:
+            summary = response.choices[0].message.content.strip()
+
+        # 요약이 예산의 절반을 넘지 않도록 앞부분부터 잘라냄
+        while summary and estimate_tokens(summary) > self.token_budget // 2:
+            summary = summary[len(summary) // 4:]
+        self.summary = summary
+        self.folded += len(entries)
+        self.fold_calls += 1
+
+    # --- 렌더링 ---
+
+    def _count_tokens(self, events: List[Event]) -> int:
+        for entry in events[self._counted:]:
+            self._events_tokens += estimate_tokens(entry.render()) + 1
+        self._counted = len(events)
+        return self._events_tokens
+
+    def render(self, events: List[Event]) -> str:
+        """프롬프트용 기록 문자열 (API 호출 없음)"""
+        if not events:
+            return EMPTY_HISTORY
+
+        recent_start = max(self.folded, len(events) - self.keep_recent)
+        recent = [entry.render() for entry in events[recent_start:]]
+        omitted = recent_start - self.folded # 아직 요약되지 않았지만 최근 범위를 벗어난 항목
+
+        header_tokens = estimate_tokens(self.summary) if self.summary else 0
+        recent_tokens = [estimate_tokens(entry) + 1 for entry in recent]
+        while len(recent) > 1 and header_tokens + sum(recent_tokens) > self.token_budget:
+            recent = recent[1:]
+            recent_tokens = recent_tokens[1:]
+            omitted += 1
+
+        if not self.summary and not omitted:
+            rendered = "\n".join(recent)
+        else:
+            sections = []
+            if self.summary:
+                sections.append(f"[이전 기록 요약]\n{self.summary}")
+            if omitted:
+                sections.append(f"(요약되지 않은 이전 기록 {omitted}건 생략)")
+            sections.append("[최근 기록]\n" + "\n".join(recent))
+            rendered = "\n".join(sections)
+
+        self.renders += 1
+        self.full_tokens += self._count_tokens(events)
+        self.rendered_tokens += estimate_tokens(rendered)
+        return rendered
+
+    def snapshot(self) -> Dict[str, Any]:
+        """체크포인트용 상태 (요약과 접힌 위치만 저장, 메트릭은 제외)"""
+        return {"summary": self.summary, "folded": self.folded}
+
+    def restore(self, state: Dict[str, Any]):
+        self.summary = state["summary"]
+        self.folded = state["folded"]
+
+    def get_metrics(self) -> Dict[str, int]:
+        return {
+            "renders": self.renders,
+            "full_tokens": self.full_tokens,
+            "rendered_tokens": self.rendered_tokens,
+            "tokens_saved": self.full_tokens - self.rendered_tokens,
+            "fold_calls": self.fold_calls,
+        }
+
+
+async def refresh_histories_async(game: 'Game', players: List['Player']):
+    """요약이 필요한 플레이어들의 기록을 한 번에 동시 요약합니다. (다른 호출 위치와 같이 모델 라우팅/마감 적용)"""
+    from llm.deadline import acomplete_with_deadline
+
+    jobs = []
+    for player in players:
+        entries = player.history.pending_fold(player.get_events())
+        if entries:
+            jobs.append((player, entries))
+    if not jobs:
+        return
+
+    import asyncio
+    semaphore = asyncio.Semaphore(config.MAX_CONCURRENT_REQUESTS)
+
+    async def fold(player, entries):
+        route = game.router.route("history_summary", player, default=config.HISTORY_SUMMARY_MODEL)
+        async with semaphore:
+            response, _ = await acomplete_with_deadline(player.history.build_fold_request(entries, route.model),
+                                                        game.llm_meta("history_summary", player, route=route.label), game.call_deadline())
+            return response
+
+    logger.info(f"Folding action history of {len(jobs)} players.")
+    # 실패/마감 초과는 예외로 돌려받아 apply_fold 가 잘라 붙이기로 대체
+    responses = await asyncio.gather(*(fold(player, entries) for player, entries in jobs), return_exceptions=True)
+    for (player, entries), response in zip(jobs, responses):
+        player.history.apply_fold(entries, response)
+
+
+def refresh_histories(game: 'Game', players: List['Player']):
+    """동기 코드용 refresh_histories_async (이벤트 루프 밖에서 호출, 스레드별 공용 루프 사용)"""
+    if any(player.history.pending_fold(player.get_events()) for player in players):
+        from llm.loop import run_sync
+        run_sync(refresh_histories_async(game, players))
+
+
+def get_history_metrics(players: List['Player']) -> Dict[str, int]:
+    total = {"renders": 0, "full_tokens": 0, "rendered_tokens": 0, "tokens_saved": 0, "fold_calls": 0}
+    for player in players:
+        for key, value in player.history.get_metrics().items():
+            total[key] += value
+    return total
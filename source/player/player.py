@@ -1,10 +1,12 @@
 from config import config
 from typing import List, Dict, Any, Optional
 from custom_logger import logger
+from player.history import HistoryCompactor
+from player.events import Event, EventStore, StatusEvent
 
 # --- Player Class ---
 class Player:
-    def __init__(self, name: str, persona_prompt: str, initial_loan: int = 0):
+    def __init__(self, name: str, persona_prompt: str, initial_loan: int = 0, event_store: Optional[EventStore] = None, state_index: Optional['GameStateIndex'] = None):
         self.name = name
         self.persona_prompt = persona_prompt
         self.stars = config.INITIAL_STARS
@@ -16,8 +18,12 @@ class Player:
         self.money = initial_loan
         self.status = config.PLAYER_STATUS_ACTIVE
         self.initial_loan = -initial_loan
-        self.action_log = [] # 플레이어별 행동 기록
+        self.event_store = event_store if event_store is not None else EventStore() # 행동 기록 (게임 전체 공유 저장소)
         self.current_emotion = "No current emotion provided."
+        self.history = HistoryCompactor(name) # 프롬프트용 기록 압축
+        self.state_index = state_index # 게임 집계 인덱스 (상태 변경 시 갱신)
+        if state_index is not None:
+            state_index.add(self)
 
     def get_total_cards(self) -> int:
         return sum(self.cards.values())
@@ -32,7 +38,7 @@ class Player:
         }
 
     def check_survival_condition(self) -> bool:
-        return self.get_total_cards() == 0 and self.stars >= 3
+        return self.get_total_cards() == 0 and self.stars >= config.SURVIVAL_STARS
 
     def is_active(self) -> bool:
         return self.status == config.PLAYER_STATUS_ACTIVE
@@ -40,11 +46,13 @@ class Player:
     def update_status(self, new_status: str, reason: str = ""):
         if self.status == config.PLAYER_STATUS_ACTIVE: # 이미 게임 오버 상태면 변경하지 않음
             self.status = new_status
+            if self.state_index is not None:
+                self.state_index.refresh(self)
             log_msg = f"Player {self.name} status changed to {new_status}."
             if reason:
                 log_msg += f" Reason: {reason}"
             logger.info(log_msg)
-            self.action_log.append(f"Status changed to {new_status}. Reason: {reason}")
+            self.record(StatusEvent(new_status, reason))
 
     def get_current_stats_prompt(self) -> str:
         my_items = self.get_items_dict()
@@ -56,6 +64,36 @@ class Player:
         """
         return prompt
     
+    def snapshot(self) -> Dict[str, Any]:
+        """체크포인트용 상태 (행동 기록 이벤트는 EventStore 에서 따로 저장)"""
+        return {
+            "stars": self.stars,
+            "cards": dict(self.cards),
+            "money": self.money,
+            "status": self.status,
+            "emotion": self.current_emotion,
+            "history": self.history.snapshot(),
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        self.stars = state["stars"]
+        self.cards = dict(state["cards"])
+        self.money = state["money"]
+        self.status = state["status"]
+        self.current_emotion = state["emotion"]
+        self.history.restore(state["history"])
+
+    def record(self, event: Event) -> Event:
+        return self.event_store.append(self.name, event)
+
+    def get_events(self) -> List[Event]:
+        return self.event_store.for_player(self.name)
+
     def get_action_history(self) -> str:
-        action_history = "\n".join(self.action_log) if self.action_log else "아직 기록된 행동이 없습니다."
+        """프롬프트용 행동 기록 (최근 기록 원문 + 오래된 기록 요약, 토큰 예산 적용)"""
+        return self.history.render(self.get_events())
+
+    def get_full_action_history(self) -> str:
+        events = self.get_events()
+        action_history = "\n".join(event.render() for event in events) if events else "아직 기록된 행동이 없습니다."
         return action_history
\ No newline at end of file
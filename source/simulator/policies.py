@@ -0,0 +1,121 @@
+from typing import Tuple
+from simulator.vector_engine import (
+    VectorGame, ActionBatch, TRADE_ITEMS,
+    DO_NOTHING, PROPOSE_MATCH, PROPOSE_TRADE, DECLARE_OUT,
+)
+import numpy as np
+
+
+def _random_choice_masked(rng: np.random.Generator, allowed: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """각 행에서 allowed 가 True 인 열 중 하나를 균등 추첨. (선택 인덱스, 선택 가능 여부) 반환"""
+    scores = rng.random(allowed.shape) * allowed
+    choice = scores.argmax(axis=1)
+    return choice, allowed.any(axis=1)
+
+
+def _pick_target(game: VectorGame, actor: int, rng: np.random.Generator) -> np.ndarray:
+    """자신을 제외한 활성 플레이어 중 무작위 대상 (-1: 없음)"""
+    candidates = game.active_mask().copy()
+    candidates[:, actor] = False
+    target, has_target = _random_choice_masked(rng, candidates)
+    return np.where(has_target, target, -1)
+
+
+# --- Vectorized Policies ---
+class RandomPolicy:
+    """MockBackend 와 같은 비율로 무작위 행동하는 정책
+
+    - 생존 조건을 만족하면 즉시 탈출
+    - 카드가 있으면 p_match 확률로 게임 제안 (보유 카드 중 무작위)
+    - 그 외 p_trade 확률로 카드 1장<->현금 또는 현금<->별 1개 거래 제안
+    """
+
+    def __init__(self, p_match: float = 0.6, p_trade: float = 0.25, p_accept_match: float = 0.7, p_accept_trade: float = 0.5):
+        self.p_match = p_match
+        self.p_trade = p_trade
+        self.p_accept_match = p_accept_match
+        self.p_accept_trade = p_accept_trade
+
+    def act(self, game: VectorGame, actor: int, mask: np.ndarray) -> ActionBatch:
+        rng = game.rng
+        B = game.B
+        held = game.cards[:, actor] > 0
+        card, has_card = _random_choice_masked(rng, held)
+        target = _pick_target(game, actor, rng)
+
+        roll = rng.random(B)
+        kind = np.full(B, DO_NOTHING, dtype=np.int8)
+        kind[has_card & (roll < self.p_match)] = PROPOSE_MATCH
+        kind[(roll >= self.p_match * has_card) & (roll < self.p_match * has_card + self.p_trade)] = PROPOSE_TRADE
+        kind[target < 0] = DO_NOTHING
+        kind[game.survival_of(actor)] = DECLARE_OUT
+
+        give = np.zeros((B, TRADE_ITEMS), dtype=np.int64)
+        receive = np.zeros((B, TRADE_ITEMS), dtype=np.int64)
+        sell_card = has_card & (rng.random(B) < 0.5)
+        give[np.arange(B)[sell_card], 1 + card[sell_card]] = 1
+        receive[sell_card, 4] = rng.choice([100000, 200000, 500000], size=int(sell_card.sum()))
+        buy_star = ~sell_card
+        give[buy_star, 4] = rng.choice([300000, 500000, 1000000], size=int(buy_star.sum()))
+        receive[buy_star, 0] = 1
+
+        return ActionBatch(kind, target, card, give, receive)
+
+    def respond_match(self, game: VectorGame, target: np.ndarray, proposer: int, mask: np.ndarray):
+        held = game.cards[np.arange(game.B), target] > 0
+        card, has_card = _random_choice_masked(game.rng, held)
+        accept = has_card & (game.rng.random(game.B) < self.p_accept_match)
+        return accept, card
+
+    def respond_trade(self, game: VectorGame, target: np.ndarray, proposer: int, give: np.ndarray, receive: np.ndarray, mask: np.ndarray):
+        return game.rng.random(game.B) < self.p_accept_trade
+
+
+class CardDumpPolicy:
+    """규칙 기반 정책: 카드를 빨리 소진하고 별 3개를 지키는 데 집중
+
+    - 생존 조건을 만족하면 즉시 탈출
+    - 카드가 있으면 가장 많이 가진 카드로 별이 가장 많은 상대에게 게임 제안
+    - 카드가 없고 별이 부족하면 현금으로 별 1개 구매 제안
+    - 게임 제안은 카드가 있으면 항상 수락 (가장 많이 가진 카드), 거래는 거래 후에도 별 survival_stars 개 이상이 남을 때만 수락
+    """
+
+    def __init__(self, star_price: int = 1000000):
+        self.star_price = star_price
+
+    def act(self, game: VectorGame, actor: int, mask: np.ndarray) -> ActionBatch:
+        B = game.B
+        held = game.cards[:, actor]
+        card = held.argmax(axis=1)
+        has_card = game.card_totals[:, actor] > 0
+
+        stars = np.where(game.active_mask(), game.stars, -1)
+        stars[:, actor] = -1
+        target = np.where(stars.max(axis=1) >= 0, stars.argmax(axis=1), -1)
+
+        kind = np.full(B, DO_NOTHING, dtype=np.int8)
+        kind[has_card] = PROPOSE_MATCH
+        needs_star = ~has_card & (game.stars[:, actor] < game.rules.survival_stars)
+        kind[needs_star] = PROPOSE_TRADE
+        kind[target < 0] = DO_NOTHING
+        kind[game.survival_of(actor)] = DECLARE_OUT
+
+        give = np.zeros((B, TRADE_ITEMS), dtype=np.int64)
+        receive = np.zeros((B, TRADE_ITEMS), dtype=np.int64)
+        give[:, 4] = self.star_price
+        receive[:, 0] = 1
+        return ActionBatch(kind, target, card, give, receive)
+
+    def respond_match(self, game: VectorGame, target: np.ndarray, proposer: int, mask: np.ndarray):
+        held = game.cards[np.arange(game.B), target]
+        return game.card_totals[np.arange(game.B), target] > 0, held.argmax(axis=1)
+
+    def respond_trade(self, game: VectorGame, target: np.ndarray, proposer: int, give: np.ndarray, receive: np.ndarray, mask: np.ndarray):
+        stars_after = game.stars[np.arange(game.B), target] - receive[:, 0] + give[:, 0]
+        return stars_after >= game.rules.survival_stars
+
+
+POLICIES = {
+    "random": RandomPolicy,
+    "card_dump": CardDumpPolicy,
+}
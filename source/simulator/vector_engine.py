@@ -0,0 +1,280 @@
+from typing import Dict, Any, Optional
+from config import config
+import numpy as np
+
+# 카드 인덱스: 0=rock, 1=scissors, 2=paper  (c1 이 c2 를 이기는 조건: (c2 - c1) % 3 == 1)
+CARD_TYPES = ["rock", "scissors", "paper"]
+
+# 플레이어 상태 코드
+ACTIVE = 0
+ELIMINATED_NO_STAR = 1
+ELIMINATED_TIME_OUT = 2
+OUT_SUCCESS = 3
+
+STATUS_NAMES = {
+    ACTIVE: config.PLAYER_STATUS_ACTIVE,
+    ELIMINATED_NO_STAR: config.PLAYER_STATUS_ELIMINATED_NO_STAR,
+    ELIMINATED_TIME_OUT: config.PLAYER_STATUS_ELIMINATED_TIME_OUT,
+    OUT_SUCCESS: config.PLAYER_STATUS_OUT_SUCCESS,
+}
+
+# 행동 코드
+DO_NOTHING = 0
+PROPOSE_MATCH = 1
+PROPOSE_TRADE = 2
+DECLARE_OUT = 3
+
+# 거래 벡터 순서: (별, 바위, 가위, 보, 현금)
+TRADE_ITEMS = 5
+
+
+class RuleSet:
+    """규칙 변형 파라미터 (기본값은 config)"""
+
+    def __init__(self,
+                 initial_stars: int = config.INITIAL_STARS,
+                 initial_cards_each_type: int = config.INITIAL_CARDS_EACH_TYPE,
+                 max_turns: int = config.MAX_TURNS,
+                 survival_stars: int = 3,
+                 initial_money: int = 3000000):
+        self.initial_stars = initial_stars
+        self.initial_cards_each_type = initial_cards_each_type
+        self.max_turns = max_turns
+        self.survival_stars = survival_stars
+        self.initial_money = initial_money
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(vars(self))
+
+
+class ActionBatch:
+    """행동 주체 한 슬롯의 게임별 행동 (길이 B 배열들)"""
+
+    def __init__(self, kind: np.ndarray, target: np.ndarray, card: np.ndarray,
+                 give: Optional[np.ndarray] = None, receive: Optional[np.ndarray] = None):
+        self.kind = kind # (B,) 행동 코드
+        self.target = target # (B,) 대상 플레이어 인덱스 (-1: 없음)
+        self.card = card # (B,) 낼 카드 인덱스
+        self.give = give # (B, 5) 제안자가 주는 자원
+        self.receive = receive # (B, 5) 제안자가 받는 자원
+
+
+# --- Vectorized Engine ---
+class VectorGame:
+    """B 개의 게임 x P 명의 플레이어 상태를 NumPy 배열로 보관하고 한꺼번에 진행하는 순수 규칙 시뮬레이터
+
+    Game 과 동일한 규칙을 따릅니다.
+    - 턴마다 플레이어 슬롯 0..P-1 순서로 행동 (슬롯 하나의 행동은 B 개 게임에 대해 벡터 연산)
+    - 매 행동 후 별 0개 탈락 처리 및 종료 조건 확인 (시간 종료, 활성 플레이어 없음, 1명만 남음)
+    """
+
+    def __init__(self, num_games: int, num_players: int, rules: Optional[RuleSet] = None, seed: int = 0):
+        self.B = num_games
+        self.P = num_players
+        self.rules = rules or RuleSet()
+        self.rng = np.random.default_rng(seed)
+        self._games = np.arange(num_games)
+
+        self.stars = np.full((num_games, num_players), self.rules.initial_stars, dtype=np.int32)
+        self.cards = np.full((num_games, num_players, 3), self.rules.initial_cards_each_type, dtype=np.int32)
+        self.card_totals = self.cards.sum(axis=2) # 증분 유지 (매 행동마다 합계를 다시 구하지 않도록)
+        self.money = np.full((num_games, num_players), self.rules.initial_money, dtype=np.int64)
+        self.status = np.full((num_games, num_players), ACTIVE, dtype=np.int8)
+        self.turn = 0
+        self.game_over = np.zeros(num_games, dtype=bool)
+        self.end_turn = np.zeros(num_games, dtype=np.int32) # 게임별 종료 턴
+
+        # 통계
+        self.total_games = num_games
+        self.matches_played = 0
+        self.trades_executed = 0
+        self._retired = [] # 종료되어 배열에서 빠진 게임들의 최종 상태 (stars, status, money, end_turn)
+
+    # --- 상태 질의 ---
+
+    def active_mask(self) -> np.ndarray:
+        return (self.status == ACTIVE) & ~self.game_over[:, None]
+
+    def total_cards(self) -> np.ndarray:
+        return self.card_totals
+
+    def survival_mask(self) -> np.ndarray:
+        return (self.card_totals == 0) & (self.stars >= self.rules.survival_stars)
+
+    def survival_of(self, player: int) -> np.ndarray:
+        return (self.card_totals[:, player] == 0) & (self.stars[:, player] >= self.rules.survival_stars)
+
+    # --- 규칙 ---
+
+    def _apply_exit(self, actor: int, mask: np.ndarray):
+        ok = mask & self.survival_of(actor)
+        self.status[ok, actor] = OUT_SUCCESS
+
+    def _apply_match(self, actor: int, actions: ActionBatch, mask: np.ndarray, policy):
+        g = self._games
+        target = np.where(mask, actions.target, 0)
+        active = self.active_mask()
+        valid = mask & (actions.target >= 0) & (actions.target != actor) & active[g, target] \
+            & (self.cards[g, actor, actions.card] > 0)
+        if not valid.any():
+            return
+
+        accept, target_card = policy.respond_match(self, target, actor, valid)
+        play = valid & accept & (self.cards[g, target, target_card] > 0)
+        if not play.any():
+            return
+
+        games = g[play]
+        target, card1, card2 = target[play], actions.card[play], target_card[play]
+        self.cards[games, actor, card1] -= 1
+        self.cards[games, target, card2] -= 1
+        self.card_totals[games, actor] -= 1
+        self.card_totals[games, target] -= 1
+
+        actor_wins = (card2 - card1) % 3 == 1
+        target_wins = (card1 - card2) % 3 == 1
+        self.stars[games, actor] += actor_wins.astype(np.int32) - target_wins.astype(np.int32)
+        self.stars[games, target] += target_wins.astype(np.int32) - actor_wins.astype(np.int32)
+        self.matches_played += int(play.sum())
+
+    def _apply_trade(self, actor: int, actions: ActionBatch, mask: np.ndarray, policy):
+        g = self._games
+        target = np.where(mask, actions.target, 0)
+        active = self.active_mask()
+        valid = mask & (actions.target >= 0) & (actions.target != actor) & active[g, target]
+        if not valid.any():
+            return
+
+        accept = policy.respond_trade(self, target, actor, actions.give, actions.receive, valid)
+        # 양쪽 모두 줄 자원을 보유하고 있어야 성사
+        ok = valid & accept & self._holds(actor, actions.give) & self._holds_at(target, actions.receive)
+        if not ok.any():
+            return
+
+        games = g[ok]
+        target, give, receive = target[ok], actions.give[ok], actions.receive[ok]
+        delta = receive - give # 제안자 기준 변화량
+        self.stars[games, actor] += delta[:, 0].astype(np.int32)
+        self.cards[games, actor] += delta[:, 1:4].astype(np.int32)
+        self.card_totals[games, actor] += delta[:, 1:4].sum(axis=1).astype(np.int32)
+        self.money[games, actor] += delta[:, 4]
+        self.stars[games, target] -= delta[:, 0].astype(np.int32)
+        self.cards[games, target] -= delta[:, 1:4].astype(np.int32)
+        self.card_totals[games, target] -= delta[:, 1:4].sum(axis=1).astype(np.int32)
+        self.money[games, target] -= delta[:, 4]
+        self.trades_executed += int(ok.sum())
+
+    def _holds(self, player: int, items: np.ndarray) -> np.ndarray:
+        return self._holds_at(np.full(self.B, player), items)
+
+    def _holds_at(self, players: np.ndarray, items: np.ndarray) -> np.ndarray:
+        g = self._games
+        cards = self.cards[g, players]
+        return (self.stars[g, players] >= items[:, 0]) & (cards[:, 0] >= items[:, 1]) & (cards[:, 1] >= items[:, 2]) \
+            & (cards[:, 2] >= items[:, 3]) & (self.money[g, players] >= items[:, 4])
+
+    def _remove_eliminated(self):
+        eliminated = (self.status == ACTIVE) & (self.stars <= 0) & ~self.game_over[:, None]
+        self.status[eliminated] = ELIMINATED_NO_STAR
+
+    def _check_game_end(self, checked: Optional[np.ndarray] = None):
+        """Game.check_game_end 와 같은 순서로 종료 조건 확인 (checked: 확인할 게임, 기본값 전체)"""
+        running = ~self.game_over if checked is None else checked & ~self.game_over
+        active = self.status == ACTIVE
+        active_count = active.sum(axis=1)
+
+        # 1. 시간 종료: 남은 활성 플레이어는 시간 초과 탈락
+        if self.turn >= self.rules.max_turns:
+            timeout = running[:, None] & active
+            self.status[timeout] = ELIMINATED_TIME_OUT
+            self._finish(running)
+            return
+
+        # 2. 활성 플레이어 없음
+        self._finish(running & (active_count == 0))
+
+        # 3. 한 명만 남음: 생존 조건 미달이면 탈락
+        last = running & (active_count == 1) & (self.P > 1)
+        if last.any():
+            last_failed = last[:, None] & active & ~self.survival_mask()
+            self.status[last_failed] = ELIMINATED_TIME_OUT
+            self._finish(last)
+
+    def _finish(self, mask: np.ndarray):
+        newly = mask & ~self.game_over
+        self.end_turn[newly] = self.turn
+        self.game_over |= newly
+
+    # --- 진행 ---
+
+    def step_turn(self, policy):
+        """모든 게임을 한 턴 진행합니다."""
+        if self.game_over.all():
+            return
+        self.turn += 1
+
+        for actor in range(self.P):
+            mask = self.active_mask()[:, actor]
+            if not mask.any():
+                continue
+
+            actions = policy.act(self, actor, mask)
+            self._apply_exit(actor, mask & (actions.kind == DECLARE_OUT))
+            self._apply_match(actor, actions, mask & (actions.kind == PROPOSE_MATCH), policy)
+            self._apply_trade(actor, actions, mask & (actions.kind == PROPOSE_TRADE), policy)
+
+            # Game 과 마찬가지로 이번 슬롯이 실제로 행동한 게임만 종료 조건 확인
+            self._remove_eliminated()
+            self._check_game_end(mask)
+
+        self._remove_eliminated()
+        self._check_game_end()
+
+    def compact(self):
+        """종료된 게임을 배열에서 빼서 이후 턴의 연산량을 줄입니다. (최종 상태는 요약용으로 보관)"""
+        done = self.game_over
+        if not done.any():
+            return
+        self._retired.append((self.stars[done], self.status[done], self.money[done], self.end_turn[done]))
+        live = ~done
+        self.stars = self.stars[live]
+        self.cards = self.cards[live]
+        self.card_totals = self.card_totals[live]
+        self.money = self.money[live]
+        self.status = self.status[live]
+        self.end_turn = self.end_turn[live]
+        self.game_over = self.game_over[live]
+        self.B = int(live.sum())
+        self._games = np.arange(self.B)
+
+    def run(self, policy, compact_ratio: float = 0.25) -> Dict[str, Any]:
+        """모든 게임이 끝날 때까지 진행. 종료된 게임 비율이 compact_ratio 를 넘으면 배열을 압축합니다."""
+        while self.B and not self.game_over.all():
+            self.step_turn(policy)
+            if self.game_over.mean() > compact_ratio:
+                self.compact()
+        return self.summary()
+
+    def _final_arrays(self):
+        parts = self._retired + [(self.stars, self.status, self.money, self.end_turn)]
+        return [np.concatenate([part[i] for part in parts]) for i in range(4)]
+
+    def summary(self) -> Dict[str, Any]:
+        stars, status, money, end_turn = self._final_arrays()
+        survived = status == OUT_SUCCESS
+        status_counts = {STATUS_NAMES[code]: int((status == code).sum()) for code in STATUS_NAMES}
+        star_values, star_counts = np.unique(stars, return_counts=True)
+        return {
+            "games": self.total_games,
+            "players": self.P,
+            "rules": self.rules.to_dict(),
+            "mean_turns": float(end_turn.mean()),
+            "survival_rate": float(survived.mean()),
+            "survival_rate_by_slot": survived.mean(axis=0).round(4).tolist(),
+            "survivors_per_game": float(survived.sum(axis=1).mean()),
+            "status_counts": status_counts,
+            "star_distribution": {int(value): int(count) for value, count in zip(star_values, star_counts)},
+            "money_mean": float(money.mean()),
+            "matches_played": self.matches_played,
+            "trades_executed": self.trades_executed,
+        }
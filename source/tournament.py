@@ -0,0 +1,237 @@
+from typing import List, Dict, Any, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import Counter, defaultdict
+from config import config
+from config import persona
+import argparse
+import json
+import logging
+import os
+import random
+import time
+
+
+# --- 게임 구성 ---
+
+def build_lineup(game_seed: int, persona_names: List[str], players_per_game: Optional[int], loan: int) -> List[Dict[str, Any]]:
+    """게임 하나의 플레이어 구성. players_per_game 이 주어지면 persona_names 에서 시드 기반으로 추첨 (중복 허용)"""
+    rng = random.Random(game_seed)
+    if players_per_game:
+        chosen = [rng.choice(persona_names) for _ in range(players_per_game)]
+    else:
+        chosen = list(persona_names)
+        rng.shuffle(chosen) # 행동 순서 편향 제거
+
+    lineup = []
+    seen = Counter()
+    for persona_name in chosen:
+        seen[persona_name] += 1
+        name = persona_name if seen[persona_name] == 1 else f"{persona_name}#{seen[persona_name]}"
+        lineup.append({"name": name, "persona_name": persona_name, "persona": persona.PERSONAS[persona_name], "loan": loan})
+    return lineup
+
+
+def init_worker():
+    """워커 프로세스 초기화: 프로세스마다 별도 로그 파일 사용 (app.<pid>.log, final.<pid>.log)"""
+    from custom_logger import logger, logger_final
+    for log in (logger, logger_final):
+        base, ext = os.path.splitext(log.log_file)
+        log.use_file(f"{base}.{os.getpid()}{ext}")
+
+
+def run_single_game(game_index: int, game_seed: int, backend_name: str, persona_names: List[str],
+                    players_per_game: Optional[int], loan: int, log_level: str) -> Dict[str, Any]:
+    """워커 프로세스에서 게임 하나를 실행하고 결과 dict 를 반환합니다."""
+    from custom_logger import logger, logger_final
+    from llm import create_backend, set_backend
+    from game.game import Game
+
+    logger.setLevel(getattr(logging, log_level))
+    logger_final.setLevel(getattr(logging, log_level))
+
+    config.MOCK_LLM_SEED = game_seed
+    set_backend(create_backend(backend_name))
+
+    lineup = build_lineup(game_seed, persona_names, players_per_game, loan)
+    started = time.perf_counter()
+    game = Game(lineup)
+    game.run_simulation()
+
+    result = game.get_result()
+    persona_by_name = {conf["name"]: conf["persona_name"] for conf in lineup}
+    for player_result in result["players"]:
+        player_result["persona"] = persona_by_name[player_result["name"]]
+    result.update({"game_index": game_index, "seed": game_seed, "elapsed": time.perf_counter() - started})
+
+    # 워커 프로세스는 atexit 없이 종료될 수 있으므로 로그 큐를 비우고 반환
+    logger.flush()
+    logger_final.flush()
+    return result
+
+
+# --- 결과 저장 ---
+
+class ResultWriter:
+    """게임 결과를 끝나는 대로 파일에 기록 (.jsonl: 게임당 한 줄, .parquet: 플레이어당 한 행, pyarrow 필요)"""
+
+    def __init__(self, path: str, parquet_batch_rows: int = 10000):
+        self.path = path
+        self.is_parquet = path.endswith(".parquet")
+        self.parquet_batch_rows = parquet_batch_rows
+        self._rows: List[Dict[str, Any]] = []
+        self._parquet_writer = None
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        if self.is_parquet:
+            try:
+                import pyarrow # noqa: F401
+            except ImportError:
+                raise RuntimeError("Parquet output requires pyarrow. Use a .jsonl path or install pyarrow.")
+            self._file = None
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, result: Dict[str, Any]):
+        if not self.is_parquet:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+            self._file.flush()
+            return
+
+        for player_result in result["players"]:
+            row = {key: value for key, value in result.items() if key != "players"}
+            row.update(player_result)
+            self._rows.append(row)
+        if len(self._rows) >= self.parquet_batch_rows:
+            self._flush_parquet()
+
+    def _flush_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self._rows:
+            return
+        table = pa.Table.from_pylist(self._rows)
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+        self._parquet_writer.write_table(table)
+        self._rows = []
+
+    def close(self):
+        if self.is_parquet:
+            self._flush_parquet()
+            if self._parquet_writer is not None:
+                self._parquet_writer.close()
+        else:
+            self._file.close()
+
+
+# --- 집계 ---
+
+class PersonaStats:
+    """페르소나별 생존율, 최종 별 분포, 현금 결과 집계"""
+
+    def __init__(self):
+        self.games = 0
+        self.survived = 0
+        self.status_counts = Counter()
+        self.star_distribution = Counter()
+        self.money_total = 0
+        self.money_min = None
+        self.money_max = None
+
+    def add(self, player_result: Dict[str, Any]):
+        money = player_result["money"]
+        self.games += 1
+        self.survived += int(player_result["survived"])
+        self.status_counts[player_result["status"]] += 1
+        self.star_distribution[player_result["stars"]] += 1
+        self.money_total += money
+        self.money_min = money if self.money_min is None else min(self.money_min, money)
+        self.money_max = money if self.money_max is None else max(self.money_max, money)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "games": self.games,
+            "survival_rate": self.survived / self.games if self.games else 0.0,
+            "status_counts": dict(self.status_counts),
+            "star_distribution": {str(stars): count for stars, count in sorted(self.star_distribution.items())},
+            "money_mean": self.money_total / self.games if self.games else 0.0,
+            "money_min": self.money_min,
+            "money_max": self.money_max,
+        }
+
+
+def run_tournament(games: int, workers: int, base_seed: int, backend_name: str, persona_names: List[str],
+                   players_per_game: Optional[int], loan: int, out_path: str, log_level: str) -> Dict[str, Any]:
+    from metrics.collector import sum_totals
+    stats = defaultdict(PersonaStats)
+    writer = ResultWriter(out_path)
+    turns_total = 0
+    llm_totals = [] # 게임별 LLM 호출/토큰/비용 합계 (sum_totals 로 합산)
+    failed = 0
+    started = time.perf_counter()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            futures = [
+                executor.submit(run_single_game, index, base_seed + index, backend_name, persona_names, players_per_game, loan, log_level)
+                for index in range(games)
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"[tournament] game failed: {e}")
+                    continue
+                writer.write(result)
+                turns_total += result["turns"]
+                llm_totals.append(result.get("llm", {}))
+                for player_result in result["players"]:
+                    stats[player_result["persona"]].add(player_result)
+                if done % max(1, games // 20) == 0:
+                    print(f"[tournament] {done}/{games} games finished ({time.perf_counter() - started:.1f}s)")
+    finally:
+        writer.close()
+
+    completed = games - failed
+    return {
+        "games": games,
+        "completed": completed,
+        "failed": failed,
+        "elapsed": time.perf_counter() - started,
+        "mean_turns": turns_total / completed if completed else 0.0,
+        "llm": sum_totals(llm_totals),
+        "personas": {name: persona_stats.to_dict() for name, persona_stats in sorted(stats.items())},
+    }
+
+
+# --- N개 게임 일괄 실행 ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="한정 가위바위보 몬테카를로 토너먼트 (프로세스 풀 병렬 실행)")
+    parser.add_argument("--games", type=int, default=100, help="실행할 게임 수")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="워커 프로세스 수")
+    parser.add_argument("--seed", type=int, default=0, help="기본 시드 (게임 i 의 시드는 seed + i)")
+    parser.add_argument("--backend", default="mock", choices=["mock", "openai"], help="LLM 백엔드 (대량 실행은 mock 권장)")
+    parser.add_argument("--players", default=",".join(persona.DEFAULT_LINEUP), help="참가 페르소나 목록 (쉼표 구분, config/persona.py 의 PERSONAS 키)")
+    parser.add_argument("--players-per-game", type=int, default=None, help="지정 시 --players 에서 게임마다 이 수만큼 추첨 (중복 허용)")
+    parser.add_argument("--loan", type=int, default=3000000, help="플레이어별 초기 대출금")
+    parser.add_argument("--out", default="results/tournament.jsonl", help="결과 파일 (.jsonl 또는 .parquet)")
+    parser.add_argument("--log-level", default="WARNING", help="워커 프로세스 로그 레벨")
+    args = parser.parse_args()
+
+    persona_names = [name.strip() for name in args.players.split(",") if name.strip()]
+    unknown = [name for name in persona_names if name not in persona.PERSONAS]
+    if unknown:
+        parser.error(f"Unknown personas: {unknown}. Available: {list(persona.PERSONAS)}")
+
+    summary = run_tournament(args.games, args.workers, args.seed, args.backend, persona_names,
+                             args.players_per_game, args.loan, args.out, args.log_level.upper())
+
+    summary_path = os.path.splitext(args.out)[0] + ".summary.json"
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
@@ -0,0 +1,73 @@
+from simulator.vector_engine import VectorGame, RuleSet
+from simulator.policies import POLICIES
+from config import config
+import argparse
+import itertools
+import json
+import time
+
+
+def parse_int_list(value: str):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def run_variant(rules: RuleSet, games: int, players: int, policy_name: str, seed: int, batch_size: int):
+    """규칙 변형 하나를 batch_size 단위로 나눠 실행하고 결과를 합칩니다."""
+    policy = POLICIES[policy_name]()
+    started = time.perf_counter()
+    merged = None
+    for batch_index, offset in enumerate(range(0, games, batch_size)):
+        game = VectorGame(min(batch_size, games - offset), players, rules, seed=seed + batch_index)
+        summary = game.run(policy)
+        merged = summary if merged is None else merge_summaries(merged, summary)
+    elapsed = time.perf_counter() - started
+    merged["policy"] = policy_name
+    merged["elapsed"] = elapsed
+    merged["games_per_minute"] = games / elapsed * 60 if elapsed else 0.0
+    return merged
+
+
+def merge_summaries(a, b):
+    """배치별 요약을 게임 수 가중 평균으로 합칩니다."""
+    total = a["games"] + b["games"]
+    wa, wb = a["games"] / total, b["games"] / total
+    merged = dict(a)
+    merged["games"] = total
+    for key in ("mean_turns", "survival_rate", "survivors_per_game", "money_mean"):
+        merged[key] = a[key] * wa + b[key] * wb
+    merged["survival_rate_by_slot"] = [round(x * wa + y * wb, 4) for x, y in zip(a["survival_rate_by_slot"], b["survival_rate_by_slot"])]
+    for key in ("status_counts", "star_distribution"):
+        counts = dict(a[key])
+        for item, count in b[key].items():
+            counts[item] = counts.get(item, 0) + count
+        merged[key] = counts
+    merged["matches_played"] = a["matches_played"] + b["matches_played"]
+    merged["trades_executed"] = a["trades_executed"] + b["trades_executed"]
+    return merged
+
+
+# --- 순수 규칙 벡터 시뮬레이션 (LLM 없음) ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NumPy 기반 한정 가위바위보 대량 시뮬레이션 (규칙 변형 탐색용)")
+    parser.add_argument("--games", type=int, default=100000, help="규칙 변형당 게임 수")
+    parser.add_argument("--players", type=int, default=config.TOTAL_PLAYERS, help="게임당 플레이어 수")
+    parser.add_argument("--policy", default="random", choices=sorted(POLICIES), help="행동 정책")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch-size", type=int, default=100000, help="한 번에 배열로 올릴 게임 수")
+    parser.add_argument("--initial-stars", type=parse_int_list, default=[config.INITIAL_STARS], help="쉼표 구분 목록 (예: 2,3,4)")
+    parser.add_argument("--initial-cards", type=parse_int_list, default=[config.INITIAL_CARDS_EACH_TYPE], help="카드 종류별 초기 장수 목록")
+    parser.add_argument("--max-turns", type=parse_int_list, default=[config.MAX_TURNS], help="최대 턴 수 목록")
+    parser.add_argument("--out", default=None, help="결과 JSON 파일 경로")
+    args = parser.parse_args()
+
+    results = []
+    for stars, cards, turns in itertools.product(args.initial_stars, args.initial_cards, args.max_turns):
+        rules = RuleSet(initial_stars=stars, initial_cards_each_type=cards, max_turns=turns)
+        result = run_variant(rules, args.games, args.players, args.policy, args.seed, args.batch_size)
+        results.append(result)
+        print(f"stars={stars} cards={cards} max_turns={turns}: survival={result['survival_rate']:.3f} "
+              f"mean_turns={result['mean_turns']:.1f} ({result['games_per_minute']:.0f} games/min)")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)